@@ -0,0 +1,4 @@
+"""Command-line interface module."""
+from .batch import run_batch, process_image, main
+
+__all__ = ['run_batch', 'process_image', 'main']
@@ -0,0 +1,293 @@
+"""Headless batch feature extraction over directories of images.
+
+Paths are streamed from the input tree and processed in a bounded process
+pool: at most ``processes * QUEUE_DEPTH`` images are in flight, so memory
+stays flat however large the directory is. Each worker decodes its image,
+runs the same pipeline as the GUI (grayscale -> resize -> equalize ->
+features -> PCA) and writes its outputs directly; only a small summary is
+sent back. Finished images are appended to a JSONL manifest, which is read
+on start-up so an interrupted run resumes where it stopped.
+
+Feature results can be reused across runs from the on-disk result cache,
+which is off unless ``--cache`` or ``--cache-dir`` is given.
+
+Usage:
+    python main.py batch photos/ results/ --features sift,lbp --size 640x480
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from core import CustomImageProcessing, set_workers
+from core.cache import DEFAULT_MAX_BYTES, default_directory
+from utils import draw_keypoints
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+FEATURES = ('sift', 'glcm', 'lbp', 'sobel')
+MANIFEST_NAME = 'manifest.jsonl'
+
+# Images queued per worker process; bounds memory and keeps workers busy
+QUEUE_DEPTH = 2
+
+# Seconds between throughput reports
+REPORT_INTERVAL = 10.0
+
+
+def iter_images(input_dir, extensions=IMAGE_EXTENSIONS):
+    """Yield image paths under ``input_dir`` lazily, in a stable order."""
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                yield Path(root) / name
+
+
+def read_manifest(path):
+    """Relative paths already completed according to a manifest file."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Partially written last line of a crashed run
+                continue
+            if entry.get('status') == 'ok':
+                done.add(entry['path'])
+    return done
+
+
+def _save_atomic(path, write):
+    """Write through a temporary file so a crash never leaves a partial output."""
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _save_png(path, img):
+    _save_atomic(path, lambda f: Image.fromarray(img).save(f, format='PNG'))
+
+
+def _reduce(img, n_components):
+    """PCA reconstruction of a feature image, as in the GUI."""
+    if img.ndim == 3:
+        img = CustomImageProcessing.rgb_to_grayscale(img)
+    h, w = img.shape
+    reconstructed, explained_variance, n_components = CustomImageProcessing.pca_reduction(
+        (img.astype(float) / 255.0).T, min(n_components, h, w))
+    return np.uint8(np.clip(reconstructed.T * 255, 0, 255)), explained_variance, n_components
+
+
+def process_image(path, rel, output_dir, features, size=None, equalize='global',
+                  n_components=None, save_images=True):
+    """Run the pipeline on one image and write its outputs.
+
+    Writes ``<name>.features.npz`` with every numeric result (keypoint
+    columns and descriptors, GLCM properties, LBP histogram, PCA variance)
+    and, with ``save_images``, one PNG per feature image next to it.
+
+    Returns:
+        dict: short summary for the manifest
+    """
+    proc = CustomImageProcessing
+    with Image.open(path) as im:
+        img = np.array(im.convert('RGB'))
+    gray = proc.grayscale_and_resize(img, *size) if size else proc.rgb_to_grayscale(img)
+    if equalize != 'none':
+        gray = proc.histogram_equalization(gray, mode=equalize)
+
+    out = Path(output_dir) / rel
+    out.parent.mkdir(parents=True, exist_ok=True)
+    arrays = {'shape': np.array(gray.shape)}
+    summary = {}
+    feature_images = {}
+
+    if 'sift' in features:
+        keypoints = proc.compute_sift_keypoints(gray)
+        arrays.update({f'sift_{name}': column for name, column in keypoints.to_arrays().items()})
+        summary['keypoints'] = len(keypoints)
+        if save_images:
+            feature_images['sift'] = draw_keypoints(np.stack([gray] * 3, axis=-1), keypoints)
+
+    if 'glcm' in features:
+        stack = proc.compute_glcm_stack(gray)
+        properties = proc.glcm_properties(stack)
+        for name, values in zip(('contrast', 'dissimilarity', 'homogeneity', 'energy', 'correlation'),
+                                properties):
+            arrays[f'glcm_{name}'] = values[0]
+        summary['glcm_contrast'] = float(properties[0].mean())
+
+    if 'lbp' in features:
+        lbp = proc.compute_lbp(gray, method='uniform')
+        arrays['lbp_histogram'] = proc.lbp_histogram(lbp, 59)
+        peak = lbp.max()
+        feature_images['lbp'] = (lbp / peak * 255).astype(np.uint8) if peak > 0 else lbp.astype(np.uint8)
+
+    if 'sobel' in features:
+        feature_images['sobel'] = proc.compute_gradient(gray, output='magnitude')
+        summary['edges'] = int(np.count_nonzero(feature_images['sobel']))
+
+    for name, feature_img in feature_images.items():
+        if save_images:
+            _save_png(out.with_name(f'{out.name}.{name}.png'), feature_img)
+        if n_components:
+            reduced, explained_variance, _ = _reduce(feature_img, n_components)
+            arrays[f'{name}_pca_variance'] = np.array(explained_variance)
+            if save_images:
+                _save_png(out.with_name(f'{out.name}.{name}.pca.png'), reduced)
+
+    _save_atomic(out.with_name(f'{out.name}.features.npz'), lambda f: np.savez(f, **arrays))
+    return summary
+
+
+def _init_worker(threads, cache_dir):
+    # Processes already use every core; keep each one's kernels single-threaded
+    set_workers(threads)
+    if cache_dir is not None:
+        CustomImageProcessing.enable_cache(cache_dir)
+
+
+def _process_entry(path, rel, output_dir, options):
+    start = time.perf_counter()
+    try:
+        summary = process_image(path, rel, output_dir, **options)
+        entry = {'path': rel, 'status': 'ok', **summary}
+    except Exception as e:
+        entry = {'path': rel, 'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+    entry['seconds'] = round(time.perf_counter() - start, 3)
+    return entry
+
+
+def run_batch(input_dir, output_dir, features=FEATURES, size=None, equalize='global',
+              n_components=None, save_images=True, processes=None, threads=1,
+              manifest=None, cache_dir=None, log=sys.stderr):
+    """Process every image under ``input_dir`` into ``output_dir``.
+
+    Args:
+        features: subset of FEATURES to extract
+        size: optional (width, height) to resize to before extraction
+        equalize: 'global', 'clahe' or 'none'
+        n_components: PCA components for feature images; None skips PCA
+        save_images: write PNGs of the feature (and PCA) images
+        processes: worker processes; defaults to os.cpu_count()
+        threads: kernel threads per worker process
+        manifest: manifest path; defaults to output_dir/manifest.jsonl
+        cache_dir: result cache directory shared by all workers; None
+            disables caching
+        log: stream for progress lines, or None
+
+    Returns:
+        dict: counts of processed, failed and skipped images, elapsed time
+            and throughput in images/s
+    """
+    unknown = set(features) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown features: {', '.join(sorted(unknown))}")
+    processes = processes or os.cpu_count() or 1
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = Path(manifest) if manifest else output_dir / MANIFEST_NAME
+    done = read_manifest(manifest)
+    options = {'features': tuple(features), 'size': size, 'equalize': equalize,
+               'n_components': n_components, 'save_images': save_images}
+
+    stats = {'processed': 0, 'failed': 0, 'skipped': 0}
+    start = last_report = time.perf_counter()
+
+    def report(final=False):
+        elapsed = time.perf_counter() - start
+        rate = (stats['processed'] + stats['failed']) / elapsed if elapsed > 0 else 0.0
+        if log is not None:
+            prefix = 'Done' if final else 'Progress'
+            print(f"{prefix}: {stats['processed']} ok, {stats['failed']} failed, "
+                  f"{stats['skipped']} skipped, {rate:.2f} images/s", file=log, flush=True)
+        return elapsed, rate
+
+    with open(manifest, 'a', encoding='utf-8') as manifest_file, \
+            ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                initargs=(threads, cache_dir)) as pool:
+        pending = set()
+
+        def collect(futures):
+            for future in futures:
+                entry = future.result()
+                manifest_file.write(json.dumps(entry) + '\n')
+                stats['processed' if entry['status'] == 'ok' else 'failed'] += 1
+            manifest_file.flush()
+
+        for path in iter_images(input_dir):
+            rel = path.relative_to(input_dir).as_posix()
+            if rel in done:
+                stats['skipped'] += 1
+                continue
+            # Backpressure: wait for a slot before reading further paths
+            if len(pending) >= processes * QUEUE_DEPTH:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+                if time.perf_counter() - last_report >= REPORT_INTERVAL:
+                    report()
+                    last_report = time.perf_counter()
+            pending.add(pool.submit(_process_entry, str(path), rel, str(output_dir), options))
+
+        collect(wait(pending).done)
+
+    elapsed, rate = report(final=True)
+    return {**stats, 'seconds': elapsed, 'images_per_second': rate}
+
+
+def _parse_size(text):
+    try:
+        width, height = (int(v) for v in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Size must look like 640x480, got {text!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError('Dimensions must be positive')
+    return width, height
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='main.py', description='Image forensics toolkit')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help='extract features from every image in a directory')
+    batch.add_argument('input_dir', type=Path)
+    batch.add_argument('output_dir', type=Path)
+    batch.add_argument('--features', default=','.join(FEATURES),
+                       help=f"comma-separated subset of {', '.join(FEATURES)} (default: all)")
+    batch.add_argument('--size', type=_parse_size, help='resize to WIDTHxHEIGHT before extraction')
+    batch.add_argument('--equalize', choices=('global', 'clahe', 'none'), default='global')
+    batch.add_argument('--pca', type=int, metavar='N', help='PCA components for feature images')
+    batch.add_argument('--no-images', action='store_true', help='only write .features.npz files')
+    batch.add_argument('--processes', type=int, help='worker processes (default: all cores)')
+    batch.add_argument('--threads', type=int, default=1, help='kernel threads per process')
+    batch.add_argument('--manifest', type=Path, help='manifest file (default: OUTPUT_DIR/manifest.jsonl)')
+    batch.add_argument('--cache', action='store_true',
+                       help=f'reuse feature results from an on-disk cache of up to '
+                            f'{DEFAULT_MAX_BYTES >> 30} GB in {default_directory()} (off by default)')
+    batch.add_argument('--cache-dir', type=Path, help='result cache directory; implies --cache')
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point; returns the process exit status."""
+    args = build_parser().parse_args(argv)
+    features = [name.strip().lower() for name in args.features.split(',') if name.strip()]
+    try:
+        result = run_batch(args.input_dir, args.output_dir, features, args.size, args.equalize,
+                           args.pca, not args.no_images, args.processes, args.threads, args.manifest,
+                           args.cache_dir or (default_directory() if args.cache else None))
+    except ValueError as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 2
+    return 1 if result['failed'] else 0
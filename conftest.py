@@ -0,0 +1 @@
+"""Lets a bare `pytest` run import the core, gui and cli packages from the repository root."""
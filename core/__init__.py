@@ -1,4 +1,19 @@
 """Core image processing module."""
 from .image_processor import CustomImageProcessing
+from .scale_space import ScaleSpaceOctave
+from .incremental_pca import IncrementalPCA
+from .tiling import TiledExecutor, tiled_gaussian_blur, tiled_lbp, tiled_gradient
+from .parallel import set_workers, get_workers
+from .cache import ResultCache
+from .keypoints import KeyPoints
+from .matching import knn_search, match_descriptors
+from .copy_move import detect_copy_move
+from .ann_index import DescriptorIndex
+from .phash import HashIndex, hash_images
+from .progress import ProgressToken, OperationCancelled
 
-__all__ = ['CustomImageProcessing']
+__all__ = ['CustomImageProcessing', 'ScaleSpaceOctave', 'IncrementalPCA',
+           'TiledExecutor', 'tiled_gaussian_blur', 'tiled_lbp', 'tiled_gradient',
+           'set_workers', 'get_workers', 'ResultCache', 'KeyPoints',
+           'knn_search', 'match_descriptors', 'detect_copy_move', 'DescriptorIndex',
+           'HashIndex', 'hash_images', 'ProgressToken', 'OperationCancelled']
@@ -0,0 +1,332 @@
+"""On-disk approximate nearest-neighbour index of SIFT descriptors.
+
+The index is an inverted file with product quantization (IVF-PQ):
+    - a coarse k-means quantizer splits descriptor space into ``n_lists``
+      cells; a query only scans the ``n_probe`` cells nearest to it
+    - every descriptor is stored as ``n_subquantizers`` one-byte codes, one
+      per sub-vector, so 128-D float32 descriptors shrink from 512 to
+      typically 8 bytes; distances are read from per-query lookup tables
+
+Descriptors are appended in segments. Each segment holds its codes sorted by
+cell with an offsets table, the image id of every code, and the names of the
+images it introduced; it is written to a temporary directory and renamed
+into place, so a crash never leaves a partial segment. Segments are loaded
+memory-mapped, and ``compact`` merges them into one. A merged segment lists
+the segments it supersedes, which are skipped on load, so a crash before
+they are removed never counts their descriptors twice.
+
+Layout:
+    index_dir/quantizer.npz           coarse centroids and PQ codebooks
+    index_dir/segments/000000/*.npy   codes, image_ids, offsets, names
+                                      (+ supersedes, for merged segments)
+
+Usage:
+    index = DescriptorIndex.create('archive.idx', sample_descriptors)
+    index.add('photo1.jpg', keypoints.descriptors)
+    index.flush()
+    index = DescriptorIndex.open('archive.idx')
+    index.search(query_keypoints.descriptors, top_k=10)
+"""
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from .matching import knn_search
+
+
+DEFAULT_LISTS = 4096
+DEFAULT_SUBQUANTIZERS = 8
+_CODEBOOK_SIZE = 256
+
+
+def _kmeans(data, k, n_iter, rng):
+    """Lloyd's k-means with blocked nearest-centroid assignment."""
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    if len(data) < k:
+        raise ValueError(f"Need at least {k} training vectors, got {len(data)}")
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = knn_search(data, centroids, k=1)[0][:, 0]
+        counts = np.bincount(assignment, minlength=k)
+        sums = np.zeros_like(centroids, dtype=np.float64)
+        np.add.at(sums, assignment, data)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, np.newaxis]
+        # Restart empty clusters from random training vectors
+        empty = np.nonzero(~filled)[0]
+        centroids[empty] = data[rng.choice(len(data), len(empty), replace=False)]
+    return centroids
+
+
+class _Segment:
+    """One appended batch: codes grouped by coarse cell."""
+
+    def __init__(self, path, base_id, mmap_mode):
+        self.path = path
+        self.base_id = base_id
+        self.codes = np.load(path / 'codes.npy', mmap_mode=mmap_mode)
+        self.image_ids = np.load(path / 'image_ids.npy', mmap_mode=mmap_mode)
+        self.offsets = np.load(path / 'offsets.npy')
+        self.names = np.load(path / 'names.npy').tolist()
+
+
+class DescriptorIndex:
+    """IVF-PQ index over descriptors of an image corpus with image voting."""
+
+    def __init__(self, path, centroids, codebooks, mmap_mode='r'):
+        self.path = Path(path)
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.codebooks = np.ascontiguousarray(codebooks, dtype=np.float32)  # (m, 256, d / m)
+        self._code_offsets = (np.arange(len(self.codebooks)) * _CODEBOOK_SIZE)[:, np.newaxis]
+        self.mmap_mode = mmap_mode
+        self.segments = []
+        self._pending = []
+        self._load_segments()
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @property
+    def n_subquantizers(self):
+        return len(self.codebooks)
+
+    @property
+    def names(self):
+        """Image names, indexed by image id."""
+        return [name for segment in self.segments for name in segment.names]
+
+    def __len__(self):
+        """Number of indexed descriptors."""
+        return sum(len(segment.codes) for segment in self.segments)
+
+    @classmethod
+    def create(cls, path, training, n_lists=DEFAULT_LISTS, n_subquantizers=DEFAULT_SUBQUANTIZERS,
+               n_iter=10, random_state=0):
+        """Train the quantizers on a descriptor sample and create an empty index.
+
+        Args:
+            path: index directory (created; must not hold an index yet)
+            training: (N, D) representative descriptors, N >= n_lists and
+                ideally 30+ per list
+            n_lists: coarse cells; around 4 * sqrt(expected descriptors)
+            n_subquantizers: bytes per stored descriptor; must divide D
+        """
+        path = Path(path)
+        if (path / 'quantizer.npz').exists():
+            raise FileExistsError(f"An index already exists at {path}")
+        training = np.ascontiguousarray(getattr(training, 'descriptors', training), dtype=np.float32)
+        dim = training.shape[1]
+        if dim % n_subquantizers:
+            raise ValueError(f"n_subquantizers must divide the descriptor size {dim}")
+        rng = np.random.default_rng(random_state)
+        centroids = _kmeans(training, n_lists, n_iter, rng)
+        sub = training.reshape(len(training), n_subquantizers, -1)
+        codebooks = np.stack([_kmeans(sub[:, j], _CODEBOOK_SIZE, n_iter, rng) for j in range(n_subquantizers)])
+
+        (path / 'segments').mkdir(parents=True, exist_ok=True)
+        np.savez(path / 'quantizer.npz', centroids=centroids, codebooks=codebooks)
+        return cls(path, centroids, codebooks)
+
+    @classmethod
+    def open(cls, path, mmap_mode='r'):
+        """Open an index; segment arrays are memory-mapped unless mmap_mode is None."""
+        with np.load(Path(path) / 'quantizer.npz') as quantizer:
+            return cls(path, quantizer['centroids'], quantizer['codebooks'], mmap_mode)
+
+    def _load_segments(self):
+        self.segments = []
+        paths = [p for p in sorted((self.path / 'segments').iterdir()) if not p.name.endswith('.tmp')]
+        superseded = set()
+        for segment_path in paths:
+            if (segment_path / 'supersedes.npy').exists():
+                superseded.update(np.load(segment_path / 'supersedes.npy').tolist())
+        # Left behind by a compaction interrupted before it removed them
+        self._superseded = [p for p in paths if p.name in superseded]
+        base_id = 0
+        for segment_path in paths:
+            if segment_path.name in superseded:
+                continue
+            segment = _Segment(segment_path, base_id, self.mmap_mode)
+            self.segments.append(segment)
+            base_id += len(segment.names)
+
+    def _encode(self, descriptors):
+        """Coarse cell and PQ codes for (N, D) descriptors."""
+        lists = knn_search(descriptors, self.centroids, k=1)[0][:, 0]
+        sub = descriptors.reshape(len(descriptors), self.n_subquantizers, -1)
+        codes = np.empty((len(descriptors), self.n_subquantizers), dtype=np.uint8)
+        for j, codebook in enumerate(self.codebooks):
+            codes[:, j] = knn_search(np.ascontiguousarray(sub[:, j]), codebook, k=1)[0][:, 0]
+        return lists, codes
+
+    def add(self, name, descriptors):
+        """Queue the descriptors of one image; written by the next ``flush``."""
+        descriptors = np.asarray(getattr(descriptors, 'descriptors', descriptors), dtype=np.float32)
+        self._pending.append((str(name), descriptors.reshape(-1, self.centroids.shape[1])))
+
+    def flush(self):
+        """Write queued images as a new segment."""
+        if not self._pending:
+            return
+        names = [name for name, _ in self._pending]
+        descriptors = np.concatenate([d for _, d in self._pending])
+        local_ids = np.repeat(np.arange(len(names), dtype=np.int32), [len(d) for _, d in self._pending])
+        lists, codes = self._encode(descriptors)
+        order = np.argsort(lists, kind='stable')
+        offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(lists, minlength=self.n_lists), out=offsets[1:])
+
+        segments_dir = self.path / 'segments'
+        existing = [int(p.name) for p in segments_dir.iterdir() if p.name.isdigit()]
+        final = segments_dir / f'{max(existing, default=-1) + 1:06d}'
+        self._write_segment(final, codes[order], local_ids[order], offsets, names)
+        self._pending = []
+        self._load_segments()
+
+    @staticmethod
+    def _write_segment(final, codes, image_ids, offsets, names, supersedes=()):
+        tmp = final.with_name(final.name + '.tmp')
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        np.save(tmp / 'codes.npy', codes)
+        np.save(tmp / 'image_ids.npy', image_ids)
+        np.save(tmp / 'offsets.npy', offsets)
+        np.save(tmp / 'names.npy', np.array(names, dtype=str))
+        if supersedes:
+            np.save(tmp / 'supersedes.npy', np.array(supersedes, dtype=str))
+        os.replace(tmp, final)
+
+    def compact(self):
+        """Merge all segments into one, so searches touch a single code array."""
+        self.flush()
+        if len(self.segments) <= 1:
+            for path in self._superseded:
+                shutil.rmtree(path, ignore_errors=True)
+            self._superseded = []
+            return
+        codes, image_ids, names, lists = [], [], [], []
+        for segment in self.segments:
+            codes.append(np.asarray(segment.codes))
+            image_ids.append(np.asarray(segment.image_ids) + len(names))
+            names.extend(segment.names)
+            lists.append(np.repeat(np.arange(self.n_lists), np.diff(segment.offsets)))
+        lists = np.concatenate(lists)
+        order = np.argsort(lists, kind='stable')
+        offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(lists, minlength=self.n_lists), out=offsets[1:])
+
+        old = [segment.path for segment in self.segments]
+        final = old[-1].with_name(f'{int(old[-1].name) + 1:06d}')
+        # The merged segment replaces the old ones the moment it is renamed
+        # into place; removing them afterwards is only cleanup
+        self._write_segment(final, np.concatenate(codes)[order], np.concatenate(image_ids)[order].astype(np.int32),
+                            offsets, names, supersedes=[path.name for path in old])
+        self.segments = []
+        for path in old + self._superseded:
+            shutil.rmtree(path, ignore_errors=True)
+        self._load_segments()
+
+    def _lookup_tables(self, queries):
+        """(Q, m, 256) squared distances from every query sub-vector to every code."""
+        sub = queries.reshape(len(queries), self.n_subquantizers, -1)
+        tables = np.einsum('qmd,mkd->qmk', sub, self.codebooks) * -2.0
+        tables += np.einsum('qmd,qmd->qm', sub, sub)[:, :, np.newaxis]
+        tables += np.einsum('mkd,mkd->mk', self.codebooks, self.codebooks)[np.newaxis]
+        return tables.astype(np.float32)
+
+    def _scan_cell(self, cell, tables, k):
+        """k nearest (query row, distance, image id) per query in one coarse cell."""
+        hits = []
+        flat = tables.reshape(len(tables), -1)
+        for segment in self.segments:
+            start, stop = segment.offsets[cell], segment.offsets[cell + 1]
+            if start == stop:
+                continue
+            # One contiguous read of the cell's codes serves every query probing it
+            # Codes offset into the flattened (Q, m * 256) tables, one row per sub-quantizer,
+            # so each gather is a contiguous take rather than a strided fancy index
+            codes = np.asarray(segment.codes[start:stop]).T.astype(np.intp)
+            codes += self._code_offsets
+            distances = np.take(flat, codes[0], axis=1)
+            for j in range(1, self.n_subquantizers):
+                distances += np.take(flat, codes[j], axis=1)
+            kk = min(k, stop - start)
+            if kk < stop - start:
+                nearest = np.argpartition(distances, kk - 1, axis=1)[:, :kk]
+            else:
+                nearest = np.broadcast_to(np.arange(kk), (len(tables), kk))
+            rows = np.broadcast_to(np.arange(len(tables))[:, np.newaxis], nearest.shape)
+            hits.append((rows.ravel(), np.take_along_axis(distances, nearest, axis=1).ravel(),
+                         np.asarray(segment.image_ids[start:stop])[nearest].ravel() + segment.base_id))
+        return hits
+
+    def search(self, descriptors, top_k=10, n_probe=8, k_neighbors=4, max_descriptors=2000):
+        """Rank indexed images by how many query descriptors they match.
+
+        Each query descriptor votes once for every distinct image among its
+        ``k_neighbors`` approximate nearest neighbours. Probed cells are
+        scanned one at a time for all the queries that probe them.
+
+        Args:
+            descriptors: (N, D) query descriptors or KeyPoints
+            top_k: number of images to return
+            n_probe: coarse cells scanned per query descriptor
+            k_neighbors: neighbours per query descriptor that vote
+            max_descriptors: query descriptors used; KeyPoints keep the
+                strongest responses, arrays an even subsample
+
+        Returns:
+            list of (image name, votes), most votes first
+        """
+        self.flush()
+        if isinstance(descriptors, np.ndarray) or not hasattr(descriptors, 'descriptors'):
+            queries = np.asarray(descriptors, dtype=np.float32)
+            if max_descriptors and len(queries) > max_descriptors:
+                queries = queries[np.linspace(0, len(queries) - 1, max_descriptors).astype(np.intp)]
+        else:
+            queries = descriptors.descriptors
+            if max_descriptors and len(queries) > max_descriptors:
+                queries = queries[np.argsort(-descriptors.response, kind='stable')[:max_descriptors]]
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        n_images = sum(len(segment.names) for segment in self.segments)
+        if len(queries) == 0 or n_images == 0:
+            return []
+
+        probes = knn_search(queries, self.centroids, k=min(n_probe, self.n_lists))[0].ravel()
+        pair_query = np.repeat(np.arange(len(queries)), len(probes) // len(queries))
+        tables = self._lookup_tables(queries)
+
+        # Group (query, cell) pairs by cell
+        order = np.argsort(probes, kind='stable')
+        cells, first = np.unique(probes[order], return_index=True)
+        query_ids, distances, image_ids = [], [], []
+        for cell, group in zip(cells, np.split(pair_query[order], first[1:])):
+            for rows, dist, ids in self._scan_cell(cell, tables[group], k_neighbors):
+                query_ids.append(group[rows])
+                distances.append(dist)
+                image_ids.append(ids)
+        if not query_ids:
+            return []
+        query_ids = np.concatenate(query_ids)
+        distances = np.concatenate(distances)
+        image_ids = np.concatenate(image_ids)
+
+        # Every cell gave its own top k per query; keep the overall top k
+        order = np.lexsort((distances, query_ids))
+        query_ids, image_ids = query_ids[order], image_ids[order]
+        run_start = np.searchsorted(query_ids, np.arange(len(queries)))
+        keep = np.arange(len(query_ids)) - run_start[query_ids] < k_neighbors
+        # One vote per (query descriptor, image)
+        pairs = np.unique(query_ids[keep].astype(np.int64) * n_images + image_ids[keep])
+        votes = np.bincount(pairs % n_images, minlength=n_images)
+
+        ranked = np.argsort(-votes, kind='stable')[:top_k]
+        names = self.names
+        return [(names[i], int(votes[i])) for i in ranked if votes[i] > 0]
+
+    def __repr__(self):
+        return (f'DescriptorIndex({str(self.path)!r}, lists={self.n_lists}, '
+                f'descriptors={len(self)}, segments={len(self.segments)})')
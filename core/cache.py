@@ -0,0 +1,157 @@
+"""Content-addressed on-disk cache for expensive feature extraction results.
+
+Entries are keyed by a hash of the pixel data, the operation name, its
+parameters and the operation's algorithm version, so a result is reused
+for identical input whatever file it came from, and bumping a version
+invalidates stale results. Values are dicts of NumPy arrays stored as
+uncompressed ``.npz`` files (loaded without pickle).
+
+Writes go to a unique temporary file followed by ``os.replace``, so readers
+in other processes never see partial entries and concurrent writers of the
+same key simply race to an identical result. The total size is bounded by
+evicting the least recently used entries (hits refresh the file mtime).
+"""
+import hashlib
+import json
+import os
+import time
+import uuid
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_MAX_BYTES = 2 << 30
+DEFAULT_DIRECTORY = Path.home() / '.cache' / 'img_forensics'
+
+# Temporary files older than this are left over from crashed writers
+STALE_TMP_SECONDS = 3600
+
+
+def _param_json(value):
+    """JSON stand-in for parameter values json cannot encode."""
+    if isinstance(value, np.ndarray):
+        # Hashed by content like the image; str() would truncate large arrays
+        value = np.ascontiguousarray(value)
+        return ['ndarray', value.dtype.str, value.shape, hashlib.sha256(value.tobytes()).hexdigest()]
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def default_directory():
+    """Cache directory from IMG_FORENSICS_CACHE, or ~/.cache/img_forensics."""
+    return Path(os.environ.get('IMG_FORENSICS_CACHE', DEFAULT_DIRECTORY))
+
+
+class ResultCache:
+    """Size-bounded LRU cache of array results on disk.
+
+    Usage:
+        cache = ResultCache()
+        key = cache.key(img, 'lbp', 1, radius=1, n_points=8)
+        arrays = cache.get(key)
+        if arrays is None:
+            arrays = {'lbp': compute(img)}
+            cache.put(key, arrays)
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) if directory is not None else default_directory()
+        self.max_bytes = int(max_bytes)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._size = None  # running estimate, rescanned when over budget
+
+    @staticmethod
+    def key(img, op, version, **params):
+        """Hex digest identifying ``op`` (at ``version``) applied to ``img``.
+
+        Parameters must be JSON-serializable or NumPy arrays and scalars;
+        tuples and lists hash alike.
+        """
+        img = np.ascontiguousarray(img)
+        digest = hashlib.sha256()
+        header = json.dumps([op, version, img.dtype.str, img.shape, params], sort_keys=True, default=_param_json)
+        digest.update(header.encode())
+        digest.update(img.data)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f'{key}.npz'
+
+    def get(self, key):
+        """Cached dict of arrays for ``key``, or None on a miss.
+
+        A corrupt entry counts as a miss and is deleted.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except OSError:
+            # Missing, evicted by another process meanwhile, or unreadable
+            return None
+        except (ValueError, EOFError, zipfile.BadZipFile):
+            # Truncated or corrupt; drop it so the result is recomputed and stored
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Evicted since the load, or a read-only cache; the hit stands
+            pass
+        return arrays
+
+    def put(self, key, arrays):
+        """Store a dict of arrays atomically and evict old entries if needed."""
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp')
+        try:
+            with open(tmp, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, path)
+        except OSError:
+            # A full or read-only cache must not break the computation
+            tmp.unlink(missing_ok=True)
+            return
+        if self._size is not None:
+            self._size += path.stat().st_size
+        if self._size is None or self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until within ``max_bytes``."""
+        entries = []
+        now = time.time()
+        for path in self.directory.glob('*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == '.tmp':
+                if now - stat.st_mtime > STALE_TMP_SECONDS:
+                    path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+    def clear(self):
+        """Remove every entry."""
+        for path in self.directory.glob('*/*'):
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    def __repr__(self):
+        return f'ResultCache({str(self.directory)!r}, max_bytes={self.max_bytes})'
@@ -0,0 +1,246 @@
+"""Copy-move forgery detection by SIFT self-matching.
+
+The image's descriptors are matched against themselves, excluding pairs of
+keypoints that lie close together, and the surviving matches are grouped
+into clusters of pairs whose both ends are near each other. Every cluster
+is then explained by an affine transform estimated with a RANSAC that
+scores all hypotheses at once as (hypotheses x matches) arrays. Clusters
+with enough inliers become duplicated region pairs.
+"""
+import numpy as np
+
+from .image_processor import CustomImageProcessing
+from .matching import match_descriptors
+
+
+# Match x match entries tested per step when linking matches into clusters
+_LINK_BLOCK = 1 << 20
+# Hypothesis x match entries scored per RANSAC step
+_RANSAC_BLOCK = 1 << 21
+
+
+def _self_matches(keypoints, ratio, min_distance):
+    """Unordered keypoint index pairs (P, 2) of mutually similar, distant keypoints."""
+    # Sorted by y, only a narrow run of columns can be near a chunk of rows
+    order = np.argsort(keypoints.y, kind='stable')
+    xy = keypoints.xy[order].astype(np.float32)
+    ys = xy[:, 1]
+    min_sq = np.float32(min_distance * min_distance)
+
+    def too_close(rows, cols):
+        # Also removes each keypoint itself and its other orientations
+        lo, hi = np.searchsorted(ys[cols], (ys[rows[0]] - min_distance, ys[rows[-1]] + min_distance))
+        if lo >= hi:
+            return None
+        mask = np.zeros((len(rows), len(cols)), dtype=bool)
+        near = cols[lo:hi]
+        dx = xy[rows, 0, np.newaxis] - xy[near, 0]
+        dy = xy[rows, 1, np.newaxis] - xy[near, 1]
+        mask[:, lo:hi] = dx * dx + dy * dy < min_sq
+        return mask
+
+    descriptors = keypoints.descriptors[order]
+    query_idx, train_idx, _ = match_descriptors(descriptors, descriptors, ratio=ratio, cross_check=False,
+                                                exclude=too_close)
+    pairs = np.sort(np.stack([order[query_idx], order[train_idx]], axis=1), axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def _link_components(src, dst, radius):
+    """Connected-component labels of matches whose ends are within ``radius``.
+
+    Matches (a, b) and (c, d) are linked when a~c and b~d, or a~d and b~c,
+    since a self-match has no inherent direction.
+    """
+    n = len(src)
+    r2 = radius * radius
+    edges = []
+    step = max(1, _LINK_BLOCK // n)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+
+        def near(p, q):
+            return ((p[start:stop, np.newaxis] - q[np.newaxis]) ** 2).sum(axis=2) < r2
+
+        linked = (near(src, src) & near(dst, dst)) | (near(src, dst) & near(dst, src))
+        i, j = np.nonzero(linked)
+        edges.append((i + start, j))
+    ei = np.concatenate([e[0] for e in edges])
+    ej = np.concatenate([e[1] for e in edges])
+
+    # Min-label propagation with pointer jumping
+    labels = np.arange(n)
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, ei, labels[ej])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def _orient(src, dst):
+    """Swap match ends so every displacement points the same way as the cluster's."""
+    v = dst - src
+    _, eigenvectors = np.linalg.eigh(v.T @ v)
+    flip = v @ eigenvectors[:, -1] < 0
+    src, dst = src.copy(), dst.copy()
+    src[flip], dst[flip] = dst[flip], src[flip].copy()
+    return src, dst, flip
+
+
+def _fit_affine(src, dst):
+    """Least-squares (3, 2) affine parameters mapping src to dst."""
+    X = np.column_stack([src, np.ones(len(src))])
+    return np.linalg.lstsq(X, dst, rcond=None)[0]
+
+
+def _ransac_affine(src, dst, n_hypotheses, threshold, rng):
+    """Batched RANSAC for a 2D affine transform.
+
+    All minimal samples are solved in one batched call, and their residuals
+    are evaluated as a (hypotheses, matches) array in blocks.
+
+    Returns:
+        tuple: ((3, 2) parameters or None, boolean inlier mask)
+    """
+    n = len(src)
+    X = np.column_stack([src, np.ones(n)])
+    samples = rng.integers(0, n, size=(n_hypotheses, 3))
+    A = X[samples]
+    det = np.linalg.det(A)
+    # Distinct, non-collinear triples (|det| is twice the triangle area)
+    valid = np.abs(det) > 1.0
+    if not np.any(valid):
+        return None, np.zeros(n, dtype=bool)
+    params = np.linalg.solve(A[valid], dst[samples[valid]])
+
+    thresh_sq = threshold * threshold
+    counts = np.empty(len(params), dtype=np.intp)
+    step = max(1, _RANSAC_BLOCK // n)
+    for h0 in range(0, len(params), step):
+        predicted = np.einsum('nk,hkd->hnd', X, params[h0:h0 + step])
+        predicted -= dst
+        counts[h0:h0 + step] = (np.einsum('hnd,hnd->hn', predicted, predicted) < thresh_sq).sum(axis=1)
+
+    best = params[np.argmax(counts)]
+    for _ in range(2):
+        residual = X @ best - dst
+        inliers = np.einsum('nd,nd->n', residual, residual) < thresh_sq
+        if inliers.sum() < 3:
+            break
+        best = _fit_affine(src[inliers], dst[inliers])
+    residual = X @ best - dst
+    return best, np.einsum('nd,nd->n', residual, residual) < thresh_sq
+
+
+def _convex_hull(points):
+    """Counter-clockwise hull vertices (monotone chain)."""
+    points = np.unique(points, axis=0)
+    if len(points) < 3:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in points[::-1]:
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return np.array(lower[:-1] + upper[:-1])
+
+
+def _fill_region(mask, points, radii):
+    """Mark the convex hull of ``points`` plus a disc around each point."""
+    h, w = mask.shape
+    for (x, y), r in zip(points, radii):
+        y0, y1 = max(int(y - r), 0), min(int(y + r) + 1, h)
+        x0, x1 = max(int(x - r), 0), min(int(x + r) + 1, w)
+        if y0 < y1 and x0 < x1:
+            yy, xx = np.ogrid[y0:y1, x0:x1]
+            mask[y0:y1, x0:x1] |= (yy - y) ** 2 + (xx - x) ** 2 <= r * r
+
+    hull = _convex_hull(points)
+    if len(hull) < 3:
+        return
+    x0, y0 = np.maximum(np.floor(hull.min(axis=0)).astype(int), 0)
+    x1, y1 = np.minimum(np.ceil(hull.max(axis=0)).astype(int) + 1, (w, h))
+    if x0 >= x1 or y0 >= y1:
+        return
+    yy, xx = np.mgrid[y0:y1, x0:x1]
+    inside = np.ones(yy.shape, dtype=bool)
+    for a, b in zip(hull, np.roll(hull, -1, axis=0)):
+        inside &= (b[0] - a[0]) * (yy - a[1]) - (b[1] - a[1]) * (xx - a[0]) >= 0
+    mask[y0:y1, x0:x1] |= inside
+
+
+def detect_copy_move(img, keypoints=None, ratio=0.6, min_distance=20.0, cluster_radius=60.0,
+                     min_inliers=5, n_hypotheses=256, inlier_threshold=3.0, random_state=0):
+    """Find regions of an image that were copied elsewhere in the same image.
+
+    Args:
+        img: 2D grayscale image
+        keypoints: KeyPoints of ``img``; computed with compute_sift_keypoints
+            when None
+        ratio: Lowe ratio for self-matching (second neighbour excluding
+            keypoints nearer than ``min_distance``)
+        min_distance: pixel distance below which keypoints never match
+        cluster_radius: distance linking neighbouring matches into a cluster
+        min_inliers: affine inliers needed to report a region pair
+        n_hypotheses: RANSAC hypotheses per cluster
+        inlier_threshold: RANSAC reprojection error in pixels
+        random_state: seed for RANSAC sampling
+
+    Returns:
+        dict with
+            'keypoints': the KeyPoints used
+            'matches': (P, 2) keypoint index pairs after self-matching
+            'regions': list of dicts, strongest first, with 'source' and
+                'target' (N, 2) inlier coordinates, 'source_bbox' and
+                'target_bbox' as (x0, y0, x1, y1), 'affine' (2, 3) mapping
+                source to target, and 'inliers' count
+            'mask': uint8 (H, W) array, 255 on duplicated regions
+    """
+    if keypoints is None:
+        keypoints = CustomImageProcessing.compute_sift_keypoints(img)
+    mask = np.zeros(img.shape[:2], dtype=bool)
+    result = {'keypoints': keypoints, 'matches': np.empty((0, 2), dtype=np.intp), 'regions': [], 'mask': mask}
+    if len(keypoints) < 2:
+        result['mask'] = mask.astype(np.uint8)
+        return result
+
+    pairs = _self_matches(keypoints, ratio, min_distance)
+    result['matches'] = pairs
+    xy = keypoints.xy
+    labels = _link_components(xy[pairs[:, 0]], xy[pairs[:, 1]], cluster_radius) if len(pairs) else pairs[:0, 0]
+
+    rng = np.random.default_rng(random_state)
+    cluster_ids, sizes = np.unique(labels, return_counts=True)
+    for cluster in cluster_ids[sizes >= min_inliers]:
+        members = pairs[labels == cluster]
+        src, dst, flip = _orient(xy[members[:, 0]], xy[members[:, 1]])
+        params, inliers = _ransac_affine(src, dst, n_hypotheses, inlier_threshold, rng)
+        if params is None or inliers.sum() < min_inliers:
+            continue
+        # Reject transforms that collapse or blow up the region
+        singular_values = np.linalg.svd(params[:2].T, compute_uv=False)
+        if singular_values[-1] < 0.2 or singular_values[0] > 5.0:
+            continue
+
+        members = np.where(flip[:, np.newaxis], members[:, ::-1], members)[inliers]
+        region = {'source': src[inliers], 'target': dst[inliers], 'affine': params.T,
+                  'inliers': int(inliers.sum())}
+        for end, name in ((0, 'source'), (1, 'target')):
+            points = region[name]
+            region[f'{name}_bbox'] = tuple(float(v) for v in np.concatenate([points.min(axis=0), points.max(axis=0)]))
+            _fill_region(mask, points, np.maximum(2.0 * keypoints.scale[members[:, end]], 3.0))
+        result['regions'].append(region)
+
+    result['regions'].sort(key=lambda region: -region['inliers'])
+    result['mask'] = mask.astype(np.uint8) * 255
+    return result
@@ -1,16 +1,345 @@
 """Optimized image processing engine with custom implementations."""
+import inspect
+from functools import lru_cache, wraps
+
 import numpy as np
-from skimage.feature import graycomatrix, graycoprops
 import warnings
 
+from .cache import DEFAULT_MAX_BYTES, ResultCache
+from .keypoints import FIELDS as KEYPOINT_FIELDS, KeyPoints
+from .parallel import run_bands
+from .progress import as_progress
+from .scale_space import ScaleSpaceOctave, gradient_polar
+
 warnings.filterwarnings('ignore')
 
 
+@lru_cache(maxsize=32)
+def _bilinear_tables(height, width, new_height, new_width):
+    """Source indices and weights for a (height, width) -> (new_height, new_width) resize.
+
+    Tables are cached per shape pair with LRU eviction, so repeated resizes
+    (e.g. preview refreshes) skip the setup entirely.
+    """
+    y = np.arange(new_height) * (height / new_height)
+    x = np.arange(new_width) * (width / new_width)
+    
+    y1 = y.astype(np.intp)
+    x1 = x.astype(np.intp)
+    y2 = np.minimum(y1 + 1, height - 1)
+    x2 = np.minimum(x1 + 1, width - 1)
+    dy = (y - y1).astype(np.float32)
+    dx = (x - x1).astype(np.float32)
+    
+    tables = (y1, y2, dy, x1, x2, dx)
+    for table in tables:
+        table.setflags(write=False)
+    return tables
+
+
+# GLCM angles according to lecture: 0, 45, 90, 135 degrees
+GLCM_ANGLES = (0, np.pi/4, np.pi/2, 3*np.pi/4)
+
+# Order of the values returned by CustomImageProcessing.glcm_properties
+_GLCM_PROPERTY_NAMES = ('contrast', 'dissimilarity', 'homogeneity', 'energy', 'correlation')
+
+
+def _quantize_levels(img, levels):
+    """Quantize an 8-bit image to [0, levels-1]."""
+    img_q = np.floor(img.astype(np.float32) * (levels / 256.0)).astype(np.int32)
+    return np.clip(img_q, 0, levels - 1).astype(np.uint8)
+
+
+@lru_cache(maxsize=8)
+def _glcm_weight_grids(levels):
+    """(levels*levels, 8) weights turning a flattened GLCM into its linear moments.
+    
+    Columns: contrast, dissimilarity, homogeneity, mean_i, mean_j,
+    E[i^2], E[j^2], E[i*j].
+    """
+    i_idx, j_idx = np.meshgrid(np.arange(levels), np.arange(levels), indexing='ij')
+    i_idx = i_idx.ravel().astype(np.float64)
+    j_idx = j_idx.ravel().astype(np.float64)
+    diff = i_idx - j_idx
+    grids = np.stack([diff ** 2, np.abs(diff), 1.0 / (1.0 + diff ** 2),
+                      i_idx, j_idx, i_idx ** 2, j_idx ** 2, i_idx * j_idx], axis=1)
+    grids.setflags(write=False)
+    return grids
+
+
+def _randomized_pca(data, n_components, n_oversamples, n_iter, random_state, progress=None):
+    """Truncated PCA via a randomized range finder with power iterations.
+    
+    The centred matrix is never formed: products with it are expanded as
+    X @ V - mean @ V, so working memory is O((n_samples + n_features) * k).
+    The explained variance ratio divides the leading eigenvalues by the
+    covariance trace, which is computed directly from column sums of squares.
+    """
+    # Integer images would overflow in the products and sums of squares
+    data = np.asarray(data, dtype=np.float64)
+    n_samples, n_features = data.shape
+    n_components = min(n_components, n_samples, n_features)
+    rank = min(n_components + n_oversamples, n_samples, n_features)
+    mean = np.mean(data, axis=0)
+    
+    def centered_dot(v):
+        return data @ v - mean @ v
+    
+    def centered_t_dot(u):
+        return data.T @ u - np.outer(mean, u.sum(axis=0))
+    
+    progress = as_progress(progress)
+    rng = np.random.default_rng(random_state)
+    basis, _ = np.linalg.qr(centered_dot(rng.standard_normal((n_features, rank))))
+    progress.update(1 / (n_iter + 2))
+    for i in range(n_iter):
+        basis, _ = np.linalg.qr(centered_t_dot(basis))
+        basis, _ = np.linalg.qr(centered_dot(basis))
+        progress.update((i + 2) / (n_iter + 2))
+    
+    _, singular_values, vt = np.linalg.svd(centered_t_dot(basis).T, full_matrices=False)
+    components = vt[:n_components].T
+    eigenvalues = singular_values[:n_components] ** 2 / (n_samples - 1)
+    
+    total_variance = (np.einsum('ij,ij->j', data, data) - n_samples * mean ** 2).sum() / (n_samples - 1)
+    explained_variance = min(eigenvalues.sum() / total_variance, 1.0) if total_variance > 0 else 0.0
+    
+    transformed = centered_dot(components)
+    reconstructed = np.dot(transformed, components.T) + mean
+    progress.update(1.0)
+    
+    return reconstructed, explained_variance, n_components
+
+
+# Fractional bits of the fixed-point LBP interpolation weights
+_LBP_WEIGHT_BITS = 16
+
+
+@lru_cache(maxsize=16)
+def _lbp_sampling(radius, n_points):
+    """Integer offsets and bilinear weights of each LBP sampling point.
+    
+    Returns a tuple of (fy, fx, (w00, w01, w10, w11)) per point, where
+    (fy, fx) is the top-left source pixel relative to the centre and the
+    weights are fixed-point integers summing to 2**_LBP_WEIGHT_BITS.
+    """
+    points = []
+    for p in range(n_points):
+        angle = 2 * np.pi * p / n_points
+        # Rounding removes cos/sin noise so grid-aligned points stay exact
+        ox = round(radius * np.cos(angle), 9)
+        oy = round(-radius * np.sin(angle), 9)
+        fx, fy = int(np.floor(ox)), int(np.floor(oy))
+        dx, dy = ox - fx, oy - fy
+        weights = np.array([(1 - dx) * (1 - dy), dx * (1 - dy), (1 - dx) * dy, dx * dy])
+        fixed = np.rint(weights * (1 << _LBP_WEIGHT_BITS)).astype(np.int64)
+        fixed[np.argmax(fixed)] += (1 << _LBP_WEIGHT_BITS) - fixed.sum()
+        points.append((fy, fx, tuple(int(v) for v in fixed)))
+    return tuple(points)
+
+
+def _lbp_code_dtype(n_points):
+    """Smallest unsigned integer type holding an n_points-bit pattern."""
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_points <= np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError("LBP supports at most 64 sampling points")
+
+
+@lru_cache(maxsize=8)
+def _lbp_mapping(n_points, method):
+    """Lookup table from raw LBP codes to 'uniform' (u2) or 'riu2' labels."""
+    if method not in ('uniform', 'riu2'):
+        raise ValueError(f"Unknown LBP method: {method}")
+    if n_points > 16:
+        raise ValueError("Mapped LBP supports at most 16 sampling points")
+    
+    codes = np.arange(1 << n_points, dtype=np.int64)
+    bits = (codes[:, np.newaxis] >> np.arange(n_points)) & 1
+    transitions = np.sum(bits != np.roll(bits, 1, axis=1), axis=1)
+    uniform = transitions <= 2
+    
+    if method == 'uniform':
+        lut = np.full(len(codes), n_points * (n_points - 1) + 2, dtype=np.int64)
+        lut[uniform] = np.arange(np.count_nonzero(uniform))
+    else:
+        lut = np.where(uniform, bits.sum(axis=1), n_points + 1)
+    
+    lut = lut.astype(_lbp_code_dtype(int(lut.max()).bit_length()))
+    lut.setflags(write=False)
+    return lut
+
+
+@lru_cache(maxsize=64)
+def _gaussian_kernel_1d(sigma):
+    """Normalized 1-D Gaussian kernel of radius int(3 * sigma), cached per sigma."""
+    radius = int(3 * sigma)
+    ax = np.arange(-radius, radius + 1, dtype=np.float64)
+    kernel = np.exp(-(ax ** 2) / (2.0 * sigma * sigma))
+    kernel = (kernel / np.sum(kernel)).astype(np.float32)
+    kernel.setflags(write=False)
+    return kernel
+
+
+@lru_cache(maxsize=64)
+def _gaussian_kernel_rfft(sigma, n):
+    """Real FFT of the cached Gaussian kernel zero-padded to length n."""
+    spectrum = np.fft.rfft(_gaussian_kernel_1d(sigma).astype(np.float64), n)
+    spectrum.setflags(write=False)
+    return spectrum
+
+
+def _next_fast_len(n):
+    """Smallest 2^a * 3^b * 5^c that is >= n."""
+    best = 1 << max(n - 1, 0).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            p = p35
+            while p < n:
+                p *= 2
+            best = min(best, p)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def _prefer_fft(radius, size):
+    """Whether FFT convolution beats direct accumulation along one axis.
+
+    Direct costs one multiply-add per tap; FFT costs roughly a constant
+    number of operations per log2 of the transform length.
+    """
+    taps = 2 * radius + 1
+    return taps > 3 * np.log2(_next_fast_len(size + 2 * radius))
+
+
+def _convolve_axis_direct(padded, kernel, axis):
+    """Valid 1-D correlation along axis by summing shifted, weighted slices.
+
+    The kernel is symmetric, so mirrored taps are added before weighting.
+    """
+    taps = len(kernel)
+    radius = taps // 2
+    n = padded.shape[axis] - taps + 1
+    
+    def shifted(k):
+        index = [slice(None), slice(None)]
+        index[axis] = slice(k, k + n)
+        return padded[tuple(index)]
+    
+    result = shifted(radius) * kernel[radius]
+    pair = np.empty_like(result)
+    for k in range(radius):
+        np.add(shifted(k), shifted(taps - 1 - k), out=pair)
+        pair *= kernel[k]
+        result += pair
+    return result
+
+
+def _convolve_axis_fft(padded, kernel, sigma, axis):
+    """Valid 1-D convolution along axis via real FFTs of the padded signal."""
+    m = padded.shape[axis]
+    taps = len(kernel)
+    length = _next_fast_len(m)
+    spectrum = np.fft.rfft(padded, length, axis=axis)
+    shape = [1, 1]
+    shape[axis] = -1
+    spectrum *= _gaussian_kernel_rfft(sigma, length).reshape(shape)
+    full = np.fft.irfft(spectrum, length, axis=axis)
+    index = [slice(None), slice(None)]
+    index[axis] = slice(taps - 1, m)
+    return full[tuple(index)].astype(np.float32)
+
+
+def _gradient_patch(img, y, x, radius):
+    """``gradient_polar`` maps of the window of ``radius`` around (y, x), and its origin.
+    
+    A 1 px margin keeps every pixel of the window off the patch border, so
+    the maps match those of the whole image wherever a window samples them.
+    """
+    h, w = img.shape
+    y0, y1 = np.clip([y - radius - 1, y + radius + 2], 0, h).astype(np.intp)
+    x0, x1 = np.clip([x - radius - 1, x + radius + 2], 0, w).astype(np.intp)
+    magnitude, orientation = gradient_polar(img[y0:y1, x0:x1])
+    return magnitude, orientation, y0, x0
+
+
+# Arguments that change how a result is computed but not the result itself
+_EXECUTION_PARAMS = frozenset({'workers', 'processes', 'progress'})
+
+
+def _encode_result(result):
+    """Array dict for an ndarray, a tuple of arrays/scalars or a dict of arrays."""
+    if isinstance(result, np.ndarray):
+        return {'array': result}
+    if isinstance(result, tuple):
+        return {'kind': np.array('tuple'), **{f'item_{i}': np.asarray(v) for i, v in enumerate(result)}}
+    return {'kind': np.array('dict'), **{f'key_{name}': np.asarray(v) for name, v in result.items()}}
+
+
+def _decode_result(arrays):
+    kind = str(arrays.pop('kind', 'array'))
+    if kind == 'array':
+        return arrays['array']
+    # Scalars were stored as 0-d arrays
+    values = {name: v.item() if v.ndim == 0 else v for name, v in arrays.items()}
+    if kind == 'tuple':
+        return tuple(values[f'item_{i}'] for i in range(len(values)))
+    return {name[len('key_'):]: v for name, v in values.items()}
+
+
+def _cached(op, version, encode=_encode_result, decode=_decode_result):
+    """Serve an operation from ``CustomImageProcessing._cache`` when enabled.
+    
+    The key covers the first argument's pixels, every other argument except
+    execution settings such as ``workers``, and ``version``; bump the
+    version whenever the operation's output changes.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = CustomImageProcessing._cache
+            if cache is None:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            img, *_ = bound.arguments.values()
+            params = {name: value for name, value in list(bound.arguments.items())[1:]
+                      if name not in _EXECUTION_PARAMS}
+            key = cache.key(img, op, version, **params)
+            arrays = cache.get(key)
+            if arrays is not None:
+                as_progress(bound.arguments.get('progress')).update(1.0)
+                return decode(arrays)
+            result = fn(*args, **kwargs)
+            cache.put(key, encode(result))
+            return result
+        
+        return wrapper
+    
+    return decorator
+
+
 class CustomImageProcessing:
     """Custom implementations of image processing techniques with performance optimizations."""
     
-    # Cache for expensive computations
-    _cache = {}
+    # On-disk ResultCache serving the @_cached operations; None disables it
+    _cache = None
+    
+    @classmethod
+    def enable_cache(cls, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        """Cache expensive results on disk (default: IMG_FORENSICS_CACHE or
+        ~/.cache/img_forensics) and return the ResultCache."""
+        cls._cache = ResultCache(directory, max_bytes)
+        return cls._cache
+    
+    @classmethod
+    def disable_cache(cls):
+        cls._cache = None
     
     @staticmethod
     def rgb_to_grayscale(img):
@@ -20,8 +349,13 @@ class CustomImageProcessing:
         return np.dot(img[..., :3], [0.299, 0.587, 0.114]).astype(np.uint8)
     
     @staticmethod
-    def resize_bilinear(img, new_width, new_height):
-        """Bilinear interpolation resize with optimizations."""
+    def resize_bilinear(img, new_width, new_height, workers=None):
+        """Bilinear interpolation resize using cached index/weight tables.
+
+        All channels are interpolated in one batched pass: rows are blended
+        first, then columns, using tables from ``_bilinear_tables``. Bands of
+        output rows run on ``workers`` threads.
+        """
         if len(img.shape) == 2:
             height, width = img.shape
             channels = 1
@@ -29,32 +363,51 @@ class CustomImageProcessing:
         else:
             height, width, channels = img.shape
         
-        resized = np.zeros((new_height, new_width, channels), dtype=np.uint8)
+        y1, y2, dy, x1, x2, dx = _bilinear_tables(height, width, new_height, new_width)
         
-        x_ratio = width / new_width
-        y_ratio = height / new_height
+        resized = np.empty((new_height, new_width, channels), dtype=np.uint8)
         
-        # Vectorized computation for better performance
-        for i in range(new_height):
-            for j in range(new_width):
-                x = j * x_ratio
-                y = i * y_ratio
-                
-                x1, y1 = int(x), int(y)
-                x2 = min(x1 + 1, width - 1)
-                y2 = min(y1 + 1, height - 1)
-                
-                dx = x - x1
-                dy = y - y1
-                
-                for c in range(channels):
-                    val = (img[y1, x1, c] * (1 - dx) * (1 - dy) +
-                           img[y1, x2, c] * dx * (1 - dy) +
-                           img[y2, x1, c] * (1 - dx) * dy +
-                           img[y2, x2, c] * dx * dy)
-                    resized[i, j, c] = int(val)
+        def resize_rows(start, stop):
+            # Blend the two source rows of every output row, then the two columns
+            top = img[y1[start:stop]].astype(np.float32)
+            rows = img[y2[start:stop]].astype(np.float32)
+            rows -= top
+            rows *= dy[start:stop, np.newaxis, np.newaxis]
+            rows += top
+            del top
+            
+            left = rows[:, x1]
+            band = rows[:, x2]
+            band -= left
+            band *= dx[np.newaxis, :, np.newaxis]
+            band += left
+            resized[start:stop] = np.clip(band, 0, 255)
+        
+        run_bands(resize_rows, new_height, workers, new_width * channels)
         
         return resized.squeeze() if channels == 1 else resized
+    
+    @staticmethod
+    def box_downsample(img, factor):
+        """Mean of every ``factor`` x ``factor`` block of a uint8 image.
+        
+        Trailing rows and columns that do not fill a block are dropped, and
+        means are rounded to the nearest integer.
+        """
+        h, w = img.shape[0] // factor, img.shape[1] // factor
+        # Plain adds of row and column slices beat a single reduction over
+        # strided block axes several times over
+        blocks = img[:h * factor].reshape(h, factor, -1)
+        rows = blocks[:, 0].astype(np.uint32 if factor > 16 else np.uint16)
+        for i in range(1, factor):
+            rows += blocks[:, i]
+        blocks = rows.reshape(h, img.shape[1], -1)[:, :w * factor].reshape(h, w, factor, -1)
+        out = blocks[:, :, 0].copy()
+        for i in range(1, factor):
+            out += blocks[:, :, i]
+        out += factor * factor // 2
+        out //= factor * factor
+        return out.astype(np.uint8).reshape((h, w) + img.shape[2:])
 
     @staticmethod
     def grayscale_and_resize(img, new_width, new_height):
@@ -73,104 +426,293 @@ class CustomImageProcessing:
         return resized
     
     @staticmethod
-    def histogram_equalization(img):
-        """Histogram equalization for contrast enhancement."""
-        flat = img.flatten()
-        hist = np.zeros(256, dtype=int)
+    def histogram_equalization(img, mode='global', tile_grid=(8, 8), clip_limit=2.0, workers=None):
+        """Histogram equalization for contrast enhancement.
         
-        for pixel in flat:
-            hist[pixel] += 1
+        Args:
+            mode: 'global' for one image-wide LUT, or 'clahe' for tiled
+                contrast-limited adaptive equalization (see ``clahe``)
+            tile_grid, clip_limit: CLAHE parameters
+            workers: threads for banded histogram and LUT passes
+        """
+        if mode == 'clahe':
+            return CustomImageProcessing.clahe(img, tile_grid, clip_limit, workers)
+        if mode != 'global':
+            raise ValueError(f"Unknown equalization mode: {mode}")
         
-        cdf = np.zeros(256, dtype=int)
-        cdf[0] = hist[0]
-        for i in range(1, 256):
-            cdf[i] = cdf[i-1] + hist[i]
+        h, w = img.shape
+        hist = sum(run_bands(lambda start, stop: np.bincount(img[start:stop].ravel(), minlength=256),
+                             h, workers, w))
+        cdf = np.cumsum(hist)
         
         cdf_min = cdf[cdf > 0].min()
         total_pixels = img.shape[0] * img.shape[1]
         
-        lut = np.zeros(256, dtype=np.uint8)
-        for i in range(256):
-            lut[i] = int(((cdf[i] - cdf_min) / (total_pixels - cdf_min)) * 255) if total_pixels != cdf_min else 0
+        if total_pixels != cdf_min:
+            lut = (((cdf - cdf_min) / (total_pixels - cdf_min)) * 255).astype(np.int64)
+            lut = np.clip(lut, 0, 255).astype(np.uint8)
+        else:
+            lut = np.zeros(len(cdf), dtype=np.uint8)
+        
+        equalized = np.empty_like(lut, shape=img.shape)
         
-        return lut[img]
+        def apply_lut(start, stop):
+            equalized[start:stop] = lut[img[start:stop]]
+        
+        run_bands(apply_lut, h, workers, w)
+        return equalized
     
     @staticmethod
-    def compute_gradient(img):
-        """Compute image gradients using Sobel-like operators."""
+    def clahe(img, tile_grid=(8, 8), clip_limit=2.0, workers=None):
+        """Contrast-limited adaptive histogram equalization (CLAHE).
+        
+        Each tile of a (rows, cols) grid gets its own clipped-histogram LUT;
+        every pixel then blends the LUTs of its four nearest tile centres
+        bilinearly, so there are no seams at tile boundaries.
+        
+        Args:
+            img: 2D uint8 image
+            tile_grid: (rows, cols) number of tiles
+            clip_limit: histogram clip as a multiple of the mean bin height;
+                0 disables clipping
+            workers: threads for the per-tile-row passes
+        """
         h, w = img.shape
-        gx = np.zeros_like(img, dtype=float)
-        gy = np.zeros_like(img, dtype=float)
+        rows, cols = tile_grid
+        th, tw = -(-h // rows), -(-w // cols)
+        padded = np.pad(img, ((0, rows * th - h), (0, cols * tw - w)), mode='symmetric')
         
-        # Sobel kernels
-        sobel_x = np.array([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]])
-        sobel_y = np.array([[-1, -2, -1], [0, 0, 0], [1, 2, 1]])
+        # Per-tile histograms, one band of tiles at a time
+        col_tile = (np.arange(cols * tw) // tw) * 256
+        hist = np.empty((rows, cols, 256), dtype=np.int64)
         
-        for i in range(1, h - 1):
-            for j in range(1, w - 1):
-                region = img[i-1:i+2, j-1:j+2].astype(float)
-                gx[i, j] = np.sum(region * sobel_x)
-                gy[i, j] = np.sum(region * sobel_y)
+        def tile_row_histograms(start, stop):
+            for r in range(start, stop):
+                codes = padded[r*th:(r+1)*th].astype(np.intp)
+                codes += col_tile
+                hist[r] = np.bincount(codes.ravel(), minlength=cols * 256).reshape(cols, 256)
         
-        magnitude = np.sqrt(gx**2 + gy**2)
-        magnitude = (magnitude / magnitude.max() * 255).astype(np.uint8) if magnitude.max() > 0 else magnitude.astype(np.uint8)
+        run_bands(tile_row_histograms, rows, workers, th * cols * tw)
         
-        return gx, gy, magnitude
+        area = th * tw
+        if clip_limit > 0:
+            limit = max(int(clip_limit * area / 256), 1)
+            excess = np.maximum(hist - limit, 0).sum(axis=2, keepdims=True)
+            np.minimum(hist, limit, out=hist)
+            hist += excess // 256
+            # The remainder goes to every (256 // remainder)-th bin, as in
+            # OpenCV, rather than piling up in the darkest bins
+            residual = excess % 256
+            step = np.maximum(256 // np.maximum(residual, 1), 1)
+            bins = np.arange(256)
+            hist += (bins % step == 0) & (bins // step < residual)
+        
+        lut = np.clip(np.rint(np.cumsum(hist, axis=2) * (255.0 / area)), 0, 255)
+        lut = lut.astype(np.float32).reshape(-1)
+        
+        def blend_table(n, size, tiles):
+            pos = (np.arange(n) + 0.5) / size - 0.5
+            lo = np.clip(np.floor(pos).astype(np.intp), 0, tiles - 1)
+            hi = np.minimum(lo + 1, tiles - 1)
+            frac = np.clip(pos - lo, 0, 1).astype(np.float32)
+            return lo, hi, frac
+        
+        y0, y1, wy = blend_table(h, th, rows)
+        x0, x1, wx = blend_table(w, tw, cols)
+        
+        result = np.empty((h, w), dtype=np.uint8)
+        
+        def blend_rows(first, last):
+            for start in range(first * th, min(last * th, h), th):
+                band = slice(start, min(start + th, h))
+                values = img[band].astype(np.intp)
+                
+                def lookup(ty, tx):
+                    return lut[(ty[band, np.newaxis] * cols + tx) * 256 + values]
+                
+                top = lookup(y0, x0) * (1 - wx) + lookup(y0, x1) * wx
+                bottom = lookup(y1, x0) * (1 - wx) + lookup(y1, x1) * wx
+                fy = wy[band, np.newaxis]
+                result[band] = np.rint(top * (1 - fy) + bottom * fy).astype(np.uint8)
+        
+        run_bands(blend_rows, rows, workers, th * w)
+        return result
     
     @staticmethod
-    def compute_lbp(img, radius=1, n_points=8):
-        """Local Binary Pattern computation."""
+    def compute_gradient(img, output='all', num_bins=8, peak=None, workers=None):
+        """Compute image gradients using Sobel operators built from shifted slices.
+        
+        uint8 input accumulates in int16 (other types in float32); border
+        pixels are zero as before.
+        
+        Args:
+            output: 'all' for (gx, gy, magnitude), or only one of
+                'magnitude' (uint8, normalized to the maximum),
+                'direction' (float32 radians from arctan2) or
+                'bins' (uint8 orientation bins of 360 / num_bins degrees)
+            num_bins: number of orientation bins for output='bins'
+            peak: magnitude mapped to 255; defaults to the image maximum
+                (tiled runs pass the maximum of the whole image)
+            workers: threads for banded computation
+        """
+        if output not in ('all', 'magnitude', 'direction', 'bins'):
+            raise ValueError(f"Unknown gradient output: {output}")
+        
         h, w = img.shape
-        lbp = np.zeros_like(img, dtype=np.uint8)
+        acc = np.int16 if img.dtype in (np.uint8, np.int8, np.bool_) else np.float32
+        gx = np.zeros(img.shape, dtype=acc)
+        gy = np.zeros(img.shape, dtype=acc)
         
-        for i in range(radius, h - radius):
-            for j in range(radius, w - radius):
-                center = img[i, j]
-                pattern = 0
-                
-                for p in range(n_points):
-                    angle = 2 * np.pi * p / n_points
-                    x = j + radius * np.cos(angle)
-                    y = i - radius * np.sin(angle)
-                    
-                    x1, y1 = int(x), int(y)
-                    x2, y2 = min(x1 + 1, w - 1), min(y1 + 1, h - 1)
-                    
-                    dx, dy = x - x1, y - y1
-                    interpolated = (img[y1, x1] * (1 - dx) * (1 - dy) +
-                                   img[y1, x2] * dx * (1 - dy) +
-                                   img[y2, x1] * (1 - dx) * dy +
-                                   img[y2, x2] * dx * dy)
-                    
-                    if interpolated >= center:
-                        pattern |= (1 << p)
-                
-                lbp[i, j] = pattern
+        def sobel_rows(start, stop):
+            # Rows start..stop-1 of the interior, from a block with a 1 px halo
+            src = img[start:stop+2].astype(acc)
+            # Horizontal differences smoothed vertically, and vice versa
+            diff = src[:, 2:] - src[:, :-2]
+            gx[start+1:stop+1, 1:-1] = diff[:-2] + 2 * diff[1:-1] + diff[2:]
+            smooth = src[:, :-2] + 2 * src[:, 1:-1] + src[:, 2:]
+            gy[start+1:stop+1, 1:-1] = smooth[2:] - smooth[:-2]
         
-        return lbp
+        run_bands(sobel_rows, max(h - 2, 0), workers, w)
+        
+        if output in ('direction', 'bins'):
+            result = np.empty(img.shape, dtype=np.float32 if output == 'direction' else np.uint8)
+            
+            def direction_rows(start, stop):
+                direction = np.arctan2(gy[start:stop], gx[start:stop], dtype=np.float32)
+                if output == 'direction':
+                    result[start:stop] = direction
+                    return
+                degrees = np.degrees(direction, out=direction)
+                degrees %= np.float32(360.0)
+                degrees /= np.float32(360.0 / num_bins)
+                result[start:stop] = np.floor(degrees).astype(np.uint8) % num_bins
+            
+            run_bands(direction_rows, h, workers, w)
+            return result
+        
+        wide = np.int32 if acc == np.int16 else np.float32
+        
+        def squared_rows(start, stop):
+            sq = np.square(gx[start:stop], dtype=wide)
+            sq += np.square(gy[start:stop], dtype=wide)
+            return sq
+        
+        def peak_rows(start, stop):
+            return squared_rows(start, stop).max(initial=0)
+        
+        if peak is None:
+            # First pass only finds the peak; squares are cheaper to redo
+            # than a full-image float buffer is to keep
+            peak = float(np.sqrt(max(run_bands(peak_rows, h, workers, w))))
+        scale = np.float32(255.0 / peak) if peak > 0 else np.float32(1.0)
+        magnitude = np.empty(img.shape, dtype=np.uint8)
+        
+        def magnitude_rows(start, stop):
+            band = np.sqrt(squared_rows(start, stop), dtype=np.float32)
+            band *= scale
+            magnitude[start:stop] = band
+        
+        run_bands(magnitude_rows, h, workers, w)
+        
+        if output == 'magnitude':
+            return magnitude
+        return gx, gy, magnitude
     
     @staticmethod
-    def compute_glcm(img, distance=1, angle=0, levels=32):
-        """Improved GLCM computation with quantization for performance."""
-        if len(img.shape) != 2:
-            raise ValueError("GLCM expects a 2D grayscale image.")
+    @_cached('lbp', 1)
+    def compute_lbp(img, radius=1, n_points=8, method='default', workers=None, progress=None):
+        """Local Binary Pattern computation.
         
-        # Quantize image to [0, levels-1]
-        img_q = np.floor(img.astype(np.float32) * (levels / 256.0)).astype(np.int32)
-        img_q = np.clip(img_q, 0, levels - 1).astype(np.uint8)
+        The image is compared against one shifted, bilinearly interpolated
+        neighbour plane per sampling point. Sampling offsets and weights are
+        cached per (radius, n_points).
         
-        # angles according to lecture: 0, 45, 90, 135 degrees
-        angles = [0, np.pi/4, np.pi/2, 3*np.pi/4]
-        dists = [distance]
+        Args:
+            method: 'default' for raw codes, 'uniform' for the u2 mapping
+                (P*(P-1)+3 labels) or 'riu2' for rotation-invariant uniform
+                patterns (P+2 labels)
+            workers: threads for banded computation
+            progress: optional ProgressToken, updated after every sampling
+                point of every band
+        """
+        h, w = img.shape
+        border = int(np.ceil(radius))
+        code_dtype = _lbp_code_dtype(n_points)
+        lbp = np.zeros((h, w), dtype=code_dtype)
+        if h <= 2 * border or w <= 2 * border:
+            return lbp if method == 'default' else _lbp_mapping(n_points, method)[lbp]
+        
+        sampling = _lbp_sampling(radius, n_points)
+        advance = as_progress(progress).counter((h - 2 * border) * n_points)
         
-        # compute GLCM using skimage
-        glcm_ski = graycomatrix(img_q, distances=dists, angles=angles, levels=levels,
-                                symmetric=True, normed=False)
-        # sum over distances and angles to get aggregated matrix
-        glcm_sum = np.sum(glcm_ski[:, :, 0, :], axis=2).astype(np.float64)
+        def lbp_rows(start, stop):
+            # Interior rows border+start .. border+stop-1
+            def plane(dy, dx):
+                return img[border+start+dy:border+stop+dy, border+dx:w-border+dx]
+            
+            center = plane(0, 0)
+            center_fixed = center.astype(np.int32) << _LBP_WEIGHT_BITS
+            codes = lbp[border+start:border+stop, border:w-border]
+            for p, (fy, fx, weights) in enumerate(sampling):
+                terms = [(wt, fy + ty, fx + tx) for wt, (ty, tx) in
+                         zip(weights, ((0, 0), (0, 1), (1, 0), (1, 1))) if wt != 0]
+                if len(terms) == 1:
+                    # Sampling point on the pixel grid: compare directly
+                    brighter = plane(terms[0][1], terms[0][2]) >= center
+                else:
+                    # Fixed-point weights sum exactly to 1, so flat regions
+                    # compare equal instead of depending on rounding noise
+                    interpolated = np.zeros(center.shape, dtype=np.int32)
+                    for wt, dy, dx in terms:
+                        interpolated += np.int32(wt) * plane(dy, dx)
+                    brighter = interpolated >= center_fixed
+                codes |= brighter.astype(code_dtype) << code_dtype(p)
+                advance(stop - start)
         
-        # ensure symmetry
-        glcm_sum = glcm_sum + glcm_sum.T
+        run_bands(lbp_rows, h - 2 * border, workers, w * n_points)
+        
+        if method != 'default':
+            lbp = _lbp_mapping(n_points, method)[lbp]
+        return lbp
+
+    @staticmethod
+    def lbp_histogram(lbp, n_bins, tile_size=None, normalize=True):
+        """Histogram of LBP codes, globally or per tile.
+        
+        Args:
+            lbp: 2D array of LBP codes or mapped labels
+            n_bins: number of code values (2**P, P*(P-1)+3 or P+2)
+            tile_size: None for one global histogram, or int / (th, tw) for a
+                (rows, cols, n_bins) array with one histogram per tile
+            normalize: divide every histogram by its pixel count
+        """
+        if tile_size is None:
+            hist = np.bincount(lbp.ravel(), minlength=n_bins).astype(np.float64)
+            return hist / max(hist.sum(), 1) if normalize else hist
+        
+        th, tw = (tile_size, tile_size) if np.isscalar(tile_size) else tile_size
+        h, w = lbp.shape
+        rows, cols = -(-h // th), -(-w // tw)
+        col_tile = (np.arange(w) // tw) * n_bins
+        hists = np.zeros((rows, cols, n_bins), dtype=np.float64)
+        for r in range(rows):
+            band = lbp[r*th:(r+1)*th].astype(np.intp)
+            band += col_tile
+            hists[r] = np.bincount(band.ravel(), minlength=cols * n_bins).reshape(cols, n_bins)
+        if normalize:
+            hists /= np.maximum(hists.sum(axis=2, keepdims=True), 1)
+        return hists
+    
+    @staticmethod
+    def compute_glcm(img, distance=1, angle=0, levels=32):
+        """Improved GLCM computation with quantization for performance.
+        
+        Co-occurrences for the four lecture angles (0, 45, 90, 135 degrees)
+        at ``distance`` are summed into one symmetric, normalized matrix.
+        """
+        glcm = CustomImageProcessing.compute_glcm_stack(
+            img, distances=[distance], levels=levels, symmetric=True, normed=False)
+        glcm_sum = glcm[0].sum(axis=0)
         
         # normalize to convert counts to probabilities
         s = glcm_sum.sum()
@@ -181,339 +723,699 @@ class CustomImageProcessing:
         
         return glcm_norm
 
+    @staticmethod
+    @_cached('glcm_stack', 1)
+    def compute_glcm_stack(img, distances=(1,), angles=GLCM_ANGLES, levels=32, symmetric=True, normed=True):
+        """Co-occurrence matrices for every (distance, angle) pair.
+        
+        The image is quantized once; each pair's matrix is a single bincount
+        over combined codes ``first * levels + second`` of the offset image
+        pairs. Offsets follow skimage: (round(sin(a) * d), round(cos(a) * d))
+        in (row, col).
+        
+        Returns:
+            float64 array (len(distances), len(angles), levels, levels)
+        """
+        if len(img.shape) != 2:
+            raise ValueError("GLCM expects a 2D grayscale image.")
+        
+        img_q = _quantize_levels(img, levels)
+        h, w = img_q.shape
+        first_codes = img_q.astype(np.intp) * levels
+        
+        glcm = np.zeros((len(distances), len(angles), levels, levels), dtype=np.float64)
+        for d_idx, distance in enumerate(distances):
+            for a_idx, angle in enumerate(angles):
+                dr = int(round(np.sin(angle) * distance))
+                dc = int(round(np.cos(angle) * distance))
+                rows = slice(max(0, -dr), h - max(0, dr))
+                cols = slice(max(0, -dc), w - max(0, dc))
+                rows2 = slice(rows.start + dr, rows.stop + dr)
+                cols2 = slice(cols.start + dc, cols.stop + dc)
+                codes = first_codes[rows, cols] + img_q[rows2, cols2]
+                glcm[d_idx, a_idx] = np.bincount(codes.ravel(), minlength=levels * levels).reshape(levels, levels)
+        
+        if symmetric:
+            glcm += np.swapaxes(glcm, -1, -2).copy()
+        if normed:
+            totals = glcm.sum(axis=(-2, -1), keepdims=True)
+            np.divide(glcm, totals, out=glcm, where=totals > 0)
+        
+        return glcm
+
+    @staticmethod
+    @_cached('glcm_texture_maps', 1)
+    def glcm_texture_maps(img, window=32, step=8, distance=1, angle=0, levels=32,
+                          properties=('contrast', 'homogeneity', 'energy', 'correlation'),
+                          full_size=False, progress=None):
+        """Per-window GLCM property maps for localizing texture changes.
+        
+        Windows of ``window`` x ``window`` pixels are placed every ``step``
+        pixels. Co-occurrence counts are kept per column segment for the
+        current band of window rows; moving down one step only adds the
+        entering rows and subtracts the leaving ones, and every window in a
+        band is a difference of running column sums, so no window is ever
+        rebuilt from its pixels.
+        
+        Args:
+            properties: any of 'contrast', 'dissimilarity', 'homogeneity',
+                'energy', 'correlation'
+            full_size: expand each map to the image shape (nearest window
+                centre) so it can be passed to create_feature_overlay
+            progress: optional ProgressToken, updated after every row of
+                windows
+            
+        Returns:
+            dict: property name -> float map of shape (rows, cols) or the
+            image shape
+        """
+        if len(img.shape) != 2:
+            raise ValueError("GLCM expects a 2D grayscale image.")
+        
+        h, w = img.shape
+        n_rows = (h - window) // step + 1 if h >= window else 0
+        n_cols = (w - window) // step + 1 if w >= window else 0
+        maps = {name: np.zeros((n_rows, n_cols), dtype=np.float32) for name in properties}
+        unknown = set(properties) - set(_GLCM_PROPERTY_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown GLCM properties: {sorted(unknown)}")
+        
+        progress = as_progress(progress)
+        if n_rows > 0 and n_cols > 0:
+            img_q = _quantize_levels(img, levels)
+            dr = int(round(np.sin(angle) * distance))
+            dc = int(round(np.cos(angle) * distance))
+            # Window-relative range of first pixels whose partner is inside
+            row_lo, row_hi = max(0, -dr), window - max(0, dr)
+            col_lo, col_hi = max(0, -dc), window - max(0, dc)
+            
+            # Pair codes for every valid first pixel (invalid ones are unused)
+            pair = np.zeros((h, w), dtype=np.intp)
+            rows = slice(max(0, -dr), h - max(0, dr))
+            cols = slice(max(0, -dc), w - max(0, dc))
+            pair[rows, cols] = (img_q[rows, cols].astype(np.intp) * levels +
+                                img_q[rows.start+dr:rows.stop+dr, cols.start+dc:cols.stop+dc])
+            
+            # Column segments delimited by every window's first-pixel bounds
+            starts = np.arange(n_cols) * step + col_lo
+            stops = np.arange(n_cols) * step + col_hi
+            bounds = np.unique(np.concatenate([[0, w], starts, stops]))
+            segment_codes = (np.searchsorted(bounds, np.arange(w), side='right') - 1) * levels * levels
+            start_idx = np.searchsorted(bounds, starts)
+            stop_idx = np.searchsorted(bounds, stops)
+            n_bins = len(bounds) * levels * levels
+            
+            def band_counts(r0, r1):
+                codes = pair[r0:r1] + segment_codes
+                return np.bincount(codes.ravel(), minlength=n_bins).reshape(len(bounds), -1)
+            
+            counts = band_counts(row_lo, row_hi)
+            for r in range(n_rows):
+                if r > 0:
+                    top = (r - 1) * step
+                    counts -= band_counts(top + row_lo, top + step + row_lo)
+                    counts += band_counts(top + row_hi, top + step + row_hi)
+                
+                running = np.zeros((len(bounds) + 1, levels * levels), dtype=np.int64)
+                np.cumsum(counts, axis=0, out=running[1:])
+                glcm = (running[stop_idx] - running[start_idx]).astype(np.float64).reshape(-1, levels, levels)
+                glcm += np.swapaxes(glcm, 1, 2).copy()
+                totals = glcm.sum(axis=(1, 2), keepdims=True)
+                np.divide(glcm, totals, out=glcm, where=totals > 0)
+                
+                values = dict(zip(_GLCM_PROPERTY_NAMES, CustomImageProcessing.glcm_properties(glcm)))
+                for name in properties:
+                    maps[name][r] = values[name]
+                progress.update((r + 1) / n_rows)
+        
+        if full_size:
+            centers_y = np.clip(np.rint((np.arange(h) - window / 2) / step), 0, max(n_rows - 1, 0)).astype(np.intp)
+            centers_x = np.clip(np.rint((np.arange(w) - window / 2) / step), 0, max(n_cols - 1, 0)).astype(np.intp)
+            for name in properties:
+                grid = maps[name]
+                maps[name] = (grid[centers_y[:, np.newaxis], centers_x] if grid.size
+                              else np.zeros((h, w), dtype=np.float32))
+        
+        return maps
+
     @staticmethod
     def glcm_properties(glcm):
-        """Calculate GLCM texture properties."""
-        levels = glcm.shape[0]
-        i_idx, j_idx = np.meshgrid(np.arange(levels), np.arange(levels), indexing='ij')
-        
-        # contrast
-        contrast = np.sum(glcm * (i_idx - j_idx) ** 2)
-        # dissimilarity
-        dissimilarity = np.sum(glcm * np.abs(i_idx - j_idx))
-        # homogeneity (inverse difference moment)
-        homogeneity = np.sum(glcm / (1.0 + (i_idx - j_idx) ** 2))
+        """Calculate GLCM texture properties.
+        
+        Accepts a single (L, L) matrix or any stack (..., L, L) of normalized
+        matrices; linear statistics of the whole stack come from one product
+        with cached index-weight grids.
+        
+        Returns:
+            tuple: (contrast, dissimilarity, homogeneity, energy, correlation),
+            scalars for a single matrix or arrays shaped like the stack
+        """
+        glcm = np.asarray(glcm, dtype=np.float64)
+        levels = glcm.shape[-1]
+        flat = glcm.reshape(-1, levels * levels)
+        
+        moments = flat @ _glcm_weight_grids(levels)
+        contrast, dissimilarity, homogeneity, mu_i, mu_j, ii, jj, ij = moments.T
+        
         # ASM & energy
-        asm = np.sum(glcm ** 2)
+        asm = np.einsum('ij,ij->i', flat, flat)
         energy = np.sqrt(asm)
         
-        # means
-        mu_i = np.sum(i_idx * glcm)
-        mu_j = np.sum(j_idx * glcm)
-        # standard deviations
-        sigma_i = np.sqrt(np.sum(((i_idx - mu_i) ** 2) * glcm))
-        sigma_j = np.sqrt(np.sum(((j_idx - mu_j) ** 2) * glcm))
-        
-        # correlation
-        if sigma_i > 0 and sigma_j > 0:
-            correlation = np.sum((i_idx - mu_i) * (j_idx - mu_j) * glcm) / (sigma_i * sigma_j)
-        else:
-            correlation = 0.0
+        # standard deviations and correlation
+        sigma_i = np.sqrt(np.maximum(ii - mu_i ** 2, 0))
+        sigma_j = np.sqrt(np.maximum(jj - mu_j ** 2, 0))
+        valid = (sigma_i > 1e-9) & (sigma_j > 1e-9)
+        correlation = np.zeros_like(contrast)
+        correlation[valid] = (ij[valid] - mu_i[valid] * mu_j[valid]) / (sigma_i[valid] * sigma_j[valid])
         
-        return contrast, dissimilarity, homogeneity, energy, correlation
+        shape = glcm.shape[:-2]
+        return tuple(prop.reshape(shape)[()] for prop in
+                     (contrast, dissimilarity, homogeneity, energy, correlation))
 
     @staticmethod
-    def gaussian_blur(img, sigma):
-        """Gaussian blur implementation."""
+    def gaussian_blur(img, sigma, method='auto', workers=None):
+        """Separable Gaussian blur with edge-replicate padding.
+
+        The 1-D kernel for ``sigma`` is cached and applied along columns and
+        then rows. ``method`` selects direct shifted-slice accumulation
+        ('direct'), FFT convolution ('fft'), or picks whichever is cheaper for
+        the kernel radius and image size ('auto'). Each pass is split into
+        independent bands across ``workers`` threads.
+        """
         if sigma <= 0:
             return img.astype(np.float32)
         
-        radius = int(3 * sigma)
-        kernel_size = 2 * radius + 1
-        ax = np.arange(-radius, radius + 1)
-        xx, yy = np.meshgrid(ax, ax)
-        kernel = np.exp(-(xx**2 + yy**2) / (2.0 * sigma * sigma))
-        kernel = kernel / np.sum(kernel)
-        h, w = img.shape
-        pad = radius
-        padded = np.pad(img, pad, mode='edge').astype(np.float32)
-        result = np.zeros((h, w), dtype=np.float32)
+        kernel = _gaussian_kernel_1d(float(sigma))
+        radius = len(kernel) // 2
         
-        for i in range(h):
-            for j in range(w):
-                region = padded[i:i+kernel_size, j:j+kernel_size]
-                result[i, j] = np.sum(region * kernel)
+        if method == 'auto':
+            method = 'fft' if _prefer_fft(radius, max(img.shape)) else 'direct'
+        if method == 'fft':
+            # The FFT path caches the kernel spectrum by sigma
+            def convolve(block, axis):
+                return _convolve_axis_fft(block, kernel, float(sigma), axis)
+        elif method == 'direct':
+            def convolve(block, axis):
+                return _convolve_axis_direct(block, kernel, axis)
+        else:
+            raise ValueError(f"Unknown blur method: {method}")
+        
+        result = img.astype(np.float32)
+        for axis in (0, 1):
+            pad = [(0, 0), (0, 0)]
+            pad[axis] = (radius, radius)
+            padded = np.pad(result, pad, mode='edge')
+            blurred = np.empty(result.shape, dtype=np.float32)
+            
+            # Bands run along the axis that is not being convolved
+            def convolve_band(start, stop):
+                index = [slice(None), slice(None)]
+                index[1 - axis] = slice(start, stop)
+                index = tuple(index)
+                blurred[index] = convolve(padded[index], axis)
+            
+            run_bands(convolve_band, result.shape[1 - axis], workers, result.shape[axis])
+            result = blurred
         
         return result
 
     @staticmethod
     def compute_keypoint_orientation(img, y, x, keypoint_sigma, num_bins=36):
-        """Orientation assignment for keypoints."""
-        h, w = img.shape
-        sigma_win = 1.5 * keypoint_sigma
-        radius = int(3 * sigma_win)
-        if radius < 1:
-            return [0.0]
-        
-        hist = np.zeros(num_bins, dtype=np.float32)
-        
-        for dy in range(-radius, radius+1):
-            for dx in range(-radius, radius+1):
-                yy = y + dy
-                xx = x + dx
-                if yy <= 0 or yy >= h-1 or xx <= 0 or xx >= w-1:
-                    continue
-                gx = img[yy, xx+1] - img[yy, xx-1]
-                gy = img[yy+1, xx] - img[yy-1, xx]
-                mag = np.sqrt(gx*gx + gy*gy)
-                if mag == 0:
-                    continue
-                angle = np.degrees(np.arctan2(gy, gx)) % 360.0
-                weight = np.exp(-(dx*dx + dy*dy) / (2 * sigma_win * sigma_win)) * mag
-                bin_idx = int(np.floor(angle / (360.0 / num_bins))) % num_bins
-                hist[bin_idx] += weight
-        
-        hist_sm = np.zeros_like(hist)
-        for i in range(num_bins):
-            hist_sm[i] = (hist[i-1] + hist[i] + hist[(i+1) % num_bins]) / 3.0
-        
-        max_val = hist_sm.max() if hist_sm.max() > 0 else 0.0
-        orientations = []
-        
-        for i in range(num_bins):
-            prev_v = hist_sm[i-1]
-            next_v = hist_sm[(i+1) % num_bins]
-            if hist_sm[i] >= 0.8 * max_val and hist_sm[i] > prev_v and hist_sm[i] > next_v:
-                denom = (prev_v - 2*hist_sm[i] + next_v)
-                if denom == 0:
-                    offset = 0.0
-                else:
-                    offset = 0.5 * (prev_v - next_v) / denom
-                angle = ((i + offset) * (360.0 / num_bins)) % 360.0
-                orientations.append(angle)
+        """Orientation assignment for a single keypoint.
+        
+        Gradients are computed on the keypoint's window only; use
+        ``compute_keypoint_orientations`` with the level's maps for many
+        keypoints.
+        """
+        radius = int(3 * (1.5 * keypoint_sigma))
+        magnitude, orientation, y0, x0 = _gradient_patch(img, y, x, radius)
+        _, angles = CustomImageProcessing.compute_keypoint_orientations(
+            magnitude, orientation, np.array([y]), np.array([x]), np.array([keypoint_sigma]), num_bins,
+            origin=(y0, x0))
+        return [float(a) for a in angles]
+
+    @staticmethod
+    def compute_keypoint_orientations(magnitude, orientation, ys, xs, keypoint_sigmas, num_bins=36,
+                                      origin=(0, 0)):
+        """Orientation assignment for all keypoints of one Gaussian level.
+        
+        Args:
+            magnitude, orientation: maps from ``gradient_polar`` for the level
+            ys, xs: integer keypoint positions
+            keypoint_sigmas: keypoint scale in level pixels
+            origin: level position (row, column) of the maps' first pixel,
+                when they cover only a patch of the level
+            
+        Returns:
+            tuple: (owners, angles) where owners[m] indexes the keypoint that
+            orientation angles[m] belongs to, in keypoint then peak order
+        """
+        h, w = magnitude.shape
+        ys = np.asarray(ys, dtype=np.intp)
+        xs = np.asarray(xs, dtype=np.intp)
+        sigma_win = 1.5 * np.asarray(keypoint_sigmas, dtype=np.float64)
+        radii = (3 * sigma_win).astype(np.intp)
+        n = len(ys)
+        bin_width = 360.0 / num_bins
+        
+        hist = np.zeros((n, num_bins), dtype=np.float32)
+        for radius in np.unique(radii[radii >= 1]):
+            sel = np.nonzero(radii == radius)[0]
+            offs = np.arange(-radius, radius + 1)
+            dy, dx = [a.ravel() for a in np.meshgrid(offs, offs, indexing='ij')]
+            yy = ys[sel, np.newaxis] + dy - origin[0]
+            xx = xs[sel, np.newaxis] + dx - origin[1]
+            inside = (yy > 0) & (yy < h-1) & (xx > 0) & (xx < w-1)
+            yy = np.clip(yy, 0, h-1)
+            xx = np.clip(xx, 0, w-1)
+            
+            sw = sigma_win[sel, np.newaxis]
+            weight = np.exp(-(dx*dx + dy*dy) / (2 * sw * sw)) * magnitude[yy, xx] * inside
+            bins = (np.floor(orientation[yy, xx] / bin_width).astype(np.intp) % num_bins)
+            bins += np.arange(len(sel))[:, np.newaxis] * num_bins
+            hist[sel] = np.bincount(bins.ravel(), weight.ravel(),
+                                    minlength=len(sel) * num_bins).reshape(-1, num_bins)
+        
+        prev_h = np.roll(hist, 1, axis=1)
+        next_h = np.roll(hist, -1, axis=1)
+        hist_sm = (prev_h + hist + next_h) / 3.0
+        prev_v = np.roll(hist_sm, 1, axis=1)
+        next_v = np.roll(hist_sm, -1, axis=1)
+        
+        max_val = hist_sm.max(axis=1, keepdims=True)
+        peaks = (hist_sm >= 0.8 * max_val) & (hist_sm > prev_v) & (hist_sm > next_v)
+        peaks[radii < 1] = False
+        
+        denom = prev_v - 2 * hist_sm + next_v
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offset = np.where(denom == 0, 0.0, 0.5 * (prev_v - next_v) / denom)
+        angles = ((np.arange(num_bins) + offset) * bin_width) % 360.0
         
-        if not orientations:
-            i = int(np.argmax(hist_sm))
-            orientations = [i * (360.0 / num_bins)]
+        # Keypoints without a peak fall back to the strongest bin (bin 0 for
+        # windows too small to sample)
+        fallback = ~peaks.any(axis=1)
+        best = np.where(radii < 1, 0, np.argmax(hist_sm, axis=1))
+        peaks[fallback, best[fallback]] = True
+        angles[fallback, best[fallback]] = best[fallback] * bin_width
         
-        return orientations
+        owners, bins = np.nonzero(peaks)
+        return owners, angles[owners, bins]
 
     @staticmethod
     def _compute_keypoint_descriptor(gaussian_img, x, y, scale, orientation_deg, descriptor_size=16, grid_size=4, num_bins=8):
-        """Build 128-D descriptor around keypoint."""
-        h, w = gaussian_img.shape
+        """Build 128-D descriptor around a single keypoint.
+        
+        Gradients are computed on the sampled window only.
+        """
+        radius = int(np.ceil(descriptor_size // 2 * scale)) + 1
+        magnitude, orientation, y0, x0 = _gradient_patch(gaussian_img, int(np.floor(y)), int(np.floor(x)), radius)
+        return CustomImageProcessing._compute_keypoint_descriptors(
+            magnitude, orientation, np.array([x]), np.array([y]), np.array([scale]),
+            np.array([orientation_deg]), descriptor_size, grid_size, num_bins, origin=(y0, x0))[0]
+
+    @staticmethod
+    def _compute_keypoint_descriptors(magnitude, orientation, xs, ys, scales, orientations_deg,
+                                      descriptor_size=16, grid_size=4, num_bins=8, chunk_size=2048,
+                                      origin=(0, 0)):
+        """Build 128-D descriptors for all keypoints of one Gaussian level.
+        
+        Samples of every keypoint are rotated and binned together; the
+        trilinear contributions go into one bincount per chunk of keypoints.
+        Sample positions are rounded in level coordinates and only then
+        shifted by ``origin``, the level position (row, column) of the maps'
+        first pixel, so maps of a patch give the same result as whole maps.
+        
+        Returns:
+            float32 array (N, grid_size * grid_size * num_bins)
+        """
+        h, w = magnitude.shape
         half = descriptor_size // 2
         bin_width = 360.0 / num_bins
+        subregion_width = descriptor_size / grid_size
+        desc_len = grid_size * grid_size * num_bins
         
-        theta = np.radians(orientation_deg)
-        cos_t = np.cos(-theta)
-        sin_t = np.sin(-theta)
+        offs = np.arange(-half, half)
+        si, sj = [a.ravel() for a in np.meshgrid(offs, offs, indexing='ij')]
         
-        weight_sigma = 0.5 * descriptor_size
-        hist_tensor = np.zeros((grid_size, grid_size, num_bins), dtype=np.float32)
-        subregion_width = descriptor_size / grid_size
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        scales = np.asarray(scales, dtype=np.float64)
+        orientations_deg = np.asarray(orientations_deg, dtype=np.float64)
+        descriptors = np.zeros((len(xs), desc_len), dtype=np.float32)
         
-        for i in range(-half, half):
-            for j in range(-half, half):
-                sample_x = x + (j * scale)
-                sample_y = y + (i * scale)
-                
-                dx = sample_x - x
-                dy = sample_y - y
-                rx = cos_t * dx - sin_t * dy
-                ry = sin_t * dx + cos_t * dy
-                
-                bin_xf = (rx + half) / subregion_width
-                bin_yf = (ry + half) / subregion_width
-                
-                if bin_xf < -0.5 or bin_xf > grid_size - 0.5 or bin_yf < -0.5 or bin_yf > grid_size - 0.5:
-                    continue
-                
-                sx = int(round(sample_x))
-                sy = int(round(sample_y))
-                if sx <= 0 or sx >= w-1 or sy <= 0 or sy >= h-1:
-                    continue
-                
-                gx = gaussian_img[sy, sx+1] - gaussian_img[sy, sx-1]
-                gy = gaussian_img[sy+1, sx] - gaussian_img[sy-1, sx]
-                mag = np.sqrt(gx*gx + gy*gy)
-                if mag == 0:
-                    continue
-                
-                angle = (np.degrees(np.arctan2(gy, gx)) - orientation_deg) % 360.0
-                bin_ori = angle / bin_width
-                
-                bx = bin_xf
-                by = bin_yf
-                bo = bin_ori
-                
-                ix = int(np.floor(bx))
-                iy = int(np.floor(by))
-                io = int(np.floor(bo)) % num_bins
-                dx_f = bx - ix
-                dy_f = by - iy
-                do_f = bo - np.floor(bo)
-                
-                wx = np.exp(-((rx)**2 + (ry)**2) / (2 * (0.5 * descriptor_size)**2))
-                weight = mag * wx
-                
-                for dx_i, wx_i in ((0, 1-dx_f), (1, dx_f)):
-                    cx = ix + dx_i
-                    if cx < 0 or cx >= grid_size: 
-                        continue
-                    for dy_i, wy_i in ((0, 1-dy_f), (1, dy_f)):
-                        cy = iy + dy_i
-                        if cy < 0 or cy >= grid_size:
-                            continue
-                        for do_i, wo_i in ((0, 1-do_f), (1, do_f)):
-                            co = (io + do_i) % num_bins
-                            hist_tensor[cy, cx, co] += weight * wx_i * wy_i * wo_i
-        
-        desc = hist_tensor.reshape(-1)
-        norm = np.linalg.norm(desc)
-        if norm > 1e-8:
-            desc = desc / norm
-            desc = np.minimum(desc, 0.2)
-            norm2 = np.linalg.norm(desc)
-            if norm2 > 1e-8:
-                desc = desc / norm2
-        
-        return desc.astype(np.float32)
+        for start in range(0, len(xs), chunk_size):
+            stop = min(start + chunk_size, len(xs))
+            n = stop - start
+            x = xs[start:stop, np.newaxis]
+            y = ys[start:stop, np.newaxis]
+            scale = scales[start:stop, np.newaxis]
+            ori_deg = orientations_deg[start:stop, np.newaxis]
+            
+            theta = np.radians(ori_deg)
+            cos_t = np.cos(-theta)
+            sin_t = np.sin(-theta)
+            
+            sample_x = x + sj * scale
+            sample_y = y + si * scale
+            dx = sample_x - x
+            dy = sample_y - y
+            rx = cos_t * dx - sin_t * dy
+            ry = sin_t * dx + cos_t * dy
+            
+            bx = (rx + half) / subregion_width
+            by = (ry + half) / subregion_width
+            sx = np.rint(sample_x).astype(np.intp) - origin[1]
+            sy = np.rint(sample_y).astype(np.intp) - origin[0]
+            valid = ((bx >= -0.5) & (bx <= grid_size - 0.5) & (by >= -0.5) & (by <= grid_size - 0.5) &
+                     (sx > 0) & (sx < w-1) & (sy > 0) & (sy < h-1))
+            sx = np.clip(sx, 0, w-1)
+            sy = np.clip(sy, 0, h-1)
+            
+            mag = magnitude[sy, sx] * valid
+            bo = ((orientation[sy, sx] - ori_deg) % 360.0) / bin_width
+            
+            ix = np.floor(bx).astype(np.intp)
+            iy = np.floor(by).astype(np.intp)
+            io = np.floor(bo).astype(np.intp) % num_bins
+            dx_f = bx - ix
+            dy_f = by - iy
+            do_f = bo - np.floor(bo)
+            
+            weight = mag * np.exp(-(rx**2 + ry**2) / (2 * (0.5 * descriptor_size)**2))
+            row = np.arange(n)[:, np.newaxis] * desc_len
+            
+            idx_parts = []
+            weight_parts = []
+            for dx_i, wx_i in ((0, 1-dx_f), (1, dx_f)):
+                cx = ix + dx_i
+                for dy_i, wy_i in ((0, 1-dy_f), (1, dy_f)):
+                    cy = iy + dy_i
+                    ok = valid & (cx >= 0) & (cx < grid_size) & (cy >= 0) & (cy < grid_size)
+                    for do_i, wo_i in ((0, 1-do_f), (1, do_f)):
+                        co = (io + do_i) % num_bins
+                        idx = row + (cy * grid_size + cx) * num_bins + co
+                        idx_parts.append(idx[ok])
+                        weight_parts.append((weight * wx_i * wy_i * wo_i)[ok])
+            
+            descriptors[start:stop] = np.bincount(
+                np.concatenate(idx_parts), np.concatenate(weight_parts),
+                minlength=n * desc_len).reshape(n, desc_len)
+        
+        norm = np.linalg.norm(descriptors, axis=1, keepdims=True)
+        ok = norm[:, 0] > 1e-8
+        descriptors[ok] /= norm[ok]
+        np.minimum(descriptors, 0.2, out=descriptors, where=ok[:, np.newaxis])
+        norm2 = np.linalg.norm(descriptors, axis=1, keepdims=True)
+        ok &= norm2[:, 0] > 1e-8
+        descriptors[ok] /= norm2[ok]
+        
+        return descriptors
+
+    @staticmethod
+    def build_scale_space(img, num_octaves=5, scales_per_octave=4, sigma=1.6, workers=None, progress=None):
+        """Build the SIFT Gaussian/DoG pyramid incrementally.
+        
+        Each level is blurred from the previous one with only the missing
+        sigma, sqrt(sigma_i^2 - sigma_{i-1}^2), so every level costs a small
+        kernel. The next octave starts from level ``scales_per_octave``
+        decimated by two, and like the original per-level blurs, its first
+        level blurs that base by the full ``sigma`` again.
+        
+        Args:
+            progress: optional ProgressToken, updated after every level,
+                weighted by level area
+        
+        Returns:
+            list of ScaleSpaceOctave
+        """
+        k = 2 ** (1.0 / scales_per_octave)
+        num_scales = scales_per_octave + 3
+        sigmas = [sigma * (k ** i) for i in range(num_scales)]
+        increments = [sigmas[0]] + [np.sqrt(sigmas[i] ** 2 - sigmas[i-1] ** 2)
+                                    for i in range(1, num_scales)]
+        
+        progress = as_progress(progress)
+        # Every octave has a quarter of the previous one's pixels
+        total_area = sum(4.0 ** -o for o in range(num_octaves)) * num_scales
+        done_area = 0.0
+        
+        octaves = []
+        base = img.astype(np.float32)
+        for o in range(num_octaves):
+            gaussians = np.empty((num_scales,) + base.shape, dtype=np.float32)
+            level = base
+            for i, sigma_inc in enumerate(increments):
+                level = CustomImageProcessing.gaussian_blur(level, sigma_inc, workers=workers)
+                gaussians[i] = level
+                done_area += 4.0 ** -o
+                progress.update(done_area / total_area)
+            
+            octaves.append(ScaleSpaceOctave(o, sigmas, gaussians))
+            base = gaussians[scales_per_octave][::2, ::2]
+        
+        return octaves
 
     @staticmethod
-    def compute_sift_keypoints(img, num_octaves=5, scales_per_octave=4, sigma=1.6, contrast_threshold=0.01, edge_threshold=10):
-        """Enhanced SIFT keypoint detector with descriptors."""
+    def _detect_extrema(dogs, threshold, border=3, rows=None):
+        """Find 26-neighbour DoG extrema over a whole octave at once.
+        
+        A 3x3x3 max/min filter is evaluated for every interior layer of the
+        (num_dogs, H, W) stack using shifted slices, and combined with the
+        contrast threshold into a single mask.
+        
+        Args:
+            rows: optional (start, stop) restricting candidate centre rows,
+                so that row bands of one octave yield disjoint candidates
+        
+        Returns:
+            int array (N, 3) of (scale, row, col) candidates in scan order
+        """
+        num_dogs, H, W = dogs.shape
+        top, bottom = border, H - border
+        if rows is not None:
+            top, bottom = max(top, rows[0]), min(bottom, rows[1])
+        if num_dogs < 3 or bottom <= top or W <= 2 * border:
+            return np.empty((0, 3), dtype=np.intp)
+        
+        # Only the rows/cols needed for centres in [top, bottom)
+        window = dogs[:, top-1:bottom+1, border-1:W-border+1]
+        
+        def filter3(op):
+            across = op(op(window[:-2], window[1:-1]), window[2:])
+            rows = op(op(across[:, :-2], across[:, 1:-1]), across[:, 2:])
+            return op(op(rows[:, :, :-2], rows[:, :, 1:-1]), rows[:, :, 2:])
+        
+        center = dogs[1:-1, top:bottom, border:W-border]
+        is_max = (center > 0) & (center >= filter3(np.maximum))
+        is_min = (center <= 0) & (center <= filter3(np.minimum))
+        mask = (is_max | is_min) & (np.abs(center) >= threshold)
+        
+        coords = np.stack(np.nonzero(mask), axis=1)
+        coords += (1, top, border)
+        return coords
+    
+    @staticmethod
+    def _refine_extrema(dogs, coords, contrast_threshold, edge_threshold):
+        """Sub-pixel refinement and filtering of extremum candidates.
+        
+        Gradients and Hessians of all candidates are gathered at once and the
+        (N, 3, 3) systems are solved in one batched call; singular Hessians
+        fall back to a zero offset.
+        
+        Returns:
+            tuple: (coords, offsets, responses) for the surviving candidates
+        """
+        s, i, j = coords.T
+        
+        def d(ds_, di, dj):
+            return dogs[s + ds_, i + di, j + dj]
+        
+        center = d(0, 0, 0)
+        g = np.stack([(d(0, 0, 1) - d(0, 0, -1)) * 0.5,
+                      (d(0, 1, 0) - d(0, -1, 0)) * 0.5,
+                      (d(1, 0, 0) - d(-1, 0, 0)) * 0.5], axis=1)
+        
+        dxx = d(0, 0, 1) + d(0, 0, -1) - 2.0 * center
+        dyy = d(0, 1, 0) + d(0, -1, 0) - 2.0 * center
+        dss = d(1, 0, 0) + d(-1, 0, 0) - 2.0 * center
+        dxy = (d(0, 1, 1) - d(0, 1, -1) - d(0, -1, 1) + d(0, -1, -1)) * 0.25
+        dxs = (d(1, 0, 1) - d(1, 0, -1) - d(-1, 0, 1) + d(-1, 0, -1)) * 0.25
+        dys = (d(1, 1, 0) - d(1, -1, 0) - d(-1, 1, 0) + d(-1, -1, 0)) * 0.25
+        
+        H_mat = np.stack([np.stack([dxx, dxy, dxs], axis=1),
+                          np.stack([dxy, dyy, dys], axis=1),
+                          np.stack([dxs, dys, dss], axis=1)], axis=1).astype(np.float32)
+        
+        offsets = np.zeros((len(coords), 3), dtype=np.float32)
+        solvable = np.linalg.det(H_mat) != 0
+        if np.any(solvable):
+            offsets[solvable] = -np.linalg.solve(H_mat[solvable], g[solvable][..., np.newaxis])[..., 0]
+        offsets = np.clip(offsets, -1.0, 1.0)
+        
+        responses = np.abs(center + 0.5 * np.sum(g * offsets, axis=1))
+        
+        tr = dxx + dyy
+        det = dxx * dyy - dxy * dxy
+        r_thresh = ((edge_threshold + 1.0) ** 2) / edge_threshold
+        with np.errstate(divide='ignore', invalid='ignore'):
+            keep = (responses >= contrast_threshold) & (det > 0) & ((tr * tr) / det <= r_thresh)
+        
+        return coords[keep], offsets[keep], responses[keep]
+
+    @staticmethod
+    def _describe_keypoints(octave, coords, offsets, responses, sigma0, k, progress=None):
+        """Orientations and descriptors for the refined extrema of one octave.
+        
+        Keypoints are grouped by their nearest Gaussian level so each level's
+        cached gradient maps are used for all of its keypoints at once.
+        
+        Args:
+            progress: optional ProgressToken, updated after the orientations
+                and descriptors of every level
+        
+        Returns:
+            dict of column arrays (x, y, scale, octave, orientation, response,
+            descriptor, plus 'candidate', the row of ``coords`` each keypoint
+            came from), one row per keypoint orientation, in candidate order
+        """
+        refined_x = coords[:, 2] + offsets[:, 0]
+        refined_y = coords[:, 1] + offsets[:, 1]
+        refined_s = coords[:, 0] + offsets[:, 2]
+        sigma_refined = sigma0 * (k ** refined_s.astype(np.float64))
+        levels = np.clip(np.rint(refined_s).astype(np.intp), 0, octave.num_scales - 1)
+        used_levels = np.unique(levels)
+        progress = as_progress(progress)
+        advance = progress.counter(2 * len(used_levels))
+        
+        owners = [np.empty(0, dtype=np.intp)]
+        angles = [np.empty(0)]
+        for level in used_levels:
+            sel = np.nonzero(levels == level)[0]
+            magnitude, orientation = octave.gradients(level)
+            owner, angle = CustomImageProcessing.compute_keypoint_orientations(
+                magnitude, orientation, np.rint(refined_y[sel]), np.rint(refined_x[sel]), sigma_refined[sel])
+            owners.append(sel[owner])
+            angles.append(angle)
+            advance()
+        owners = np.concatenate(owners)
+        angles = np.concatenate(angles)
+        order = np.argsort(owners, kind='stable')
+        owners = owners[order]
+        angles = angles[order]
+        
+        descriptors = np.zeros((len(owners), 128), dtype=np.float32)
+        for level in used_levels:
+            rows = np.nonzero(levels[owners] == level)[0]
+            kp = owners[rows]
+            magnitude, orientation = octave.gradients(level)
+            descriptors[rows] = CustomImageProcessing._compute_keypoint_descriptors(
+                magnitude, orientation, refined_x[kp], refined_y[kp], sigma_refined[kp], angles[rows])
+            advance()
+        
+        # Octaves without keypoints never advance
+        progress.update(1.0)
+        scale_factor = octave.scale_factor
+        return {
+            'x': refined_x[owners] * scale_factor,
+            'y': refined_y[owners] * scale_factor,
+            'scale': sigma_refined[owners] * scale_factor,
+            'octave': np.full(len(owners), octave.index, dtype=np.int32),
+            'orientation': angles,
+            'response': responses[owners],
+            'descriptor': descriptors,
+            'candidate': owners,
+        }
+
+    @staticmethod
+    @_cached('sift', 2, KeyPoints.to_arrays, KeyPoints.from_arrays)
+    def compute_sift_keypoints(img, num_octaves=5, scales_per_octave=4, sigma=1.6, contrast_threshold=0.01, edge_threshold=10,
+                               workers=None, processes=None, progress=None):
+        """Enhanced SIFT keypoint detector with descriptors.
+        
+        Args:
+            workers: threads for the scale-space blurs
+            processes: when greater than 1, extrema refinement, orientations
+                and descriptors run on a process pool over row bands of every
+                octave (see ``core.parallel_sift``); the keypoints are the
+                same, in the same order, as a serial run
+            progress: optional ProgressToken; the pyramid fills the first
+                half, detection and description of every octave the rest
+        
+        Returns:
+            KeyPoints, ordered by octave, then scale and scan position
+        """
         if img.dtype != np.float32 and img.dtype != np.float64:
             base_img = img.astype(np.float32)
         else:
             base_img = img.copy().astype(np.float32)
         
-        h0, w0 = base_img.shape
-        s = scales_per_octave
-        k = 2 ** (1.0 / s)
-        num_scales = s + 3
+        k = 2 ** (1.0 / scales_per_octave)
         sigma0 = sigma
         
-        gaussian_pyr = []
-        dog_pyr = []
-        base = base_img.copy()
+        progress = as_progress(progress)
+        octaves = CustomImageProcessing.build_scale_space(base_img, num_octaves, scales_per_octave, sigma, workers,
+                                                          progress.span(0.0, 0.5))
         
-        for o in range(num_octaves):
-            octave_gaussians = []
-            sigmas = [sigma0 * (k ** i) for i in range(num_scales)]
-            
-            for sigma_total in sigmas:
-                blurred = CustomImageProcessing.gaussian_blur(base, sigma_total)
-                octave_gaussians.append(blurred)
-            
-            gaussian_pyr.append(octave_gaussians)
-            
-            dogs = []
-            for i in range(len(octave_gaussians)-1):
-                dogs.append(octave_gaussians[i+1] - octave_gaussians[i])
-            dog_pyr.append(dogs)
-            
-            base = octave_gaussians[s][::2, ::2]
-        
-        keypoints = []
         contrast_thresh_abs = contrast_threshold * 255.0
         
-        for o_idx, dogs in enumerate(dog_pyr):
-            H, W = dogs[0].shape
-            for s_idx in range(1, len(dogs)-1):
-                d_prev = dogs[s_idx-1]
-                d_curr = dogs[s_idx]
-                d_next = dogs[s_idx+1]
-                
-                for i in range(3, H-3):
-                    for j in range(3, W-3):
-                        val = d_curr[i, j]
-                        
-                        if abs(val) < contrast_thresh_abs:
-                            continue
-                        
-                        neighborhood = np.concatenate((
-                            d_prev[i-1:i+2, j-1:j+2].ravel(),
-                            d_curr[i-1:i+2, j-1:j+2].ravel(),
-                            d_next[i-1:i+2, j-1:j+2].ravel()
-                        ))
-                        
-                        if val > 0:
-                            if val < neighborhood.max():
-                                continue
-                        else:
-                            if val > neighborhood.min():
-                                continue
-                        
-                        dx = (d_curr[i, j+1] - d_curr[i, j-1]) * 0.5
-                        dy = (d_curr[i+1, j] - d_curr[i-1, j]) * 0.5
-                        ds = (d_next[i, j] - d_prev[i, j]) * 0.5
-                        
-                        dxx = d_curr[i, j+1] + d_curr[i, j-1] - 2.0 * d_curr[i, j]
-                        dyy = d_curr[i+1, j] + d_curr[i-1, j] - 2.0 * d_curr[i, j]
-                        dss = d_next[i, j] + d_prev[i, j] - 2.0 * d_curr[i, j]
-                        dxy = (d_curr[i+1, j+1] - d_curr[i+1, j-1] - d_curr[i-1, j+1] + d_curr[i-1, j-1]) * 0.25
-                        dxs = (d_next[i, j+1] - d_next[i, j-1] - d_prev[i, j+1] + d_prev[i, j-1]) * 0.25
-                        dys = (d_next[i+1, j] - d_next[i-1, j] - d_prev[i+1, j] + d_prev[i-1, j]) * 0.25
-                        
-                        H_mat = np.array([[dxx, dxy, dxs],
-                                          [dxy, dyy, dys],
-                                          [dxs, dys, dss]], dtype=np.float32)
-                        g = np.array([dx, dy, ds], dtype=np.float32)
-                        
-                        try:
-                            offset = -np.linalg.solve(H_mat, g)
-                        except np.linalg.LinAlgError:
-                            offset = np.zeros(3, dtype=np.float32)
-                        
-                        if np.any(np.abs(offset) > 1.0):
-                            offset = np.clip(offset, -1.0, 1.0)
-                        
-                        D_interp = d_curr[i, j] + 0.5 * np.dot(g, offset)
-                        if abs(D_interp) < contrast_thresh_abs:
-                            continue
-                        
-                        tr = dxx + dyy
-                        det = dxx * dyy - dxy * dxy
-                        if det <= 0:
-                            continue
-                        
-                        ratio = (tr * tr) / det
-                        r_thresh = ((edge_threshold + 1.0) ** 2) / edge_threshold
-                        if ratio > r_thresh:
-                            continue
-                        
-                        refined_x = j + offset[0]
-                        refined_y = i + offset[1]
-                        refined_s = s_idx + offset[2]
-                        
-                        scale_factor = 2 ** o_idx
-                        sigma_refined = sigma0 * (k ** refined_s)
-                        x_orig = (refined_x) * scale_factor
-                        y_orig = (refined_y) * scale_factor
-                        
-                        chosen_scale_idx = int(round(refined_s))
-                        chosen_scale_idx = np.clip(chosen_scale_idx, 0, num_scales-1)
-                        gaussian_img = gaussian_pyr[o_idx][chosen_scale_idx]
-                        
-                        orientations = CustomImageProcessing.compute_keypoint_orientation(gaussian_img, int(round(refined_y)), int(round(refined_x)), sigma_refined)
-                        
-                        for ori in orientations:
-                            descriptor = CustomImageProcessing._compute_keypoint_descriptor(
-                                gaussian_img, refined_x, refined_y, sigma_refined, ori
-                            )
-                            kp = {
-                                'x': float(x_orig),
-                                'y': float(y_orig),
-                                'scale': float(sigma_refined * scale_factor),
-                                'octave': int(o_idx),
-                                'orientation': float(ori),
-                                'response': float(abs(D_interp)),
-                                'descriptor': descriptor
-                            }
-                            keypoints.append(kp)
-        
-        return keypoints
+        if processes is not None and processes > 1:
+            from .parallel_sift import describe_octaves_parallel
+            columns = describe_octaves_parallel(octaves, contrast_thresh_abs, edge_threshold, sigma0, k, processes,
+                                                progress.span(0.5, 1.0))
+        else:
+            # Octave work shrinks with its area
+            areas = np.cumsum([0.0] + [4.0 ** -octave.index for octave in octaves])
+            areas /= areas[-1]
+            columns = []
+            for octave, start, stop in zip(octaves, areas[:-1], areas[1:]):
+                candidates = CustomImageProcessing._detect_extrema(octave.dogs, contrast_thresh_abs)
+                coords, offsets, responses = CustomImageProcessing._refine_extrema(
+                    octave.dogs, candidates, contrast_thresh_abs, edge_threshold)
+                columns.append(CustomImageProcessing._describe_keypoints(
+                    octave, coords, offsets, responses, sigma0, k, progress.span(0.5 + start / 2, 0.5 + stop / 2)))
+        
+        return KeyPoints({name: np.concatenate([cols[name] for cols in columns]) for name, _ in KEYPOINT_FIELDS},
+                         np.concatenate([cols['descriptor'] for cols in columns]))
     
     @staticmethod
-    def pca_reduction(data, n_components):
-        """Custom PCA implementation."""
+    @_cached('pca', 1)
+    def pca_reduction(data, n_components, solver='auto', n_oversamples=10, n_iter=4, random_state=0,
+                      progress=None):
+        """Custom PCA implementation.
+        
+        Args:
+            data: (n_samples, n_features) array
+            n_components: number of principal components to keep
+            solver: 'full' eigendecomposes the covariance matrix,
+                'randomized' finds the leading subspace with a randomized range
+                finder and power iterations without forming the covariance,
+                'auto' uses 'randomized' when n_components is well below both
+                dimensions
+            n_oversamples, n_iter, random_state: randomized solver settings
+            progress: optional ProgressToken, updated after every power
+                iteration (randomized) or decomposition step (full)
+            
+        Returns:
+            tuple: (reconstructed, explained_variance, n_components)
+        """
+        n_samples, n_features = data.shape
+        if solver == 'auto':
+            large = max(n_samples, n_features) > 500
+            solver = 'randomized' if large and n_components < 0.8 * min(n_samples, n_features) else 'full'
+        if solver == 'randomized':
+            return _randomized_pca(data, n_components, n_oversamples, n_iter, random_state, progress)
+        if solver != 'full':
+            raise ValueError(f"Unknown PCA solver: {solver}")
+        
+        progress = as_progress(progress)
         mean = np.mean(data, axis=0)
         centered = data - mean
         
         cov_matrix = np.dot(centered.T, centered) / (data.shape[0] - 1)
+        progress.update(0.3)
         
         eigenvalues, eigenvectors = np.linalg.eigh(cov_matrix)
+        progress.update(0.7)
         
         idx = eigenvalues.argsort()[::-1]
         eigenvalues = eigenvalues[idx]
@@ -526,5 +1428,6 @@ class CustomImageProcessing:
         reconstructed = np.dot(transformed, components.T) + mean
         
         explained_variance = eigenvalues[:n_components].sum() / eigenvalues.sum() if eigenvalues.sum() > 0 else 0.0
+        progress.update(1.0)
         
         return reconstructed, explained_variance, n_components
@@ -0,0 +1,147 @@
+"""Streaming PCA for feature sets that do not fit in memory."""
+import numpy as np
+
+
+class IncrementalPCA:
+    """PCA learned from batches, e.g. feature images or SIFT descriptor sets.
+
+    Two kinds of state are supported:
+        'covariance': running mean and scatter matrix; exact, O(d^2) memory,
+            suited to small feature dimensions such as 128-D descriptors
+        'lowrank': running mean plus the top singular vectors, updated by an
+            incremental SVD (Ross et al., 2008); O(k * d) memory, suited to
+            flattened images
+
+    Usage:
+        model = IncrementalPCA(32).fit(batches)
+        codes = model.transform(batch)
+        model.save('basis.npz')
+    """
+
+    def __init__(self, n_components, method='covariance'):
+        if method not in ('covariance', 'lowrank'):
+            raise ValueError(f"Unknown incremental PCA method: {method}")
+        self.n_components = int(n_components)
+        self.method = method
+        self.n_samples_seen_ = 0
+        self.mean_ = None
+        self._m2 = None          # per-feature sum of squared deviations
+        self._scatter = None     # 'covariance' state
+        self._components = None  # 'lowrank' state, or cached eigenvectors
+        self._singular_values = None
+
+    def partial_fit(self, batch):
+        """Update the model with one (n_samples, n_features) batch."""
+        batch = np.asarray(batch, dtype=np.float64)
+        if batch.ndim != 2 or len(batch) == 0:
+            raise ValueError("partial_fit expects a non-empty 2D batch")
+        n_batch = len(batch)
+        batch_mean = batch.mean(axis=0)
+        centered = batch - batch_mean
+
+        if self.mean_ is None:
+            if self.method == 'lowrank' and n_batch < self.n_components:
+                raise ValueError(f"First batch needs at least {self.n_components} samples")
+            self.mean_ = np.zeros(batch.shape[1])
+            self._m2 = np.zeros(batch.shape[1])
+            if self.method == 'covariance':
+                self._scatter = np.zeros((batch.shape[1], batch.shape[1]))
+        elif batch.shape[1] != len(self.mean_):
+            raise ValueError(f"Expected {len(self.mean_)} features, got {batch.shape[1]}")
+
+        n_seen = self.n_samples_seen_
+        n_total = n_seen + n_batch
+        delta = batch_mean - self.mean_
+        correction = n_seen * n_batch / n_total
+
+        if self.method == 'covariance':
+            self._scatter += centered.T @ centered + np.outer(delta, delta) * correction
+            self._components = None
+        else:
+            rows = [centered]
+            if n_seen > 0:
+                rows = [self._singular_values[:, np.newaxis] * self._components, centered,
+                        np.sqrt(correction) * delta[np.newaxis, :]]
+            _, singular_values, vt = np.linalg.svd(np.vstack(rows), full_matrices=False)
+            self._components = vt[:self.n_components]
+            self._singular_values = singular_values[:self.n_components]
+
+        self._m2 += np.einsum('ij,ij->j', centered, centered) + delta ** 2 * correction
+        self.mean_ = self.mean_ + delta * (n_batch / n_total)
+        self.n_samples_seen_ = n_total
+        return self
+
+    def fit(self, batches):
+        """Fit from an iterable (e.g. a generator) of batches."""
+        for batch in batches:
+            self.partial_fit(batch)
+        return self
+
+    @property
+    def components_(self):
+        """(n_components, n_features) principal axes, strongest first."""
+        return self._basis()[0]
+
+    @property
+    def explained_variance_(self):
+        """Variance along each principal axis."""
+        return self._basis()[1] ** 2 / max(self.n_samples_seen_ - 1, 1)
+
+    @property
+    def explained_variance_ratio_(self):
+        total = self._m2.sum() / max(self.n_samples_seen_ - 1, 1)
+        return self.explained_variance_ / total if total > 0 else np.zeros_like(self.explained_variance_)
+
+    def transform(self, batch):
+        """Project a batch onto the learned basis."""
+        return (np.asarray(batch, dtype=np.float64) - self.mean_) @ self.components_.T
+
+    def inverse_transform(self, codes):
+        """Map projected codes back to feature space."""
+        return np.asarray(codes, dtype=np.float64) @ self.components_ + self.mean_
+
+    def save(self, path):
+        """Save the model state to a .npz file."""
+        self._check_fitted()
+        state = {
+            'method': np.array(self.method),
+            'n_components': np.array(self.n_components),
+            'n_samples_seen': np.array(self.n_samples_seen_),
+            'mean': self.mean_,
+            'm2': self._m2,
+        }
+        if self.method == 'covariance':
+            state['scatter'] = self._scatter
+        else:
+            state['components'] = self._components
+            state['singular_values'] = self._singular_values
+        np.savez(path, **state)
+
+    @classmethod
+    def load(cls, path):
+        """Load a model saved with ``save``."""
+        with np.load(path) as state:
+            model = cls(int(state['n_components']), str(state['method']))
+            model.n_samples_seen_ = int(state['n_samples_seen'])
+            model.mean_ = state['mean']
+            model._m2 = state['m2']
+            if model.method == 'covariance':
+                model._scatter = state['scatter']
+            else:
+                model._components = state['components']
+                model._singular_values = state['singular_values']
+        return model
+
+    def _basis(self):
+        """Principal axes and singular values, eigendecomposing the scatter if needed."""
+        self._check_fitted()
+        if self._components is None:
+            eigenvalues, eigenvectors = np.linalg.eigh(self._scatter)
+            idx = eigenvalues.argsort()[::-1][:self.n_components]
+            self._components = eigenvectors[:, idx].T
+            self._singular_values = np.sqrt(np.maximum(eigenvalues[idx], 0))
+        return self._components, self._singular_values
+
+    def _check_fitted(self):
+        if self.mean_ is None:
+            raise ValueError("IncrementalPCA has not been fitted yet")
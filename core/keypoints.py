@@ -0,0 +1,154 @@
+"""Columnar keypoint container returned by the SIFT detector."""
+import zipfile
+
+import numpy as np
+
+
+# Scalar keypoint fields and their column dtypes, in dict order
+FIELDS = (('x', np.float64), ('y', np.float64), ('scale', np.float64), ('octave', np.int32),
+          ('orientation', np.float64), ('response', np.float64))
+DESCRIPTOR_SIZE = 128
+
+
+class KeyPoints:
+    """Keypoints stored as one array per field plus an (N, 128) descriptor matrix.
+
+    Field columns are available as attributes (``kps.x``, ``kps.response``)
+    and the descriptors as ``kps.descriptors``. Indexing follows NumPy: a
+    slice gives a view, a boolean mask or index array gives a copy, a field
+    name gives that column, and an integer gives one keypoint as a dict.
+    Iterating yields the same dicts, so code written for the old list of
+    dicts (e.g. ``draw_keypoints``) keeps working.
+
+    Usage:
+        kps = CustomImageProcessing.compute_sift_keypoints(img)
+        strong = kps[kps.response > 5].sort('response', descending=True)[:500]
+        strong.save('kps.npz')
+        kps = KeyPoints.load('kps.npz', mmap_mode='r')
+    """
+
+    def __init__(self, columns=None, descriptors=None):
+        columns = columns or {}
+        n = len(descriptors) if descriptors is not None else len(next(iter(columns.values()), ()))
+        self._columns = {name: np.asarray(columns[name], dtype=dtype) if name in columns
+                         else np.zeros(n, dtype=dtype) for name, dtype in FIELDS}
+        self.descriptors = (np.asarray(descriptors, dtype=np.float32) if descriptors is not None
+                            else np.zeros((n, DESCRIPTOR_SIZE), dtype=np.float32))
+        if any(len(column) != n for column in self._columns.values()) or self.descriptors.shape != (n, DESCRIPTOR_SIZE):
+            raise ValueError("Keypoint columns and descriptors must all have one row per keypoint")
+
+    @classmethod
+    def from_dicts(cls, keypoints):
+        """Build from a sequence of keypoint dicts."""
+        keypoints = list(keypoints)
+        columns = {name: [kp[name] for kp in keypoints] for name, _ in FIELDS}
+        descriptors = np.array([kp['descriptor'] for kp in keypoints], dtype=np.float32)
+        return cls(columns, descriptors.reshape(-1, DESCRIPTOR_SIZE))
+
+    @classmethod
+    def concatenate(cls, parts):
+        parts = list(parts)
+        if not parts:
+            return cls()
+        columns = {name: np.concatenate([part._columns[name] for part in parts]) for name, _ in FIELDS}
+        return cls(columns, np.concatenate([part.descriptors for part in parts]))
+
+    def __len__(self):
+        return len(self.descriptors)
+
+    def __getattr__(self, name):
+        columns = self.__dict__.get('_columns', {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(f"'KeyPoints' object has no attribute {name!r}")
+
+    @property
+    def xy(self):
+        """(N, 2) array of keypoint coordinates."""
+        return np.stack([self._columns['x'], self._columns['y']], axis=1)
+
+    def __getitem__(self, index):
+        if isinstance(index, str):
+            if index == 'descriptor':
+                return self.descriptors
+            return self._columns[index]
+        if isinstance(index, (int, np.integer)):
+            n = len(self)
+            if not -n <= index < n:
+                raise IndexError(f"Keypoint index {index} out of range for {n} keypoints")
+            kp = {name: column[index].item() for name, column in self._columns.items()}
+            kp['descriptor'] = self.descriptors[index]
+            return kp
+        return KeyPoints({name: column[index] for name, column in self._columns.items()},
+                         self.descriptors[index])
+
+    def __iter__(self):
+        names = list(self._columns)
+        for values, descriptor in zip(zip(*(column.tolist() for column in self._columns.values())),
+                                      self.descriptors):
+            kp = dict(zip(names, values))
+            kp['descriptor'] = descriptor
+            yield kp
+
+    def filter(self, mask):
+        """Keypoints where ``mask`` is True."""
+        return self[np.asarray(mask, dtype=bool)]
+
+    def sort(self, key='response', descending=False):
+        """Keypoints ordered by a field (stable)."""
+        order = np.argsort(self._columns[key], kind='stable')
+        return self[order[::-1] if descending else order]
+
+    def to_arrays(self):
+        """Dict of the field columns and 'descriptor' matrix."""
+        return {**self._columns, 'descriptor': self.descriptors}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls({name: arrays[name] for name, _ in FIELDS}, arrays['descriptor'])
+
+    def save(self, path):
+        """Save as an uncompressed .npz, one member per column."""
+        np.savez(path, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """Load from ``save`` output.
+
+        With ``mmap_mode`` ('r', 'r+' or 'c') every column and the descriptor
+        matrix are memory-mapped straight from the archive without reading
+        them, which ``np.load`` does not support for .npz files.
+        """
+        if mmap_mode is None:
+            with np.load(path, allow_pickle=False) as data:
+                return cls.from_arrays({name: data[name] for name in data.files})
+        return cls.from_arrays(_memmap_npz(path, mmap_mode))
+
+    def __repr__(self):
+        return f'KeyPoints(n={len(self)})'
+
+
+def _memmap_npz(path, mode):
+    """Memory-map every member of an uncompressed .npz archive."""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Cannot memory-map compressed member {info.filename}")
+            # Local header: 30 fixed bytes, then file name and extra field
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(f.read(4), dtype='<u2')
+            f.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename[:-len('.npy')]
+            if np.prod(shape) == 0:
+                # Empty regions cannot be mapped
+                arrays[name] = np.zeros(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode=mode, offset=f.tell(), shape=shape,
+                                     order='F' if fortran_order else 'C')
+    return arrays
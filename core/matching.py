@@ -0,0 +1,138 @@
+"""Nearest-neighbour matching of descriptor matrices.
+
+Squared L2 distances are computed block by block from dot products,
+|q - t|^2 = |q|^2 + |t|^2 - 2 q.t, so the work is one matrix multiply per
+(query chunk, train block) pair and peak memory is a single
+``chunk_size x block_size`` float32 block regardless of the input sizes.
+The k best neighbours per query are merged across train blocks, and the
+smallest distance to each train descriptor is tracked in the same pass for
+cross-checking.
+"""
+import numpy as np
+
+
+DEFAULT_CHUNK_SIZE = 512
+DEFAULT_BLOCK_SIZE = 4096
+
+
+def _descriptor_matrix(descriptors):
+    # Accept KeyPoints as well as plain (N, D) arrays
+    descriptors = getattr(descriptors, 'descriptors', descriptors)
+    return np.ascontiguousarray(descriptors, dtype=np.float32)
+
+
+def _blocked_knn(queries, train, k, chunk_size, block_size, exclude, track_reverse):
+    """k nearest train rows per query, plus the nearest query distance per train row.
+
+    Returns:
+        tuple: (indices (N, k), squared distances (N, k), reverse squared
+            distances (M,) or None); missing neighbours have index -1 and
+            distance inf
+    """
+    n, m = len(queries), len(train)
+    indices = np.full((n, k), -1, dtype=np.intp)
+    distances = np.full((n, k), np.inf, dtype=np.float32)
+    reverse_d = np.full(m, np.inf, dtype=np.float32) if track_reverse else None
+    if n == 0 or m == 0:
+        return indices, distances, reverse_d
+
+    query_norms = np.einsum('ij,ij->i', queries, queries)
+    train_norms = np.einsum('ij,ij->i', train, train)
+    rows = np.arange(chunk_size)[:, np.newaxis]
+
+    for q0 in range(0, n, chunk_size):
+        q1 = min(q0 + chunk_size, n)
+        best_idx = indices[q0:q1]
+        best_d = distances[q0:q1]
+        for t0 in range(0, m, block_size):
+            t1 = min(t0 + block_size, m)
+            block = queries[q0:q1] @ train[t0:t1].T
+            block *= -2.0
+            block += query_norms[q0:q1, np.newaxis]
+            block += train_norms[t0:t1]
+            # Rounding can push identical descriptors slightly below zero
+            np.maximum(block, 0.0, out=block)
+            excluded = exclude(np.arange(q0, q1), np.arange(t0, t1)) if exclude is not None else None
+            if excluded is not None:
+                block[excluded] = np.inf
+
+            if track_reverse:
+                # Minima along axis 0 are cheap; argmin along it is not
+                np.minimum(reverse_d[t0:t1], block.min(axis=0), out=reverse_d[t0:t1])
+
+            kk = min(k, t1 - t0)
+            r = rows[:q1 - q0]
+            if kk == 2:
+                # Two row-wise argmins beat a partition for the common k = 2
+                first = block.argmin(axis=1)
+                first_d = block[r[:, 0], first]
+                block[r[:, 0], first] = np.inf
+                top = np.stack([first, block.argmin(axis=1)], axis=1)
+                block[r[:, 0], first] = first_d
+            elif kk < t1 - t0:
+                top = np.argpartition(block, kk - 1, axis=1)[:, :kk]
+            else:
+                top = np.broadcast_to(np.arange(t1 - t0), (q1 - q0, kk))
+            cand_d = np.concatenate([best_d, block[r, top]], axis=1)
+            cand_i = np.concatenate([best_idx, top + t0], axis=1)
+            order = np.argsort(cand_d, axis=1, kind='stable')[:, :k]
+            best_d[:] = np.take_along_axis(cand_d, order, axis=1)
+            best_idx[:] = np.take_along_axis(cand_i, order, axis=1)
+        # Excluded pairs never count as neighbours
+        best_idx[np.isinf(best_d)] = -1
+
+    return indices, distances, reverse_d
+
+
+def knn_search(queries, train, k=2, chunk_size=DEFAULT_CHUNK_SIZE, block_size=DEFAULT_BLOCK_SIZE,
+               exclude=None):
+    """k nearest neighbours in ``train`` of every row of ``queries``.
+
+    Args:
+        queries, train: (N, D) and (M, D) descriptor matrices (or KeyPoints)
+        k: neighbours per query
+        chunk_size, block_size: query rows and train rows per distance block
+        exclude: optional callable ``exclude(query_rows, train_rows)`` giving
+            a boolean (len(query_rows), len(train_rows)) mask of pairs that
+            may not match, e.g. a keypoint with itself, or None when the
+            whole block is allowed
+
+    Returns:
+        tuple: (indices, distances), both (N, k) and sorted by increasing
+            L2 distance; missing neighbours have index -1 and distance inf
+    """
+    indices, sq_distances, _ = _blocked_knn(_descriptor_matrix(queries), _descriptor_matrix(train), k,
+                                            chunk_size, block_size, exclude, False)
+    return indices, np.sqrt(sq_distances)
+
+
+def match_descriptors(queries, train, ratio=0.8, cross_check=True, chunk_size=DEFAULT_CHUNK_SIZE,
+                      block_size=DEFAULT_BLOCK_SIZE, exclude=None):
+    """Match two descriptor sets with Lowe's ratio test and cross-checking.
+
+    Args:
+        queries, train: (N, D) and (M, D) descriptor matrices (or KeyPoints)
+        ratio: keep a match only if its distance is below ``ratio`` times the
+            second-nearest distance; None disables the test
+        cross_check: keep a match only if the query is also the nearest
+            neighbour of its train descriptor (exact ties keep every tied
+            query)
+        chunk_size, block_size, exclude: see ``knn_search``
+
+    Returns:
+        tuple: (query_indices, train_indices, distances) of the accepted
+            matches, in query order
+    """
+    queries, train = _descriptor_matrix(queries), _descriptor_matrix(train)
+    indices, sq_distances, reverse = _blocked_knn(queries, train, 2, chunk_size, block_size,
+                                                  exclude, cross_check)
+    query_idx = np.arange(len(queries))
+    train_idx = indices[:, 0]
+    keep = train_idx >= 0
+    if ratio is not None:
+        # Compare squared distances against the squared ratio
+        keep &= sq_distances[:, 0] < (ratio * ratio) * sq_distances[:, 1]
+    if cross_check:
+        # Each pair's distance comes from a single block, so the comparison is exact
+        keep &= sq_distances[:, 0] <= reverse[np.where(keep, train_idx, 0)]
+    return query_idx[keep], train_idx[keep], np.sqrt(sq_distances[keep, 0])
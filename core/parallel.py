@@ -0,0 +1,83 @@
+"""Process-wide thread pool for running NumPy kernels in horizontal bands.
+
+Large NumPy operations release the GIL, so splitting an image into bands
+of rows and processing them on threads scales across cores. Each band is
+computed with exactly the same arithmetic as the whole image would be, so
+results do not depend on the number of workers.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Bands smaller than this many pixels are not worth a thread hand-off
+MIN_BAND_PIXELS = 1 << 16
+
+_lock = threading.Lock()
+_local = threading.local()
+_workers = int(os.environ.get('IMG_FORENSICS_WORKERS', 0)) or os.cpu_count() or 1
+_pool = None
+
+
+def set_workers(workers):
+    """Set the default number of worker threads (1 disables threading)."""
+    global _workers, _pool
+    workers = max(int(workers), 1)
+    with _lock:
+        if workers != _workers and _pool is not None:
+            # Bands are submitted under the lock, so none can reach the old
+            # pool after this; those already queued still run
+            _pool.shutdown(wait=False)
+            _pool = None
+        _workers = workers
+
+
+def get_workers():
+    """Default number of worker threads."""
+    return _workers
+
+
+def _submit_shared(fn, bounds, workers):
+    """Submit the bands to the shared pool if ``workers`` is the default thread
+    count; returns their futures, or None."""
+    global _pool
+    with _lock:
+        if workers != _workers:
+            return None
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix='imgf-band',
+                                       initializer=_mark_worker)
+        return [_pool.submit(fn, start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _mark_worker():
+    _local.in_worker = True
+
+
+def run_bands(fn, n_rows, workers=None, row_pixels=1):
+    """Call ``fn(start, stop)`` over contiguous bands covering [0, n_rows).
+
+    Args:
+        fn: band function; writes its rows into a preallocated output and/or
+            returns a partial result
+        n_rows: number of rows to split
+        workers: thread count; None uses the process-wide default
+        row_pixels: pixels per row, used to avoid splitting small images
+
+    Returns:
+        list: return values of ``fn`` in band order
+    """
+    workers = get_workers() if workers is None else max(int(workers), 1)
+    n_bands = min(workers, n_rows, max(1, n_rows * row_pixels // MIN_BAND_PIXELS))
+    # Kernels called from inside a band run serially instead of waiting on
+    # the pool they occupy
+    if n_bands <= 1 or getattr(_local, 'in_worker', False):
+        return [fn(0, n_rows)]
+
+    bounds = [n_rows * i // n_bands for i in range(n_bands + 1)]
+    futures = _submit_shared(fn, bounds, workers)
+    if futures is not None:
+        return [future.result() for future in futures]
+
+    with ThreadPoolExecutor(max_workers=workers, initializer=_mark_worker) as pool:
+        return list(pool.map(fn, bounds[:-1], bounds[1:]))
@@ -0,0 +1,187 @@
+"""Process-parallel keypoint description for the SIFT detector.
+
+Extremum detection, refinement, orientation assignment and descriptors are
+vectorized, but as long chains of moderate NumPy calls (fancy indexing,
+bincount, small per-radius groups) with Python glue between them, and much
+of that runs under the GIL, so bands scale poorly on threads. They are
+spread over worker processes instead. Octave stacks (Gaussians, DoGs and
+gradient maps) are placed in ``multiprocessing.shared_memory`` once and
+attached by name in the workers; only small keypoint arrays travel through
+pickling.
+Workers are started with 'forkserver' (or 'spawn'), never 'fork': the band
+thread pool of ``core.parallel`` may be alive in the parent, and forking a
+process with live threads can deadlock the child.
+
+Work is split into (octave, row band) jobs. Each extremum candidate is owned
+by the band containing its centre row, so candidates on band borders are
+found exactly once, and the merged keypoints are sorted back into the scan
+order of a serial run.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .image_processor import CustomImageProcessing
+from .progress import OperationCancelled, as_progress
+from .scale_space import ScaleSpaceOctave, gradient_polar
+
+
+# Bands per worker process, so uneven bands still balance out
+BANDS_PER_PROCESS = 4
+
+
+def _process_context():
+    """Start method that does not fork the (possibly threaded) parent."""
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+class _SharedArrays:
+    """Shared-memory blocks created by the parent and unlinked on exit."""
+
+    def __init__(self):
+        self._blocks = []
+
+    def empty(self, shape, dtype=np.float32):
+        """Allocate a shared array; returns (spec, array) where ``spec``
+        names the block for ``_run_attached`` in a worker."""
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        block = shared_memory.SharedMemory(create=True, size=size)
+        self._blocks.append(block)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        return (block.name, tuple(shape), dtype.str), array
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        for block in self._blocks:
+            try:
+                block.close()
+            except BufferError:
+                # A view is still alive; the mapping goes away with it
+                pass
+            block.unlink()
+        self._blocks = []
+
+
+def _run_attached(fn, specs, *args):
+    """Call ``fn(*arrays, *args)`` with the shared arrays named by ``specs``."""
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    try:
+        arrays = [np.ndarray(shape, dtype=dtype, buffer=block.buf)
+                  for block, (_, shape, dtype) in zip(blocks, specs)]
+        result = fn(*arrays, *args)
+        del arrays
+        return result
+    finally:
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass
+
+
+def _gradient_level(gaussians, magnitude, orientation, level):
+    magnitude[level], orientation[level] = gradient_polar(gaussians[level])
+
+
+def _describe_band(gaussians, dogs, magnitude, orientation, index, sigmas, rows,
+                   contrast_threshold, edge_threshold, sigma0, k):
+    octave = ScaleSpaceOctave(index, sigmas, gaussians, dogs=dogs,
+                              gradients=zip(magnitude, orientation))
+    candidates = CustomImageProcessing._detect_extrema(dogs, contrast_threshold, rows=rows)
+    coords, offsets, responses = CustomImageProcessing._refine_extrema(
+        dogs, candidates, contrast_threshold, edge_threshold)
+    columns = CustomImageProcessing._describe_keypoints(octave, coords, offsets, responses, sigma0, k)
+    # Candidate indices are band-relative; the (scale, row, col) key is not
+    columns['key'] = coords[columns.pop('candidate')]
+    return columns
+
+
+def _merge_bands(parts):
+    """Concatenate band results of one octave in serial scan order.
+
+    Orientations of one candidate always come from the same band, so a
+    stable sort on (scale, row, col) keeps them in their original order.
+    """
+    merged = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    key = merged.pop('key')
+    order = np.lexsort((key[:, 2], key[:, 1], key[:, 0]))
+    return {name: column[order] for name, column in merged.items()}
+
+
+def describe_octaves_parallel(octaves, contrast_threshold, edge_threshold, sigma0, k, processes=None,
+                              progress=None):
+    """Detect, refine and describe keypoints of every octave on a process pool.
+
+    Args:
+        octaves: list of ScaleSpaceOctave from ``build_scale_space``
+        contrast_threshold: absolute DoG contrast threshold
+        edge_threshold: principal curvature ratio threshold
+        sigma0, k: base blur and scale step of the pyramid
+        processes: worker process count; defaults to os.cpu_count()
+        progress: optional ProgressToken, updated as jobs complete; on
+            cancellation, jobs that have not started are dropped
+
+    Returns:
+        list of per-octave column dicts, identical to the serial detector
+    """
+    processes = processes or os.cpu_count() or 1
+    total_pixels = sum(octave.shape[0] * octave.shape[1] for octave in octaves)
+    band_pixels = max(total_pixels // (processes * BANDS_PER_PROCESS), 1)
+
+    context = _process_context()
+    with _SharedArrays() as shared, ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+        specs = []
+        for octave in octaves:
+            num_scales, (H, W) = octave.num_scales, octave.shape
+            gaussians_spec, gaussians = shared.empty((num_scales, H, W))
+            gaussians[:] = octave.gaussians
+            dogs_spec, dogs = shared.empty((num_scales - 1, H, W))
+            np.subtract(gaussians[1:], gaussians[:-1], out=dogs)
+            # Refined scales round to levels 0 .. num_scales - 2
+            magnitude_spec, _ = shared.empty((num_scales - 1, H, W))
+            orientation_spec, _ = shared.empty((num_scales - 1, H, W))
+            specs.append((gaussians_spec, dogs_spec, magnitude_spec, orientation_spec))
+            del gaussians, dogs
+
+        gradient_jobs = [pool.submit(_run_attached, _gradient_level, (g, m, r), level)
+                         for octave, (g, _, m, r) in zip(octaves, specs)
+                         for level in range(octave.num_scales - 1)]
+        progress = as_progress(progress)
+        advance = progress.span(0.0, 0.3).counter(len(gradient_jobs))
+        try:
+            for job in gradient_jobs:
+                job.result()
+                advance()
+        except OperationCancelled:
+            pool.shutdown(cancel_futures=True)
+            raise
+
+        band_jobs = []
+        for octave, spec in zip(octaves, specs):
+            H, W = octave.shape
+            n_bands = min(max(1, -(-H * W // band_pixels)), H)
+            bounds = [H * b // n_bands for b in range(n_bands + 1)]
+            band_jobs.append([pool.submit(_run_attached, _describe_band, spec, octave.index, octave.sigmas,
+                                          (start, stop), contrast_threshold, edge_threshold, sigma0, k)
+                              for start, stop in zip(bounds[:-1], bounds[1:])])
+
+        advance = progress.span(0.3, 1.0).counter(sum(len(jobs) for jobs in band_jobs))
+        columns = []
+        try:
+            for jobs in band_jobs:
+                parts = []
+                for job in jobs:
+                    parts.append(job.result())
+                    advance()
+                columns.append(_merge_bands(parts))
+        except OperationCancelled:
+            pool.shutdown(cancel_futures=True)
+            raise
+        return columns
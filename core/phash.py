@@ -0,0 +1,287 @@
+"""Perceptual hashes and Hamming-radius search for near-duplicate triage.
+
+Three 64-bit hashes are computed from a small grayscale thumbnail:
+    - average hash: 8x8 thumbnail, bit set where a pixel exceeds the mean
+    - difference hash: 9x8 thumbnail, bit set where a pixel is brighter
+      than its right-hand neighbour
+    - DCT hash: 32x32 thumbnail, bit set where one of the 8x8 lowest DCT
+      coefficients exceeds their median
+
+Thumbnails are box-averaged by an integer factor before the bilinear resize,
+so large images are not aliased, and the hashing itself runs on whole
+stacks of thumbnails at once. Hashes are packed MSB-first into uint64.
+
+``HashIndex`` finds every stored hash within a Hamming radius of a query by
+multi-index hashing: the 64 bits are split into ``n_chunks`` chunks, and by
+the pigeonhole principle any hash within radius r agrees with the query on
+at least one chunk up to ``r // n_chunks`` flipped bits. Each chunk has a
+bucket table, so a query probes a few buckets per chunk and only verifies
+those candidates instead of scanning every hash.
+
+Usage:
+    hashes = hash_images(images, method='dct')
+    index = HashIndex(hashes)
+    query_idx, index_idx, distances = index.search(hashes[:10], radius=6)
+    pairs, distances = index.near_duplicates(radius=4)
+"""
+import numpy as np
+
+from .image_processor import CustomImageProcessing
+
+
+HASH_BITS = 64
+METHODS = ('average', 'difference', 'dct')
+
+# DCT hash thumbnail side; the hash keeps its 8x8 lowest frequencies
+_DCT_SIZE = 32
+
+# Queries verified per step in HashIndex.search
+_SEARCH_BLOCK = 4096
+
+
+def _dct_matrix(n, rows):
+    """First ``rows`` rows of the orthonormal (n, n) DCT-II matrix."""
+    k = np.arange(rows)[:, np.newaxis]
+    matrix = np.cos(np.pi * (2 * np.arange(n) + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+
+_DCT_ROWS = _dct_matrix(_DCT_SIZE, 8)
+
+
+def _popcount_table():
+    table = np.zeros(1 << 16, dtype=np.uint8)
+    for bit in range(16):
+        table[1 << bit:1 << (bit + 1)] = table[:1 << bit] + 1
+    return table
+
+
+_POPCOUNT16 = _popcount_table()
+
+
+def popcount(values):
+    """Number of set bits of every element of a uint64 array."""
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values).astype(np.uint8)
+    # NumPy < 2.0: sum a 16-bit lookup table over the four halfwords
+    halves = _POPCOUNT16[values.view(np.uint16)].reshape(values.shape + (4,))
+    return halves.sum(axis=-1, dtype=np.uint8)
+
+
+def hamming_distance(a, b):
+    """Elementwise Hamming distance between broadcastable uint64 hash arrays."""
+    return popcount(np.bitwise_xor(np.asarray(a, dtype=np.uint64), np.asarray(b, dtype=np.uint64)))
+
+
+def pack_bits(bits):
+    """Pack (..., 64) boolean arrays MSB-first into uint64 hashes."""
+    bits = np.asarray(bits, dtype=bool)
+    if bits.shape[-1] != HASH_BITS:
+        raise ValueError(f"Expected {HASH_BITS} bits per hash, got {bits.shape[-1]}")
+    packed = np.packbits(bits.reshape(-1, HASH_BITS), axis=1)
+    return packed.view('>u8').astype(np.uint64).reshape(bits.shape[:-1])
+
+
+def thumbnail(img, width, height):
+    """Grayscale (height, width) thumbnail of an RGB or grayscale image.
+
+    The image is first box-averaged by the largest integer factor that keeps
+    it at least the target size, then resized bilinearly.
+    """
+    img = np.asarray(img)
+    h, w = img.shape[:2]
+    factor = max(min(h // height, w // width), 1)
+    if factor > 1:
+        img = CustomImageProcessing.box_downsample(img, factor)
+    gray = CustomImageProcessing.rgb_to_grayscale(img)
+    return CustomImageProcessing.resize_bilinear(gray, width, height).reshape(height, width)
+
+
+def _average_bits(thumbs):
+    flat = thumbs.reshape(len(thumbs), -1).astype(np.float32)
+    return flat > flat.mean(axis=1, keepdims=True)
+
+
+def _difference_bits(thumbs):
+    return (thumbs[:, :, :-1] > thumbs[:, :, 1:]).reshape(len(thumbs), -1)
+
+
+def _dct_bits(thumbs):
+    coefficients = _DCT_ROWS @ thumbs.astype(np.float32) @ _DCT_ROWS.T
+    flat = coefficients.reshape(len(thumbs), -1)
+    # The DC term only reflects brightness; leave it out of the median
+    median = np.median(flat[:, 1:], axis=1, keepdims=True)
+    return flat > median
+
+
+# Thumbnail (width, height) and bit extractor of every method
+_HASHERS = {
+    'average': ((8, 8), _average_bits),
+    'difference': ((9, 8), _difference_bits),
+    'dct': ((_DCT_SIZE, _DCT_SIZE), _dct_bits),
+}
+
+
+def hash_thumbnails(thumbs, method='dct'):
+    """Hashes of a (N, height, width) stack of thumbnails made by ``thumbnail``."""
+    if method not in _HASHERS:
+        raise ValueError(f"Unknown hash method {method!r}; expected one of {', '.join(METHODS)}")
+    (width, height), bits = _HASHERS[method]
+    thumbs = np.asarray(thumbs)
+    if thumbs.shape[1:] != (height, width):
+        raise ValueError(f"{method} hash needs {width}x{height} thumbnails, got shape {thumbs.shape[1:]}")
+    return pack_bits(bits(thumbs))
+
+
+def hash_images(images, method='dct'):
+    """uint64 perceptual hashes of an iterable of RGB or grayscale images."""
+    if method not in _HASHERS:
+        raise ValueError(f"Unknown hash method {method!r}; expected one of {', '.join(METHODS)}")
+    width, height = _HASHERS[method][0]
+    thumbs = [thumbnail(img, width, height) for img in images]
+    if not thumbs:
+        return np.empty(0, dtype=np.uint64)
+    return hash_thumbnails(np.stack(thumbs), method)
+
+
+def average_hash(img):
+    return hash_images([img], 'average')[0]
+
+
+def difference_hash(img):
+    return hash_images([img], 'difference')[0]
+
+
+def dct_hash(img):
+    return hash_images([img], 'dct')[0]
+
+
+def _flip_masks(bits, max_flips):
+    """All ``bits``-wide masks with at most ``max_flips`` set bits."""
+    masks = np.zeros(1, dtype=np.int64)
+    single = np.int64(1) << np.arange(bits, dtype=np.int64)
+    for _ in range(max_flips):
+        masks = np.unique(np.concatenate([masks, (masks[:, np.newaxis] | single).ravel()]))
+    return masks
+
+
+class HashIndex:
+    """In-memory multi-index Hamming search over uint64 hashes.
+
+    Args:
+        hashes: initial uint64 hashes; positions in this array (and in later
+            ``add`` calls, appended) are the ids returned by searches
+        n_chunks: number of bit chunks; 4 gives 16-bit chunks, which find
+            radii up to 3 with exact bucket lookups and larger radii by
+            probing neighbouring buckets
+    """
+
+    def __init__(self, hashes=None, n_chunks=4):
+        if HASH_BITS % n_chunks or HASH_BITS // n_chunks > 16:
+            raise ValueError(f"n_chunks must divide {HASH_BITS} into chunks of at most 16 bits")
+        self.n_chunks = n_chunks
+        self.chunk_bits = HASH_BITS // n_chunks
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self._tables = None
+        if hashes is not None:
+            self.add(hashes)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add(self, hashes):
+        """Append hashes; returns their ids."""
+        hashes = np.asarray(hashes, dtype=np.uint64).ravel()
+        ids = np.arange(len(self.hashes), len(self.hashes) + len(hashes))
+        self.hashes = np.concatenate([self.hashes, hashes])
+        # Bucket tables are rebuilt lazily on the next search
+        self._tables = None
+        return ids
+
+    def _chunks(self, hashes):
+        """(N, n_chunks) chunk values, most significant chunk first."""
+        shifts = np.arange(self.n_chunks - 1, -1, -1, dtype=np.uint64) * np.uint64(self.chunk_bits)
+        mask = np.uint64((1 << self.chunk_bits) - 1)
+        # uint16 keeps the stable argsort in _build_tables a radix sort
+        return ((hashes[:, np.newaxis] >> shifts) & mask).astype(np.uint16)
+
+    def _build_tables(self):
+        """Per chunk: ids sorted by chunk value, and bucket offsets into them."""
+        chunks = self._chunks(self.hashes)
+        n_buckets = 1 << self.chunk_bits
+        self._tables = []
+        for c in range(self.n_chunks):
+            order = np.argsort(chunks[:, c], kind='stable').astype(np.int64)
+            offsets = np.zeros(n_buckets + 1, dtype=np.int64)
+            np.cumsum(np.bincount(chunks[:, c], minlength=n_buckets), out=offsets[1:])
+            self._tables.append((order, offsets))
+
+    def _candidates(self, chunks, masks):
+        """(query row, id) pairs sharing a probed bucket, possibly repeated."""
+        rows, ids = [], []
+        for c, (order, offsets) in enumerate(self._tables):
+            probes = (chunks[:, c, np.newaxis].astype(np.int64) ^ masks).ravel()
+            starts, stops = offsets[probes], offsets[probes + 1]
+            lengths = stops - starts
+            total = int(lengths.sum())
+            if total == 0:
+                continue
+            # Concatenated ranges starts[i]:stops[i] without a Python loop
+            ends = np.cumsum(lengths)
+            positions = np.arange(total) - np.repeat(ends - lengths - starts, lengths)
+            rows.append(np.repeat(np.arange(len(probes)) // len(masks), lengths))
+            ids.append(order[positions])
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(ids)
+
+    def search(self, hashes, radius):
+        """All stored hashes within ``radius`` bits of each query hash.
+
+        Returns:
+            tuple: (query_indices, ids, distances), sorted by query and then
+                by distance
+        """
+        hashes = np.atleast_1d(np.asarray(hashes, dtype=np.uint64))
+        if self._tables is None:
+            self._build_tables()
+        masks = _flip_masks(self.chunk_bits, radius // self.n_chunks)
+        query_idx, ids, distances = [], [], []
+        for q0 in range(0, len(hashes), _SEARCH_BLOCK):
+            block = hashes[q0:q0 + _SEARCH_BLOCK]
+            rows, candidates = self._candidates(self._chunks(block), masks)
+            d = hamming_distance(block[rows], self.hashes[candidates])
+            keep = d <= radius
+            # Verifying is cheaper than deduplicating every candidate; a hit
+            # found through several chunks is reported once
+            pairs, first = np.unique(rows[keep] * len(self.hashes) + candidates[keep], return_index=True)
+            query_idx.append(pairs // len(self.hashes) + q0)
+            ids.append(pairs % len(self.hashes))
+            distances.append(d[keep][first])
+        if not query_idx:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+        query_idx, ids, distances = np.concatenate(query_idx), np.concatenate(ids), np.concatenate(distances)
+        order = np.lexsort((ids, distances, query_idx))
+        return query_idx[order], ids[order], distances[order]
+
+    def near_duplicates(self, radius):
+        """Pairs of stored hashes within ``radius`` bits of each other.
+
+        Returns:
+            tuple: ((P, 2) id pairs with the smaller id first, distances)
+        """
+        query_idx, ids, distances = self.search(self.hashes, radius)
+        keep = query_idx < ids
+        return np.stack([query_idx[keep], ids[keep]], axis=1), distances[keep]
+
+    def save(self, path):
+        np.save(path, self.hashes)
+
+    @classmethod
+    def load(cls, path, n_chunks=4):
+        return cls(np.load(path), n_chunks)
+
+    def __repr__(self):
+        return f'HashIndex(n={len(self)}, chunks={self.n_chunks})'
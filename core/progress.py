@@ -0,0 +1,122 @@
+"""Cooperative progress reporting and cancellation for long-running kernels.
+
+Kernels such as ``compute_sift_keypoints``, ``compute_lbp``,
+``glcm_texture_maps``, ``pca_reduction`` and the tiled runners accept an
+optional ``progress`` ProgressToken. They report the fraction done at safe
+checkpoints (pyramid levels, octaves, bands of rows, window rows, power
+iterations, tiles), and every report first checks for cancellation, so a
+cancelled token stops the kernel at its next checkpoint with
+OperationCancelled. Without a token the checkpoints are no-ops.
+
+Usage:
+    token = ProgressToken(lambda fraction, message: print(f'{fraction:.0%}'))
+    threading.Timer(5.0, token.cancel).start()
+    try:
+        kps = CustomImageProcessing.compute_sift_keypoints(img, progress=token)
+    except OperationCancelled:
+        kps = None
+"""
+import threading
+
+
+class OperationCancelled(Exception):
+    """Raised at a checkpoint of an operation whose token was cancelled."""
+
+
+class ProgressToken:
+    """Receives fractional progress from a kernel and can cancel it.
+
+    Args:
+        callback: optional ``callback(fraction, message)``, called from
+            whichever thread reaches a checkpoint (band workers included),
+            so it must be thread-safe and cheap
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._cancel_event = threading.Event()
+        # Child spans map their [0, 1] onto [start, start + scale] of the parent
+        self._parent = None
+        self._start = 0.0
+        self._scale = 1.0
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Request cancellation; takes effect at the operation's next checkpoint."""
+        self._cancel_event.set()
+
+    def check(self):
+        """Raise OperationCancelled if cancellation was requested."""
+        if self._cancel_event.is_set():
+            raise OperationCancelled()
+
+    def update(self, fraction, message=None):
+        """Report ``fraction`` (0-1) of this token's work done; a checkpoint."""
+        self.check()
+        token = self
+        while token._parent is not None:
+            fraction = token._start + token._scale * fraction
+            token = token._parent
+        if token.callback is not None:
+            token.callback(min(max(fraction, 0.0), 1.0), message)
+
+    def span(self, start, stop):
+        """Child token whose progress fills [start, stop] of this one.
+
+        Cancelling either token cancels both.
+        """
+        child = ProgressToken()
+        child._cancel_event = self._cancel_event
+        child._parent = self
+        child._start = start
+        child._scale = stop - start
+        return child
+
+    def counter(self, total):
+        """Thread-safe ``advance(amount=1)`` reporting the running sum over ``total``.
+
+        Used by banded kernels, whose bands finish in any order.
+        """
+        lock = threading.Lock()
+        done = [0]
+
+        def advance(amount=1):
+            with lock:
+                done[0] += amount
+                fraction = done[0] / total if total else 1.0
+            self.update(fraction)
+
+        return advance
+
+
+class _NoProgress:
+    """Stand-in for a missing token; every checkpoint is a no-op."""
+
+    cancelled = False
+
+    def check(self):
+        pass
+
+    def update(self, fraction, message=None):
+        pass
+
+    def span(self, start, stop):
+        return self
+
+    def counter(self, total):
+        return _advance_nothing
+
+
+def _advance_nothing(amount=1):
+    pass
+
+
+_NO_PROGRESS = _NoProgress()
+
+
+def as_progress(progress):
+    """``progress`` itself, or a no-op token when it is None."""
+    return _NO_PROGRESS if progress is None else progress
@@ -0,0 +1,71 @@
+"""Scale-space pyramid containers used by the SIFT detector."""
+import numpy as np
+
+
+class ScaleSpaceOctave:
+    """Gaussian and difference-of-Gaussian stacks for one pyramid octave.
+
+    Attributes:
+        index: octave number (0 is full resolution)
+        sigmas: blur of every Gaussian level relative to the octave's base
+            image, in octave pixels (sigma0 * k**i). Only for octave 0 is
+            this the absolute blur: higher octaves start from a decimated
+            level that already carries sigma0 (in their own pixels), so
+            their absolute blur is sqrt(sigmas**2 + sigma0**2)
+        gaussians: float32 array (num_scales, H, W)
+        dogs: float32 array (num_scales - 1, H, W)
+
+    ``dogs`` and per-level ``gradients`` ((magnitude, orientation) pairs) may
+    be passed in precomputed, e.g. as views of shared memory.
+    """
+    
+    def __init__(self, index, sigmas, gaussians, dogs=None, gradients=None):
+        self.index = index
+        self.sigmas = np.asarray(sigmas, dtype=np.float64)
+        self.gaussians = gaussians
+        self.dogs = gaussians[1:] - gaussians[:-1] if dogs is None else dogs
+        self._gradients = dict(enumerate(gradients)) if gradients is not None else {}
+    
+    @property
+    def scale_factor(self):
+        """Factor mapping octave coordinates back to the input image."""
+        return 2 ** self.index
+    
+    @property
+    def num_scales(self):
+        return self.gaussians.shape[0]
+    
+    @property
+    def shape(self):
+        return self.gaussians.shape[1:]
+    
+    def gradients(self, level):
+        """Gradient magnitude and orientation maps of a Gaussian level.
+        
+        Computed on first use and cached, so every keypoint on the level
+        shares one set of maps.
+        """
+        if level not in self._gradients:
+            self._gradients[level] = gradient_polar(self.gaussians[level])
+        return self._gradients[level]
+    
+    def __repr__(self):
+        h, w = self.shape
+        return f'ScaleSpaceOctave(index={self.index}, scales={self.num_scales}, shape=({h}, {w}))'
+
+
+def gradient_polar(img):
+    """Central-difference gradient magnitude and orientation (degrees in [0, 360)).
+    
+    Border pixels have zero magnitude, since their central difference
+    would need samples outside the image.
+    """
+    img = np.asarray(img, dtype=np.float32)
+    gx = np.zeros_like(img)
+    gy = np.zeros_like(img)
+    gx[1:-1, 1:-1] = img[1:-1, 2:] - img[1:-1, :-2]
+    gy[1:-1, 1:-1] = img[2:, 1:-1] - img[:-2, 1:-1]
+    
+    magnitude = np.sqrt(gx * gx + gy * gy)
+    orientation = np.degrees(np.arctan2(gy, gx)) % np.float32(360.0)
+    return magnitude, orientation.astype(np.float32)
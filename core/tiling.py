@@ -0,0 +1,132 @@
+"""Memory-bounded tiled execution of per-pixel kernels."""
+import numpy as np
+
+from .image_processor import CustomImageProcessing
+from .progress import as_progress
+
+
+# Default peak working-memory budget for one tile
+DEFAULT_MAX_MEMORY = 256 * 2**20
+
+
+class TiledExecutor:
+    """Runs a 2D kernel over overlapping tiles and stitches the results.
+    
+    Every tile is grown by a halo on each side (clipped at the image
+    border) and only its interior is kept. A kernel whose output at a pixel
+    depends on inputs at most ``halo`` pixels away therefore reproduces the
+    full-image result exactly, while only one tile's intermediates are alive
+    at a time.
+    
+    Args:
+        max_memory: peak working-memory budget per tile, in bytes
+    """
+    
+    def __init__(self, max_memory=DEFAULT_MAX_MEMORY):
+        self.max_memory = int(max_memory)
+    
+    def tile_size(self, halo, bytes_per_pixel):
+        """Side of the square tile interior that keeps a haloed tile within budget."""
+        side = int(np.sqrt(self.max_memory / bytes_per_pixel)) - 2 * halo
+        if side < 1:
+            raise ValueError(f"max_memory={self.max_memory} is too small for a halo of {halo} px")
+        return side
+    
+    def tiles(self, shape, halo, bytes_per_pixel):
+        """Yield (outer, crop, inner) slice pairs covering an image of ``shape``.
+        
+        ``outer`` selects the haloed tile from the image, ``crop`` selects the
+        tile interior from the kernel output and ``inner`` places it in the
+        full-size result.
+        """
+        h, w = shape[:2]
+        side = self.tile_size(halo, bytes_per_pixel)
+        for r0 in range(0, h, side):
+            r1 = min(r0 + side, h)
+            o_r0, o_r1 = max(r0 - halo, 0), min(r1 + halo, h)
+            for c0 in range(0, w, side):
+                c1 = min(c0 + side, w)
+                o_c0, o_c1 = max(c0 - halo, 0), min(c1 + halo, w)
+                yield ((slice(o_r0, o_r1), slice(o_c0, o_c1)),
+                       (slice(r0 - o_r0, r1 - o_r0), slice(c0 - o_c0, c1 - o_c0)),
+                       (slice(r0, r1), slice(c0, c1)))
+    
+    def map(self, kernel, img, halo, bytes_per_pixel=32, progress=None):
+        """Yield (inner, result) for every tile, result cropped to the interior.
+        
+        ``progress`` (a ProgressToken) is updated after every tile.
+        """
+        tiles = list(self.tiles(img.shape, halo, bytes_per_pixel))
+        advance = as_progress(progress).counter(len(tiles))
+        for outer, crop, inner in tiles:
+            result = kernel(img[outer])[crop]
+            advance()
+            yield inner, result
+    
+    def run(self, kernel, img, halo, out=None, dtype=None, bytes_per_pixel=32, progress=None):
+        """Apply ``kernel`` tile by tile and stitch the outputs.
+        
+        Args:
+            kernel: function mapping a 2D tile to an array of the same shape
+            halo: kernel support radius in pixels
+            out: optional preallocated result (e.g. a np.memmap for images
+                whose output does not fit in memory either)
+            dtype: result dtype when ``out`` is not given; defaults to the
+                dtype of the first tile's output
+            bytes_per_pixel: estimate of the kernel's working memory per
+                input pixel, used to size tiles
+            progress: optional ProgressToken, updated after every tile; a
+                cancelled run leaves ``out`` partially written
+        """
+        for inner, result in self.map(kernel, img, halo, bytes_per_pixel, progress):
+            if out is None:
+                out = np.empty(img.shape[:2] + result.shape[2:], dtype=dtype or result.dtype)
+            out[inner] = result
+        return out
+
+
+def tiled_gaussian_blur(img, sigma, executor=None, out=None, progress=None):
+    """Tiled equivalent of CustomImageProcessing.gaussian_blur.
+    
+    Tiles always use the direct convolution so results are bit-identical to
+    ``gaussian_blur(img, sigma, method='direct')``.
+    """
+    executor = executor or TiledExecutor()
+    halo = int(3 * sigma) if sigma > 0 else 0
+    return executor.run(lambda tile: CustomImageProcessing.gaussian_blur(tile, sigma, method='direct'),
+                        img, halo, out=out, dtype=np.float32, bytes_per_pixel=20, progress=progress)
+
+
+def tiled_lbp(img, radius=1, n_points=8, method='default', executor=None, out=None, progress=None):
+    """Tiled equivalent of CustomImageProcessing.compute_lbp."""
+    executor = executor or TiledExecutor()
+    # Tiles bypass the result cache; only whole images are worth keying
+    compute_lbp = CustomImageProcessing.compute_lbp.__wrapped__
+    return executor.run(lambda tile: compute_lbp(tile, radius, n_points, method),
+                        img, int(np.ceil(radius)), out=out, bytes_per_pixel=16, progress=progress)
+
+
+def tiled_gradient(img, output='magnitude', num_bins=8, executor=None, out=None, progress=None):
+    """Tiled equivalent of CustomImageProcessing.compute_gradient.
+    
+    'magnitude' needs the image-wide maximum, so it takes two passes: the
+    first only reduces the peak, the second normalizes every tile by it.
+    """
+    if output not in ('magnitude', 'direction', 'bins'):
+        raise ValueError(f"Unsupported tiled gradient output: {output}")
+    executor = executor or TiledExecutor()
+    progress = as_progress(progress)
+    
+    peak = None
+    if output == 'magnitude':
+        def squared(tile):
+            gx, gy, _ = CustomImageProcessing.compute_gradient(tile, 'all')
+            wide = np.int32 if gx.dtype == np.int16 else np.float32
+            return np.square(gx, dtype=wide) + np.square(gy, dtype=wide)
+        
+        tiles = executor.map(squared, img, 1, bytes_per_pixel=24, progress=progress.span(0.0, 0.5))
+        peak = np.sqrt(max(result.max() for _, result in tiles), dtype=np.float64)
+        progress = progress.span(0.5, 1.0)
+    
+    return executor.run(lambda tile: CustomImageProcessing.compute_gradient(tile, output, num_bins, peak),
+                        img, 1, out=out, bytes_per_pixel=24, progress=progress)
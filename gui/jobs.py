@@ -0,0 +1,144 @@
+"""Background job executor for the GUI.
+
+Every operation runs on one worker thread, so the Tk event loop never
+blocks. Workers never touch Tk: a job's result, error and progress reports
+go into a queue that the main thread drains with ``root.after`` polling,
+and the callbacks run there.
+
+Submitting a job supersedes any unfinished job with the same key (e.g.
+clicking 'Extract Features' twice): the stale job is cancelled, its queued
+run is skipped, and its results are dropped if it was already running.
+
+A job is a core ProgressToken, so it can be passed (or split with
+``job.span``) as the ``progress`` argument of core kernels: their progress
+reaches the progress bar, and a superseded job stops at the kernel's next
+checkpoint instead of running to completion.
+"""
+import queue
+import threading
+
+from core.progress import OperationCancelled, ProgressToken
+
+
+# Milliseconds between queue polls while jobs are in flight; keeps results
+# and progress on screen well within 50 ms
+POLL_INTERVAL_MS = 20
+
+
+class Job(ProgressToken):
+    """Handle passed to a job function and returned by ``JobExecutor.submit``."""
+
+    def __init__(self, executor, key, fn, on_done, on_error):
+        super().__init__(self._post_progress)
+        self.key = key
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self._events = executor._events
+
+    def _post_progress(self, fraction, message):
+        self._events.put(('progress', self, (fraction, message)))
+
+
+class JobExecutor:
+    """Single worker thread fed by ``submit`` and drained on the Tk thread.
+
+    Args:
+        root: Tk root used for ``after`` polling
+        on_progress: ``on_progress(job, fraction, message)`` called on the Tk
+            thread with the latest report of each live job, at most once per
+            poll
+        on_idle: called on the Tk thread once no job is queued or running
+    """
+
+    def __init__(self, root, on_progress=None, on_idle=None):
+        self.root = root
+        self.on_progress = on_progress
+        self.on_idle = on_idle
+        self._jobs = queue.Queue()
+        self._events = queue.Queue()
+        self._active = {}
+        self._worker = None
+        self._polling = False
+
+    @property
+    def busy(self):
+        return bool(self._active)
+
+    def submit(self, key, fn, on_done, on_error=None):
+        """Run ``fn(job)`` off-thread and pass its result to ``on_done`` on the Tk thread.
+
+        ``fn`` must not touch Tk; it gets everything it needs as arguments
+        captured at submit time. ``on_error(exception)`` runs on the Tk
+        thread if ``fn`` raises. Cancelled jobs call neither callback.
+        """
+        stale = self._active.get(key)
+        if stale is not None:
+            stale.cancel()
+        job = Job(self, key, fn, on_done, on_error)
+        self._active[key] = job
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='gui-jobs', daemon=True)
+            self._worker.start()
+        self._jobs.put(job)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        return job
+
+    def cancel(self, key=None):
+        """Cancel the job with ``key``, or every job when None."""
+        keys = list(self._active) if key is None else [key]
+        for k in keys:
+            job = self._active.pop(k, None)
+            if job is not None:
+                job.cancel()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job.cancelled:
+                self._events.put(('cancelled', job, None))
+                continue
+            try:
+                self._events.put(('done', job, job.fn(job)))
+            except OperationCancelled:
+                self._events.put(('cancelled', job, None))
+            except Exception as e:
+                self._events.put(('error', job, e))
+
+    def _poll(self):
+        # Kernels can report hundreds of times between polls; only the
+        # latest report of each job is drawn
+        latest = {}
+        while True:
+            try:
+                kind, job, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            # Superseded and cancelled jobs report nothing
+            live = not job.cancelled and self._active.get(job.key) is job
+            if kind == 'progress':
+                if live:
+                    latest[job] = payload
+                continue
+            latest.pop(job, None)
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+            if not live:
+                continue
+            if kind == 'done':
+                job.on_done(payload)
+            elif kind == 'error' and job.on_error is not None:
+                job.on_error(payload)
+        if self.on_progress is not None:
+            for job, (fraction, message) in latest.items():
+                if not job.cancelled:
+                    self.on_progress(job, fraction, message)
+
+        if self._active or not self._events.empty():
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False
+            if self.on_idle is not None:
+                self.on_idle()
@@ -2,15 +2,16 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import numpy as np
-from PIL import Image, ImageTk
-import threading
+from PIL import Image
 import os
 from pathlib import Path
 
-from core import CustomImageProcessing
+from core import CustomImageProcessing, detect_copy_move
 from utils.validators import validate_image, validate_dimensions
 from utils.helpers import draw_keypoints, create_feature_overlay
 from .styles import COLORS, FONTS
+from .jobs import JobExecutor
+from .preview import PreviewCache
 from .widgets import ModernButton, ModernLabel, ModernFrame, ProgressBar, StatusBar
 
 
@@ -40,9 +41,15 @@ class ImageForensicsGUIApp:
         self.image_path = None
         self.keypoints = None
         self.processing = False
+        self.previews = PreviewCache()
+        # Opt-in on-disk result cache, toggled from the header
+        self.cache_enabled = tk.BooleanVar(value=False)
         
         # Create UI
         self.create_ui()
+        
+        # Every operation runs off the Tk thread
+        self.jobs = JobExecutor(self.root, on_progress=self._on_job_progress, on_idle=self._on_jobs_idle)
     
     def create_ui(self):
         """Create the user interface."""
@@ -73,6 +80,12 @@ class ImageForensicsGUIApp:
         button_frame = ModernFrame(header, style='secondary')
         button_frame.pack(side='right', padx=20, pady=15)
         
+        tk.Checkbutton(button_frame, text='💾 Cache results', variable=self.cache_enabled,
+                       command=self._toggle_cache, font=FONTS['body'],
+                       bg=COLORS['bg_secondary'], fg=COLORS['text_primary'],
+                       selectcolor=COLORS['bg_tertiary'], activebackground=COLORS['bg_secondary'],
+                       activeforeground=COLORS['text_primary'], bd=0, highlightthickness=0
+                       ).pack(side='left', padx=5)
         ModernButton(button_frame, '📁 Import', command=self.import_image, 
                     style='primary').pack(side='left', padx=5)
         ModernButton(button_frame, '🔄 Reset', command=self.reset_app, 
@@ -157,6 +170,8 @@ class ImageForensicsGUIApp:
         ModernLabel(frame, text='Histogram Equalization', style='body').pack(anchor='w', padx=5, pady=5)
         ModernButton(frame, 'Enhance Contrast', command=self.enhance_contrast, 
                     style='primary').pack(fill='x', padx=5, pady=5)
+        ModernButton(frame, 'Adaptive Contrast (CLAHE)', command=lambda: self.enhance_contrast('clahe'),
+                    style='secondary').pack(fill='x', padx=5, pady=5)
         
         # Right panel - Image displays
         image_panel = ModernFrame(parent, style='primary')
@@ -189,7 +204,7 @@ class ImageForensicsGUIApp:
         ModernLabel(frame, text='Select Technique:', style='body').pack(anchor='w', padx=5, pady=3)
         
         self.feature_var = tk.StringVar(value='SIFT')
-        feature_options = ['SIFT', 'GLCM', 'LBP', 'Sobel']
+        feature_options = ['SIFT', 'Copy-Move', 'GLCM', 'GLCM Map', 'LBP', 'Sobel']
         self.feature_menu = ttk.Combobox(frame, textvariable=self.feature_var,
                                         values=feature_options, state='readonly',
                                         width=20, font=FONTS['body'])
@@ -288,27 +303,71 @@ class ImageForensicsGUIApp:
         if not file_path:
             return
         
+        # Results computed for the previous image are stale
+        self.jobs.cancel()
+        self._start_job('load', 'Loading image...',
+                        lambda job: np.array(Image.open(file_path).convert('RGB')),
+                        lambda img: self._show_loaded_image(file_path, img),
+                        'Failed to load image', 'Error loading image')
+    
+    def _show_loaded_image(self, file_path, img):
+        self.original_image = img
+        self.preprocessed_image = None
+        self.feature_extracted_image = None
+        self.reduced_image = None
+        self.image_path = file_path
+        
+        # Display original
+        self.display_image(self.original_image, self.original_label)
+        self.clear_preprocessing_displays()
+        self.clear_features_table()
+        
+        self.status_bar.set_status(f'✓ Loaded: {Path(file_path).name}', 'success')
+    
+    def _start_job(self, key, status, work, on_done, error_message, error_status):
+        """Run ``work(job)`` on the job executor, superseding the previous ``key`` job.
+
+        ``work`` runs on the worker thread and must not touch Tk; ``on_done``
+        receives its result on the Tk thread.
+        """
+        def on_error(e):
+            messagebox.showerror('Error', f'{error_message}: {str(e)}')
+            self.status_bar.set_status(error_status, 'error')
+        
+        self.processing = True
+        self.status_bar.set_status(status, 'info')
+        return self.jobs.submit(key, work, on_done, on_error)
+    
+    def _on_job_progress(self, job, fraction, message):
+        self.progress_bar.set_value(fraction * 100)
+        if message:
+            self.status_bar.set_status(message, 'info')
+    
+    def _on_jobs_idle(self):
+        self.processing = False
+        self.progress_bar.set_value(0)
+    
+    def _read_dimensions(self):
+        """Resize width and height from the entries, or None after reporting bad input."""
         try:
-            self.status_bar.set_status('Loading image...', 'info')
-            self.root.update()
-            
-            img_pil = Image.open(file_path).convert('RGB')
-            self.original_image = np.array(img_pil)
-            self.preprocessed_image = None
-            self.feature_extracted_image = None
-            self.reduced_image = None
-            self.image_path = file_path
-            
-            # Display original
-            self.display_image(self.original_image, self.original_label)
-            self.clear_preprocessing_displays()
-            self.clear_features_table()
-            
-            self.status_bar.set_status(f'✓ Loaded: {Path(file_path).name}', 'success')
-            
-        except Exception as e:
-            messagebox.showerror('Error', f'Failed to load image: {str(e)}')
-            self.status_bar.set_status('Error loading image', 'error')
+            width = int(self.resize_width.get())
+            height = int(self.resize_height.get())
+        except ValueError:
+            messagebox.showerror('Error', 'Please enter valid numbers')
+            self.status_bar.set_status('Invalid input', 'error')
+            return None
+        if width <= 0 or height <= 0:
+            messagebox.showerror('Error', 'Dimensions must be positive')
+            return None
+        return width, height
+    
+    def _show_preprocessed(self, img, message):
+        self.preprocessed_image = img
+        is_gray = len(img.shape) == 2
+        self.display_image(img, self.preprocessed_label, is_gray=is_gray)
+        if hasattr(self, 'feature_preview_label'):
+            self.display_image(img, self.feature_preview_label, is_gray=is_gray)
+        self.status_bar.set_status(message, 'success')
     
     def to_grayscale(self):
         """Convert to grayscale."""
@@ -316,25 +375,16 @@ class ImageForensicsGUIApp:
             messagebox.showwarning('Warning', 'Please import an image first')
             return
         
-        try:
-            self.status_bar.set_status('Converting to grayscale...', 'info')
-            self.root.update()
-            
-            if len(self.original_image.shape) == 3:
-                gray = self.processor.rgb_to_grayscale(self.original_image)
-            else:
-                gray = self.original_image.copy()
-            
-            self.preprocessed_image = gray
-            self.display_image(gray, self.preprocessed_label, is_gray=True)
-            if hasattr(self, 'feature_preview_label'):
-                self.display_image(gray, self.feature_preview_label, is_gray=True)
-            
-            self.status_bar.set_status('✓ Grayscale conversion complete', 'success')
-            
-        except Exception as e:
-            messagebox.showerror('Error', f'Conversion failed: {str(e)}')
-            self.status_bar.set_status('Error during conversion', 'error')
+        img = self.original_image
+        
+        def work(job):
+            if len(img.shape) == 3:
+                return self.processor.rgb_to_grayscale(img)
+            return img.copy()
+        
+        self._start_job('preprocess', 'Converting to grayscale...', work,
+                        lambda gray: self._show_preprocessed(gray, '✓ Grayscale conversion complete'),
+                        'Conversion failed', 'Error during conversion')
     
     def resize_image(self):
         """Resize image."""
@@ -342,34 +392,16 @@ class ImageForensicsGUIApp:
             messagebox.showwarning('Warning', 'Please import an image first')
             return
         
-        try:
-            width = int(self.resize_width.get())
-            height = int(self.resize_height.get())
-            
-            if width <= 0 or height <= 0:
-                messagebox.showerror('Error', 'Dimensions must be positive')
-                return
-            
-            self.status_bar.set_status(f'Resizing to {width}x{height}...', 'info')
-            self.root.update()
-            
-            img = self.original_image
-            resized = self.processor.resize_bilinear(img, width, height)
-            
-            self.preprocessed_image = resized
-            is_gray = len(resized.shape) == 2
-            self.display_image(resized, self.preprocessed_label, is_gray=is_gray)
-            if hasattr(self, 'feature_preview_label'):
-                self.display_image(resized, self.feature_preview_label, is_gray=is_gray)
-            
-            self.status_bar.set_status(f'✓ Resized to {width}x{height}', 'success')
-            
-        except ValueError:
-            messagebox.showerror('Error', 'Please enter valid numbers')
-            self.status_bar.set_status('Invalid input', 'error')
-        except Exception as e:
-            messagebox.showerror('Error', f'Resize failed: {str(e)}')
-            self.status_bar.set_status('Error during resize', 'error')
+        dimensions = self._read_dimensions()
+        if dimensions is None:
+            return
+        width, height = dimensions
+        img = self.original_image
+        
+        self._start_job('preprocess', f'Resizing to {width}x{height}...',
+                        lambda job: self.processor.resize_bilinear(img, width, height),
+                        lambda resized: self._show_preprocessed(resized, f'✓ Resized to {width}x{height}'),
+                        'Resize failed', 'Error during resize')
 
     def grayscale_and_resize_action(self):
         """Convert to grayscale and resize in one operation."""
@@ -377,156 +409,137 @@ class ImageForensicsGUIApp:
             messagebox.showwarning('Warning', 'Please import an image first')
             return
 
-        try:
-            width = int(self.resize_width.get())
-            height = int(self.resize_height.get())
-
-            if width <= 0 or height <= 0:
-                messagebox.showerror('Error', 'Dimensions must be positive')
-                return
-
-            self.status_bar.set_status(f'Converting to grayscale and resizing to {width}x{height}...', 'info')
-            self.root.update()
-
-            img = self.original_image
-            processed = self.processor.grayscale_and_resize(img, width, height)
-
-            self.preprocessed_image = processed
-            # Result will be grayscale (2D)
-            self.display_image(processed, self.preprocessed_label, is_gray=True)
-            if hasattr(self, 'feature_preview_label'):
-                self.display_image(processed, self.feature_preview_label, is_gray=True)
-
-            self.status_bar.set_status(f'✓ Grayscale + Resize complete ({width}x{height})', 'success')
+        dimensions = self._read_dimensions()
+        if dimensions is None:
+            return
+        width, height = dimensions
+        img = self.original_image
 
-        except ValueError:
-            messagebox.showerror('Error', 'Please enter valid numbers')
-            self.status_bar.set_status('Invalid input', 'error')
-        except Exception as e:
-            messagebox.showerror('Error', f'Operation failed: {str(e)}')
-            self.status_bar.set_status('Error during operation', 'error')
+        self._start_job('preprocess', f'Converting to grayscale and resizing to {width}x{height}...',
+                        lambda job: self.processor.grayscale_and_resize(img, width, height),
+                        lambda processed: self._show_preprocessed(
+                            processed, f'✓ Grayscale + Resize complete ({width}x{height})'),
+                        'Operation failed', 'Error during operation')
     
-    def enhance_contrast(self):
-        """Apply histogram equalization."""
+    def enhance_contrast(self, mode='global'):
+        """Apply global or adaptive (CLAHE) histogram equalization."""
         if self.preprocessed_image is None and self.original_image is None:
             messagebox.showwarning('Warning', 'Please import an image first')
             return
         
-        try:
-            self.status_bar.set_status('Enhancing contrast...', 'info')
-            self.root.update()
-            
-            img = self.preprocessed_image if self.preprocessed_image is not None else self.original_image
-            
-            if len(img.shape) == 3:
-                gray = self.processor.rgb_to_grayscale(img)
-            else:
-                gray = img.copy()
-            
-            enhanced = self.processor.histogram_equalization(gray)
-            self.preprocessed_image = enhanced
-            self.display_image(enhanced, self.preprocessed_label, is_gray=True)
-            if hasattr(self, 'feature_preview_label'):
-                self.display_image(enhanced, self.feature_preview_label, is_gray=True)
-            
-            self.status_bar.set_status('✓ Contrast enhancement complete', 'success')
-            
-        except Exception as e:
-            messagebox.showerror('Error', f'Enhancement failed: {str(e)}')
-            self.status_bar.set_status('Error during enhancement', 'error')
+        img = self.preprocessed_image if self.preprocessed_image is not None else self.original_image
+        
+        def work(job):
+            gray = self.processor.rgb_to_grayscale(img) if len(img.shape) == 3 else img.copy()
+            job.update(0.5)
+            return self.processor.histogram_equalization(gray, mode=mode)
+        
+        self._start_job('preprocess', 'Enhancing contrast...', work,
+                        lambda enhanced: self._show_preprocessed(enhanced, '✓ Contrast enhancement complete'),
+                        'Enhancement failed', 'Error during enhancement')
     
     def extract_features(self):
-        """Extract features using threading."""
+        """Extract features on the job executor."""
         if self.preprocessed_image is None:
             messagebox.showwarning('Warning', 'Please preprocess image first')
             return
         
         technique = self.feature_var.get()
-        
-        # Run in background thread
-        thread = threading.Thread(target=self._extract_features_thread, args=(technique,))
-        thread.daemon = True
-        thread.start()
+        img = self.preprocessed_image
+        self._start_job('features', f'Extracting {technique} features...',
+                        lambda job: self._extract_features_job(job, technique, img),
+                        self._show_features, 'Feature extraction failed', 'Error during extraction')
     
-    def _extract_features_thread(self, technique):
-        """Background thread for feature extraction."""
-        try:
-            self.processing = True
-            self.status_bar.set_status(f'Extracting {technique} features...', 'info')
-            self.progress_bar.set_value(0)
-            self.root.update()
-            
-            img = self.preprocessed_image.copy()
-            
-            if len(img.shape) == 3:
-                img_gray = self.processor.rgb_to_grayscale(img)
-            else:
-                img_gray = img.copy()
-            
-            img_gray = self.processor.histogram_equalization(img_gray)
-            self.progress_bar.set_value(20)
-            self.root.update()
-            
-            if technique == 'SIFT':
-                keypoints = self.processor.compute_sift_keypoints(img_gray)
-                self.keypoints = keypoints
-                
-                feature_img = np.stack([img_gray, img_gray, img_gray], axis=-1)
-                feature_img = draw_keypoints(feature_img, keypoints)
-                
-                self.feature_extracted_image = feature_img
-                self.clear_features_table()
-                self.features_table.insert('', 'end', values=('Technique', 'SIFT'))
-                self.features_table.insert('', 'end', values=('Keypoints Found', len(keypoints)))
-                
-            elif technique == 'GLCM':
-                glcm = self.processor.compute_glcm(img_gray)
-                contrast, dissimilarity, homogeneity, energy, correlation = self.processor.glcm_properties(glcm)
-                
-                feature_img = np.stack([img_gray, img_gray, img_gray], axis=-1)
-                self.feature_extracted_image = feature_img
-                
-                self.clear_features_table()
-                self.features_table.insert('', 'end', values=('Technique', 'GLCM'))
-                self.features_table.insert('', 'end', values=('Contrast', f'{contrast:.4f}'))
-                self.features_table.insert('', 'end', values=('Dissimilarity', f'{dissimilarity:.4f}'))
-                self.features_table.insert('', 'end', values=('Homogeneity', f'{homogeneity:.4f}'))
-                self.features_table.insert('', 'end', values=('Energy', f'{energy:.4f}'))
-                self.features_table.insert('', 'end', values=('Correlation', f'{correlation:.4f}'))
-                
-            elif technique == 'LBP':
-                lbp_img = self.processor.compute_lbp(img_gray)
-                feature_img = (lbp_img / lbp_img.max() * 255).astype(np.uint8) if lbp_img.max() > 0 else lbp_img
-                self.feature_extracted_image = feature_img
-                
-                self.clear_features_table()
-                self.features_table.insert('', 'end', values=('Technique', 'LBP'))
-                self.features_table.insert('', 'end', values=('Patterns Found', np.sum(feature_img > 0)))
-                
-            elif technique == 'Sobel':
-                gx, gy, magnitude = self.processor.compute_gradient(img_gray)
-                self.feature_extracted_image = magnitude
-                
-                self.clear_features_table()
-                self.features_table.insert('', 'end', values=('Technique', 'Sobel'))
-                self.features_table.insert('', 'end', values=('Edges Found', np.sum(magnitude > 0)))
-            
-            self.progress_bar.set_value(100)
-            self.display_image(self.feature_extracted_image, self.feature_extracted_label, 
-                             is_gray=(len(self.feature_extracted_image.shape) == 2))
-            self.root.update()
-            
-            self.status_bar.set_status(f'✓ {technique} extraction complete', 'success')
-            
-        except Exception as e:
-            messagebox.showerror('Error', f'Feature extraction failed: {str(e)}')
-            self.status_bar.set_status('Error during extraction', 'error')
-        finally:
-            self.processing = False
-            self.progress_bar.set_value(0)
+    def _extract_features_job(self, job, technique, img):
+        """Compute features on the worker thread.
+
+        Returns:
+            dict with the technique, feature image, keypoints (or None) and
+            (feature, value) rows for the features table
+        """
+        job.update(0.0)
+        if len(img.shape) == 3:
+            img_gray = self.processor.rgb_to_grayscale(img)
+        else:
+            img_gray = img.copy()
+        
+        img_gray = self.processor.histogram_equalization(img_gray)
+        job.update(0.2)
+        # Kernels fill the rest of the bar
+        progress = job.span(0.2, 0.95)
+        
+        keypoints = None
+        rows = [('Technique', technique)]
+        if technique == 'SIFT':
+            keypoints = self.processor.compute_sift_keypoints(img_gray, progress=progress)
+            
+            feature_img = np.stack([img_gray, img_gray, img_gray], axis=-1)
+            feature_img = draw_keypoints(feature_img, keypoints)
+            rows.append(('Keypoints Found', len(keypoints)))
+            
+        elif technique == 'Copy-Move':
+            # SIFT dominates copy-move detection
+            keypoints = self.processor.compute_sift_keypoints(img_gray, progress=progress.span(0.0, 0.8))
+            result = detect_copy_move(img_gray, keypoints)
+            job.update(0.95)
+            feature_img = create_feature_overlay(img_gray, result['mask'])
+            
+            rows.append(('Keypoints Found', len(result['keypoints'])))
+            rows.append(('Self-Matches', len(result['matches'])))
+            rows.append(('Duplicated Regions', len(result['regions'])))
+            for n, region in enumerate(result['regions'], 1):
+                sx0, sy0, sx1, sy1 = (int(v) for v in region['source_bbox'])
+                tx0, ty0, tx1, ty1 = (int(v) for v in region['target_bbox'])
+                rows.append((f'Region {n} ({region["inliers"]} inliers)',
+                             f'({sx0},{sy0})-({sx1},{sy1}) → ({tx0},{ty0})-({tx1},{ty1})'))
+            
+        elif technique == 'GLCM':
+            glcm = self.processor.compute_glcm(img_gray)
+            contrast, dissimilarity, homogeneity, energy, correlation = self.processor.glcm_properties(glcm)
+            job.update(0.6)
+            
+            feature_img = np.stack([img_gray, img_gray, img_gray], axis=-1)
+            rows.append(('Contrast', f'{contrast:.4f}'))
+            rows.append(('Dissimilarity', f'{dissimilarity:.4f}'))
+            rows.append(('Homogeneity', f'{homogeneity:.4f}'))
+            rows.append(('Energy', f'{energy:.4f}'))
+            rows.append(('Correlation', f'{correlation:.4f}'))
+            
+            # Per-angle contrast for anisotropy analysis
+            angle_contrast = self.processor.glcm_properties(self.processor.compute_glcm_stack(img_gray))[0][0]
+            for degrees, value in zip((0, 45, 90, 135), angle_contrast):
+                rows.append((f'Contrast {degrees}°', f'{value:.4f}'))
+            
+        elif technique == 'GLCM Map':
+            maps = self.processor.glcm_texture_maps(img_gray, full_size=True, progress=progress)
+            feature_img = create_feature_overlay(img_gray, maps['contrast'])
+            
+            for name, values in maps.items():
+                rows.append((f'{name.title()} (min / max)', f'{values.min():.4f} / {values.max():.4f}'))
+            
+        elif technique == 'LBP':
+            lbp_img = self.processor.compute_lbp(img_gray, progress=progress)
+            feature_img = (lbp_img / lbp_img.max() * 255).astype(np.uint8) if lbp_img.max() > 0 else lbp_img
+            rows.append(('Patterns Found', np.sum(feature_img > 0)))
+            
+        elif technique == 'Sobel':
+            feature_img = self.processor.compute_gradient(img_gray, output='magnitude')
+            rows.append(('Edges Found', np.sum(feature_img > 0)))
+        
+        job.update(1.0)
+        return {'technique': technique, 'image': feature_img, 'keypoints': keypoints, 'rows': rows}
+    
+    def _show_features(self, result):
+        if result['keypoints'] is not None:
+            self.keypoints = result['keypoints']
+        self.feature_extracted_image = result['image']
+        self.fill_features_table(result['rows'])
+        self.display_image(self.feature_extracted_image, self.feature_extracted_label,
+                           is_gray=(len(self.feature_extracted_image.shape) == 2))
+        self.status_bar.set_status(f'✓ {result["technique"]} extraction complete', 'success')
     
     def reduce_features(self):
-        """Apply PCA reduction using threading."""
+        """Apply PCA reduction on the job executor."""
         if self.feature_extracted_image is None:
             messagebox.showwarning('Warning', 'Please extract features first')
             return
@@ -540,54 +553,40 @@ class ImageForensicsGUIApp:
             messagebox.showerror('Error', 'Please enter a valid number')
             return
         
-        # Run in background thread
-        thread = threading.Thread(target=self._reduce_features_thread, args=(n_components,))
-        thread.daemon = True
-        thread.start()
+        img = self.feature_extracted_image
+        self._start_job('reduce', 'Applying PCA reduction...',
+                        lambda job: self._reduce_features_job(job, img, n_components),
+                        self._show_reduced, 'PCA reduction failed', 'Error during reduction')
     
-    def _reduce_features_thread(self, n_components):
-        """Background thread for PCA reduction."""
-        try:
-            self.processing = True
-            self.status_bar.set_status('Applying PCA reduction...', 'info')
-            self.progress_bar.set_value(50)
-            self.root.update()
-            
-            img = self.feature_extracted_image.copy()
-            
-            if len(img.shape) == 3:
-                img = self.processor.rgb_to_grayscale(img)
-            
-            img_normalized = img.astype(float) / 255.0
-            h, w = img.shape
-            pixels = img_normalized.reshape(h, w)
-            
-            max_components = min(n_components, h, w)
-            reconstructed, explained_variance, actual_components = self.processor.pca_reduction(
-                pixels.T, max_components)
-            
-            reduced_img = reconstructed.T
-            reduced_img = np.uint8(np.clip(reduced_img * 255, 0, 255))
-            
-            self.reduced_image = reduced_img
-            self.progress_bar.set_value(100)
-            
-            self.clear_features_table()
-            self.features_table.insert('', 'end', values=('Operation', 'PCA Reduction'))
-            self.features_table.insert('', 'end', values=('Components', actual_components))
-            self.features_table.insert('', 'end', values=('Variance Explained', f'{explained_variance:.4f}'))
-            
-            self.display_image(reduced_img, self.reduced_label, is_gray=True)
-            self.root.update()
-            
-            self.status_bar.set_status(f'✓ PCA reduction to {actual_components} components', 'success')
-            
-        except Exception as e:
-            messagebox.showerror('Error', f'PCA reduction failed: {str(e)}')
-            self.status_bar.set_status('Error during reduction', 'error')
-        finally:
-            self.processing = False
-            self.progress_bar.set_value(0)
+    def _reduce_features_job(self, job, img, n_components):
+        """PCA reconstruction on the worker thread; returns (image, variance, components)."""
+        job.update(0.1)
+        if len(img.shape) == 3:
+            img = self.processor.rgb_to_grayscale(img)
+        
+        img_normalized = img.astype(float) / 255.0
+        h, w = img.shape
+        pixels = img_normalized.reshape(h, w)
+        
+        max_components = min(n_components, h, w)
+        reconstructed, explained_variance, actual_components = self.processor.pca_reduction(
+            pixels.T, max_components, progress=job.span(0.1, 0.95))
+        
+        reduced_img = reconstructed.T
+        reduced_img = np.uint8(np.clip(reduced_img * 255, 0, 255))
+        job.update(1.0)
+        return reduced_img, explained_variance, actual_components
+    
+    def _show_reduced(self, result):
+        reduced_img, explained_variance, actual_components = result
+        self.reduced_image = reduced_img
+        
+        self.fill_features_table([('Operation', 'PCA Reduction'),
+                                  ('Components', actual_components),
+                                  ('Variance Explained', f'{explained_variance:.4f}')])
+        
+        self.display_image(reduced_img, self.reduced_label, is_gray=True)
+        self.status_bar.set_status(f'✓ PCA reduction to {actual_components} components', 'success')
     
     def save_feature_image(self):
         """Save feature extracted image."""
@@ -634,8 +633,24 @@ class ImageForensicsGUIApp:
         except Exception as e:
             messagebox.showerror('Error', f'Save failed: {str(e)}')
     
+    def _toggle_cache(self):
+        """Turn the on-disk result cache on or off from the header checkbox."""
+        if not self.cache_enabled.get():
+            self.processor.disable_cache()
+            self.status_bar.set_status('Result cache off', 'info')
+            return
+        try:
+            cache = self.processor.enable_cache()
+        except OSError as e:
+            self.cache_enabled.set(False)
+            self.status_bar.set_status(f'Cannot use result cache: {e}', 'error')
+            return
+        self.status_bar.set_status(
+            f'Caching results in {cache.directory} (up to {cache.max_bytes >> 30} GB)', 'info')
+    
     def reset_app(self):
         """Reset the application."""
+        self.jobs.cancel()
         self.original_image = None
         self.preprocessed_image = None
         self.feature_extracted_image = None
@@ -648,33 +663,29 @@ class ImageForensicsGUIApp:
         self.status_bar.set_status('✓ Application reset', 'success')
     
     def display_image(self, img, label, is_gray=False):
-        """Display image on label with proper scaling."""
+        """Display image on label with proper scaling.
+        
+        Previews come from a per-array pyramid and refill the label's
+        existing PhotoImage when the size matches; showing the same array
+        in the same box again does nothing. Grayscale arrays are shown as
+        such, so ``is_gray`` is only kept for callers.
+        """
         try:
-            if len(img.shape) == 2:
-                img_display = np.stack([img, img, img], axis=-1)
-            else:
-                img_display = img.copy()
-            
-            # Scale to fit label
-            max_size = 300
-            h, w = img_display.shape[:2]
-            scale = min(max_size / h, max_size / w, 1.0)
-            
-            new_h = int(h * scale)
-            new_w = int(w * scale)
-            
-            if new_h > 0 and new_w > 0:
-                img_resized = self.processor.resize_bilinear(img_display, new_w, new_h)
-                
-                img_pil = Image.fromarray(img_resized.astype(np.uint8))
-                img_tk = ImageTk.PhotoImage(img_pil)
-                
-                label.config(image=img_tk)
-                label.image = img_tk
-                
+            self.previews.show(img, label, *self._preview_box(label))
         except Exception as e:
             print(f'Error displaying image: {e}')
     
+    def _preview_box(self, label):
+        """Pixel box an image on ``label`` is fitted into."""
+        # Labels showing an image take width/height in pixels
+        width, height = int(label.cget('width')), int(label.cget('height'))
+        if getattr(label, 'image', None) and label.winfo_ismapped():
+            # Expanding labels may have been given more room than requested
+            border = 2 * (int(label.cget('bd')) + int(label.cget('highlightthickness')))
+            width = max(width, label.winfo_width() - border)
+            height = max(height, label.winfo_height() - border)
+        return width, height
+    
     def clear_preprocessing_displays(self):
         """Clear preprocessing display labels."""
         self.preprocessed_label.config(image='')
@@ -697,3 +708,9 @@ class ImageForensicsGUIApp:
         """Clear features table."""
         for item in self.features_table.get_children():
             self.features_table.delete(item)
+    
+    def fill_features_table(self, rows):
+        """Replace the features table contents with (feature, value) rows."""
+        self.clear_features_table()
+        for row in rows:
+            self.features_table.insert('', 'end', values=row)
@@ -0,0 +1,118 @@
+"""Preview pyramids and in-place PhotoImage updates for image labels.
+
+Each displayed array gets a lazily built mip pyramid: level k is the image
+box-filtered down by 2**k, computed from the nearest finer level already
+built. A label is served from the smallest level that still covers its box,
+so the final bilinear resize only touches a few hundred thousand pixels
+whatever the image size.
+
+Arrays are identified by object identity and treated as immutable once
+displayed, which holds for the GUI's state images (every operation returns
+a new array). Pyramids are dropped when their array is garbage collected or
+pushed out of the small LRU.
+"""
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageTk
+
+from core import CustomImageProcessing
+
+
+# Pyramids kept for recently displayed arrays
+MAX_PYRAMIDS = 8
+
+
+def _as_uint8(img):
+    if img.dtype == np.uint8:
+        return img
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+class PreviewPyramid:
+    """Box-filtered power-of-two reductions of one image.
+
+    The full-resolution image is not kept (unless it had to be converted
+    to uint8), so the pyramid never keeps a state image alive.
+    """
+
+    def __init__(self, img):
+        self.shape = img.shape
+        # uint8 conversions of the source are worth keeping; the source is not
+        self._levels = {} if img.dtype == np.uint8 else {0: _as_uint8(img)}
+
+    def level(self, img, k):
+        """Level ``k`` (reduced by 2**k) of ``img``, the array this pyramid was built for."""
+        if k == 0:
+            return self._levels.get(0, img)
+        if k not in self._levels:
+            finer = max((j for j in self._levels if j < k), default=0)
+            self._levels[k] = CustomImageProcessing.box_downsample(
+                self.level(img, finer), 2 ** (k - finer))
+        return self._levels[k]
+
+    def render(self, img, max_width, max_height):
+        """uint8 image fitted into max_width x max_height (never enlarged)."""
+        h, w = self.shape[:2]
+        scale = min(max_width / w, max_height / h, 1.0)
+        new_w, new_h = max(int(w * scale), 1), max(int(h * scale), 1)
+        # Smallest level that still has at least the output resolution
+        k = 0
+        while (w >> (k + 1)) >= new_w and (h >> (k + 1)) >= new_h:
+            k += 1
+        level = self.level(img, k)
+        if level.shape[:2] == (new_h, new_w):
+            return level
+        return CustomImageProcessing.resize_bilinear(level, new_w, new_h).reshape(
+            (new_h, new_w) + level.shape[2:])
+
+
+class PreviewCache:
+    """Displays arrays on labels from cached pyramids, reusing PhotoImages."""
+
+    def __init__(self, max_pyramids=MAX_PYRAMIDS):
+        self.max_pyramids = max_pyramids
+        self._pyramids = OrderedDict()
+        # label -> (array weakref, box) of what it currently shows
+        self._shown = {}
+
+    def pyramid(self, img):
+        key = id(img)
+        entry = self._pyramids.get(key)
+        if entry is not None and entry[0]() is img:
+            self._pyramids.move_to_end(key)
+            return entry[1]
+        pyramid = PreviewPyramid(img)
+        pyramids = self._pyramids
+
+        def release(ref):
+            # Drop the entry once its array is gone, unless the id was reused
+            if pyramids.get(key, (None,))[0] is ref:
+                del pyramids[key]
+
+        self._pyramids[key] = (weakref.ref(img, release), pyramid)
+        while len(self._pyramids) > self.max_pyramids:
+            self._pyramids.popitem(last=False)
+        return pyramid
+
+    def show(self, img, label, max_width, max_height):
+        """Show ``img`` on ``label`` fitted into the box; a repeat of the same call is free."""
+        box = (max_width, max_height)
+        shown = self._shown.get(label)
+        photo = getattr(label, 'image', None)
+        if shown is not None and shown[0]() is img and shown[1] == box and photo is not None:
+            return
+
+        preview = self.pyramid(img).render(img, max_width, max_height)
+        pil_img = Image.fromarray(preview, mode='L' if preview.ndim == 2 else 'RGB')
+        if (isinstance(photo, ImageTk.PhotoImage) and getattr(label, 'image_mode', None) == pil_img.mode
+                and (photo.width(), photo.height()) == pil_img.size):
+            # Same geometry: overwrite the pixels of the existing Tk image
+            photo.paste(pil_img)
+        else:
+            photo = ImageTk.PhotoImage(pil_img)
+            label.config(image=photo)
+            label.image = photo
+            label.image_mode = pil_img.mode
+        self._shown[label] = (weakref.ref(img), box)
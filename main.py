@@ -1,4 +1,3 @@
-import tkinter as tk
 import sys
 from pathlib import Path
 
@@ -6,11 +5,12 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from gui import ImageForensicsGUIApp
-
 
 def main():
     """Launch the application."""
+    import tkinter as tk
+    from gui import ImageForensicsGUIApp
+    
     root = tk.Tk()
     
     # Configure window
@@ -24,4 +24,8 @@ def main():
 
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        # Headless mode, e.g. `python main.py batch IN_DIR OUT_DIR`
+        from cli import main as cli_main
+        sys.exit(cli_main())
     main()
@@ -0,0 +1,100 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from core.ann_index import DescriptorIndex
+
+
+def _image_descriptors(rng, n_images=6, per_image=150):
+    """Descriptors of synthetic images, each scattered around its own centres."""
+    images = []
+    for _ in range(n_images):
+        centres = rng.random((10, 128)).astype(np.float32) * 100
+        images.append(centres[rng.integers(0, 10, per_image)] + rng.normal(0, 2, (per_image, 128)).astype(np.float32))
+    return images
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    rng = np.random.default_rng(0)
+    images = _image_descriptors(rng)
+    training = np.concatenate(images + _image_descriptors(rng, n_images=14))
+    return images, training
+
+
+def _build(path, corpus):
+    images, training = corpus
+    index = DescriptorIndex.create(path, training, n_lists=16)
+    for start in (0, 2, 4):
+        for i in range(start, start + 2):
+            index.add(f'image{i}.jpg', images[i])
+        index.flush()
+    return index
+
+
+def test_add_flush_appends_segments(tmp_path, corpus):
+    images, _ = corpus
+    index = _build(tmp_path / 'idx', corpus)
+    assert len(index.segments) == 3
+    assert len(index) == sum(len(d) for d in images)
+    assert index.names == [f'image{i}.jpg' for i in range(6)]
+    reopened = DescriptorIndex.open(tmp_path / 'idx')
+    assert len(reopened) == len(index) and reopened.names == index.names
+    with pytest.raises(FileExistsError):
+        DescriptorIndex.create(tmp_path / 'idx', corpus[1], n_lists=16)
+
+
+def test_search_ranks_the_source_image_first(tmp_path, corpus):
+    images, _ = corpus
+    index = _build(tmp_path / 'idx', corpus)
+    rng = np.random.default_rng(1)
+    for i, descriptors in enumerate(images):
+        query = descriptors[:60] + rng.normal(0, 0.5, (60, 128)).astype(np.float32)
+        results = index.search(query, top_k=3)
+        assert results[0][0] == f'image{i}.jpg'
+        assert all(results[0][1] > 2 * votes for _, votes in results[1:])
+
+
+def test_compact_keeps_contents_and_results(tmp_path, corpus):
+    images, _ = corpus
+    index = _build(tmp_path / 'idx', corpus)
+    query = images[3][:80]
+    before = index.search(query, top_k=6)
+    length, names = len(index), index.names
+    index.compact()
+    assert len(index.segments) == 1
+    assert len(index) == length and index.names == names
+    assert index.search(query, top_k=6) == before
+    reopened = DescriptorIndex.open(tmp_path / 'idx', mmap_mode=None)
+    assert reopened.search(query, top_k=6) == before
+
+
+def test_interrupted_compaction_does_not_duplicate(tmp_path, corpus):
+    images, _ = corpus
+    index = _build(tmp_path / 'idx', corpus)
+    segments_dir = tmp_path / 'idx' / 'segments'
+    saved = tmp_path / 'saved'
+    shutil.copytree(segments_dir, saved)
+    length, names = len(index), index.names
+    index.compact()
+    # Put back the merged-away segments, as if the process died before
+    # removing them, along with a half-written segment
+    for old in saved.iterdir():
+        shutil.copytree(old, segments_dir / old.name)
+    (segments_dir / '000009.tmp').mkdir()
+
+    reopened = DescriptorIndex.open(tmp_path / 'idx')
+    assert len(reopened.segments) == 1
+    assert len(reopened) == length and reopened.names == names
+    reopened.compact()
+    assert sorted(p.name for p in segments_dir.iterdir()) == ['000003', '000009.tmp']
+    assert len(DescriptorIndex.open(tmp_path / 'idx')) == length
+
+
+def test_empty_index_and_query(tmp_path, corpus):
+    index = DescriptorIndex.create(tmp_path / 'idx', corpus[1], n_lists=16)
+    assert len(index) == 0 and index.search(corpus[0][0]) == []
+    index.add('image0.jpg', corpus[0][0])
+    assert index.search(np.zeros((0, 128), dtype=np.float32)) == []
+    assert index.search(corpus[0][0][:20])[0][0] == 'image0.jpg'
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pytest
+
+from core import CustomImageProcessing, ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path / 'cache')
+
+
+@pytest.fixture
+def enabled_cache(tmp_path):
+    cache = CustomImageProcessing.enable_cache(tmp_path / 'cache')
+    yield cache
+    CustomImageProcessing.disable_cache()
+
+
+def _image(seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (40, 50), dtype=np.uint8)
+
+
+def _entries(cache):
+    return sorted(cache.directory.glob('*/*.npz'))
+
+
+def test_round_trip(cache):
+    arrays = {'codes': np.arange(12, dtype=np.uint16).reshape(3, 4), 'score': np.float64(2.5),
+              'names': np.array(['a', 'bc'])}
+    key = cache.key(_image(), 'op', 1, radius=2)
+    assert cache.get(key) is None
+    cache.put(key, arrays)
+    loaded = cache.get(key)
+    assert set(loaded) == set(arrays)
+    for name, value in arrays.items():
+        np.testing.assert_array_equal(loaded[name], value)
+        assert loaded[name].dtype == np.asarray(value).dtype
+
+
+def test_key_covers_pixels_op_version_and_params():
+    img = _image()
+    key = ResultCache.key(img, 'op', 1, radius=2, mode='x')
+    assert ResultCache.key(img.copy(), 'op', 1, mode='x', radius=2) == key
+    changed = img.copy()
+    changed[20, 25] ^= 1
+    assert ResultCache.key(changed, 'op', 1, radius=2, mode='x') != key
+    assert ResultCache.key(img.astype(np.int16), 'op', 1, radius=2, mode='x') != key
+    assert ResultCache.key(img, 'other', 1, radius=2, mode='x') != key
+    assert ResultCache.key(img, 'op', 2, radius=2, mode='x') != key
+    assert ResultCache.key(img, 'op', 1, radius=3, mode='x') != key
+    assert ResultCache.key(img, 'op', 1, radius=np.int64(2), mode='x') == key
+
+
+def test_key_hashes_array_params_by_content():
+    a = np.zeros(5000)
+    b = a.copy()
+    # Far from the ends, where a truncated repr would not show it
+    b[2500] = 1
+    assert ResultCache.key(_image(), 'op', 1, weights=a) != ResultCache.key(_image(), 'op', 1, weights=b)
+    assert ResultCache.key(_image(), 'op', 1, weights=a) == ResultCache.key(_image(), 'op', 1, weights=a.copy())
+    assert (ResultCache.key(_image(), 'op', 1, weights=a) !=
+            ResultCache.key(_image(), 'op', 1, weights=a.reshape(50, 100)))
+
+
+@pytest.mark.parametrize('damage', ['truncate', 'garbage', 'empty'])
+def test_corrupt_entry_is_a_miss_and_removed(cache, damage):
+    key = cache.key(_image(), 'op', 1)
+    cache.put(key, {'values': np.arange(1000)})
+    path, = _entries(cache)
+    data = path.read_bytes()
+    path.write_bytes({'truncate': data[:len(data) // 2], 'garbage': b'not a zip' * 20, 'empty': b''}[damage])
+
+    assert cache.get(key) is None
+    assert not path.exists()
+    cache.put(key, {'values': np.arange(1000)})
+    np.testing.assert_array_equal(cache.get(key)['values'], np.arange(1000))
+
+
+def test_eviction_keeps_recently_used_entries(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=3 * 9000)
+    keys = [cache.key(_image(i), 'op', 1) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, {'values': np.zeros(1000)})
+        path = cache._path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+    # A hit makes the oldest entry the most recently used
+    assert cache.get(keys[0]) is not None
+    cache.put(cache.key(_image(3), 'op', 1), {'values': np.zeros(1000)})
+
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert sum(path.stat().st_size for path in _entries(cache)) <= cache.max_bytes
+
+
+def test_cached_operation_reuses_result(enabled_cache):
+    img = _image()
+    first = CustomImageProcessing.compute_lbp(img, 1, 8, 'uniform')
+    assert len(_entries(enabled_cache)) == 1
+    second = CustomImageProcessing.compute_lbp(img, 1, 8, 'uniform', workers=3)
+    np.testing.assert_array_equal(second, first)
+    # Execution settings such as workers do not change the key
+    assert len(_entries(enabled_cache)) == 1
+
+
+def test_cached_operation_recovers_from_corrupt_entry(enabled_cache):
+    img = _image()
+    expected = CustomImageProcessing.compute_lbp(img)
+    path, = _entries(enabled_cache)
+    path.write_bytes(path.read_bytes()[:100])
+    np.testing.assert_array_equal(CustomImageProcessing.compute_lbp(img), expected)
+    np.testing.assert_array_equal(CustomImageProcessing.compute_lbp(img), expected)
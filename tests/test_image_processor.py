@@ -0,0 +1,120 @@
+"""Parity of the vectorized kernels with the original per-pixel loops."""
+import numpy as np
+import pytest
+
+from core import CustomImageProcessing
+
+
+def _resize_reference(img, new_width, new_height):
+    """The original per-pixel bilinear resize."""
+    squeeze = img.ndim == 2
+    img = img[:, :, np.newaxis] if squeeze else img
+    height, width, channels = img.shape
+    resized = np.zeros((new_height, new_width, channels), dtype=np.uint8)
+    x_ratio, y_ratio = width / new_width, height / new_height
+    for i in range(new_height):
+        for j in range(new_width):
+            x, y = j * x_ratio, i * y_ratio
+            x1, y1 = int(x), int(y)
+            x2, y2 = min(x1 + 1, width - 1), min(y1 + 1, height - 1)
+            dx, dy = x - x1, y - y1
+            for c in range(channels):
+                val = (img[y1, x1, c] * (1 - dx) * (1 - dy) + img[y1, x2, c] * dx * (1 - dy) +
+                       img[y2, x1, c] * (1 - dx) * dy + img[y2, x2, c] * dx * dy)
+                resized[i, j, c] = int(val)
+    return resized[:, :, 0] if squeeze else resized
+
+
+def test_resize_bilinear_matches_reference():
+    rng = np.random.default_rng(0)
+    cases = [((23, 31), (40, 17)), ((30, 20, 3), (13, 45)), ((48, 64), (64, 48)), ((40, 40), (7, 9))]
+    for shape, (new_width, new_height) in cases:
+        img = rng.integers(0, 256, shape, dtype=np.uint8)
+        resized = CustomImageProcessing.resize_bilinear(img, new_width, new_height)
+        expected = _resize_reference(img, new_width, new_height)
+        assert resized.shape == expected.shape
+        # Blending rows then columns in float32 can land a truncated value
+        # one level off the original float64 four-corner sum
+        np.testing.assert_allclose(resized, expected, atol=1, rtol=0)
+
+
+def test_resize_bilinear_identity():
+    img = np.random.default_rng(1).integers(0, 256, (37, 53, 3), dtype=np.uint8)
+    np.testing.assert_array_equal(CustomImageProcessing.resize_bilinear(img, 53, 37), img)
+
+
+def _sobel_reference(img):
+    """The original per-pixel Sobel gradients."""
+    h, w = img.shape
+    gx = np.zeros((h, w))
+    gy = np.zeros((h, w))
+    sobel_x = np.array([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]])
+    for i in range(1, h - 1):
+        for j in range(1, w - 1):
+            region = img[i-1:i+2, j-1:j+2].astype(float)
+            gx[i, j] = np.sum(region * sobel_x)
+            gy[i, j] = np.sum(region * sobel_x.T)
+    magnitude = np.sqrt(gx**2 + gy**2)
+    if magnitude.max() > 0:
+        magnitude = magnitude / magnitude.max() * 255
+    return gx, gy, magnitude.astype(np.uint8)
+
+
+def test_compute_gradient_matches_reference():
+    rng = np.random.default_rng(2)
+    for img in (rng.integers(0, 256, (41, 57), dtype=np.uint8),
+                (rng.random((33, 29)) * 255).astype(np.float32),
+                np.full((12, 15), 7, dtype=np.uint8)):
+        gx, gy, magnitude = CustomImageProcessing.compute_gradient(img)
+        ref_gx, ref_gy, ref_magnitude = _sobel_reference(img)
+        np.testing.assert_allclose(gx, ref_gx, atol=1e-3)
+        np.testing.assert_allclose(gy, ref_gy, atol=1e-3)
+        assert magnitude.dtype == np.uint8
+        # uint8 input is exact; float input accumulates in float32
+        np.testing.assert_allclose(magnitude, ref_magnitude, atol=0 if img.dtype == np.uint8 else 1)
+
+
+def test_compute_gradient_outputs_agree():
+    img = np.random.default_rng(3).integers(0, 256, (64, 48), dtype=np.uint8)
+    gx, gy, magnitude = CustomImageProcessing.compute_gradient(img)
+    np.testing.assert_array_equal(CustomImageProcessing.compute_gradient(img, 'magnitude'), magnitude)
+    direction = CustomImageProcessing.compute_gradient(img, 'direction')
+    np.testing.assert_allclose(direction, np.arctan2(gy, gx), atol=1e-6)
+    bins = CustomImageProcessing.compute_gradient(img, 'bins', num_bins=8)
+    expected = np.floor(np.degrees(np.arctan2(gy, gx)) % 360 / 45).astype(np.uint8) % 8
+    np.testing.assert_array_equal(bins, expected)
+
+
+def _equalize_reference(img):
+    """The original global equalization, for the values present in ``img``."""
+    hist = np.zeros(256, dtype=int)
+    for pixel in img.ravel():
+        hist[pixel] += 1
+    cdf = np.cumsum(hist)
+    cdf_min = cdf[cdf > 0].min()
+    total = img.size
+    lut = np.zeros(256, dtype=np.uint8)
+    for i in np.unique(img):
+        lut[i] = int((cdf[i] - cdf_min) / (total - cdf_min) * 255) if total != cdf_min else 0
+    return lut[img]
+
+
+def test_histogram_equalization_matches_reference():
+    rng = np.random.default_rng(4)
+    for img in (rng.integers(0, 256, (40, 50), dtype=np.uint8),
+                rng.integers(90, 160, (33, 47), dtype=np.uint8),
+                np.full((8, 9), 200, dtype=np.uint8)):
+        np.testing.assert_array_equal(CustomImageProcessing.histogram_equalization(img), _equalize_reference(img))
+
+
+def test_clahe_matches_opencv():
+    cv2 = pytest.importorskip('cv2')
+    rng = np.random.default_rng(5)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    for value in (0, 100, 255):
+        img = np.full((64, 64), value, dtype=np.uint8)
+        np.testing.assert_array_equal(CustomImageProcessing.clahe(img), clahe.apply(img))
+    img = (rng.integers(0, 90, (128, 160)) + 60).astype(np.uint8)
+    result = CustomImageProcessing.histogram_equalization(img, mode='clahe')
+    # The bilinear blend of tile LUTs rounds slightly differently from OpenCV's
+    np.testing.assert_allclose(result, clahe.apply(img), atol=1, rtol=0)
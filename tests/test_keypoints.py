@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from core import KeyPoints
+from core.keypoints import DESCRIPTOR_SIZE, FIELDS
+
+
+def _keypoints(n=25, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {'x': rng.uniform(0, 640, n), 'y': rng.uniform(0, 480, n), 'scale': rng.uniform(1, 8, n),
+               'octave': rng.integers(0, 4, n), 'orientation': rng.uniform(0, 360, n),
+               'response': rng.uniform(0, 10, n)}
+    return KeyPoints(columns, rng.random((n, DESCRIPTOR_SIZE)).astype(np.float32))
+
+
+def _assert_equal(a, b):
+    assert len(a) == len(b)
+    for name, _ in FIELDS:
+        np.testing.assert_array_equal(a[name], b[name], err_msg=name)
+    np.testing.assert_array_equal(a.descriptors, b.descriptors)
+
+
+@pytest.mark.parametrize('mmap_mode', [None, 'r', 'c'])
+def test_save_load_round_trip(tmp_path, mmap_mode):
+    kps = _keypoints()
+    kps.save(tmp_path / 'kps.npz')
+    loaded = KeyPoints.load(tmp_path / 'kps.npz', mmap_mode=mmap_mode)
+    _assert_equal(loaded, kps)
+    for name, dtype in FIELDS:
+        assert loaded[name].dtype == dtype
+    if mmap_mode is not None:
+        # Columns are views of the mapped archive, not copies
+        for column in loaded.to_arrays().values():
+            assert isinstance(column.base, np.memmap)
+
+
+def test_memmap_of_empty_keypoints(tmp_path):
+    KeyPoints().save(tmp_path / 'empty.npz')
+    loaded = KeyPoints.load(tmp_path / 'empty.npz', mmap_mode='r')
+    assert len(loaded) == 0
+    assert loaded.descriptors.shape == (0, DESCRIPTOR_SIZE)
+
+
+def test_memmap_rejects_compressed_archive(tmp_path):
+    np.savez_compressed(tmp_path / 'kps.npz', **_keypoints().to_arrays())
+    with pytest.raises(ValueError):
+        KeyPoints.load(tmp_path / 'kps.npz', mmap_mode='r')
+    _assert_equal(KeyPoints.load(tmp_path / 'kps.npz'), _keypoints())
+
+
+def test_dicts_round_trip():
+    kps = _keypoints(5)
+    dicts = list(kps)
+    assert dicts[2] == {**kps[2], 'descriptor': dicts[2]['descriptor']}
+    np.testing.assert_array_equal(dicts[2]['descriptor'], kps.descriptors[2])
+    _assert_equal(KeyPoints.from_dicts(dicts), kps)
+
+
+def test_indexing_filter_and_sort():
+    kps = _keypoints()
+    strong = kps.filter(kps.response > 5)
+    assert (strong.response > 5).all() and len(strong) == (kps.response > 5).sum()
+    ordered = kps.sort('response', descending=True)
+    assert (np.diff(ordered.response) <= 0).all()
+    _assert_equal(KeyPoints.concatenate([kps[:10], kps[10:]]), kps)
+    np.testing.assert_array_equal(kps.xy, np.stack([kps.x, kps.y], axis=1))
+    with pytest.raises(IndexError):
+        kps[len(kps)]
+    with pytest.raises(ValueError):
+        KeyPoints({'x': [1.0, 2.0]}, np.zeros((3, DESCRIPTOR_SIZE)))
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from core import KeyPoints
+from core.matching import knn_search, match_descriptors
+
+
+def _brute_force(queries, train):
+    diff = queries[:, np.newaxis, :].astype(np.float64) - train[np.newaxis, :, :]
+    return np.sqrt((diff ** 2).sum(axis=2))
+
+
+def _descriptors(seed=0, n_train=300, n_matched=80, n_random=70, dim=32):
+    """Train descriptors, and queries that are noisy copies of some of them or unrelated."""
+    rng = np.random.default_rng(seed)
+    train = rng.random((n_train, dim)).astype(np.float32)
+    copies = train[rng.choice(n_train, n_matched, replace=False)] + rng.normal(0, 0.01, (n_matched, dim))
+    queries = np.concatenate([copies, rng.random((n_random, dim))]).astype(np.float32)
+    return queries[rng.permutation(len(queries))], train
+
+
+@pytest.mark.parametrize('k', [1, 2, 5])
+@pytest.mark.parametrize('chunk_size, block_size', [(512, 4096), (7, 13), (64, 1)])
+def test_knn_search_matches_brute_force(k, chunk_size, block_size):
+    queries, train = _descriptors()
+    indices, distances = knn_search(queries, train, k, chunk_size=chunk_size, block_size=block_size)
+    full = _brute_force(queries, train)
+    expected = np.argsort(full, axis=1, kind='stable')[:, :k]
+    np.testing.assert_array_equal(indices, expected)
+    np.testing.assert_allclose(distances, np.take_along_axis(full, expected, axis=1), atol=1e-3)
+
+
+def test_knn_search_pads_missing_neighbours():
+    queries, train = _descriptors(n_train=3, n_matched=2)
+    indices, distances = knn_search(queries, train, k=5)
+    assert (indices[:, 3:] == -1).all() and np.isinf(distances[:, 3:]).all()
+    indices, distances = knn_search(queries[:0], train, k=2)
+    assert indices.shape == (0, 2)
+
+
+def _reference_matches(queries, train, ratio, cross_check, excluded=None):
+    full = _brute_force(queries, train)
+    if excluded is not None:
+        full[excluded] = np.inf
+    order = np.argsort(full, axis=1)
+    first, second = order[:, 0], order[:, 1]
+    rows = np.arange(len(queries))
+    keep = np.isfinite(full[rows, first])
+    if ratio is not None:
+        keep &= full[rows, first] < ratio * full[rows, second]
+    if cross_check:
+        keep &= full[rows, first] <= full.min(axis=0)[first]
+    return rows[keep], first[keep]
+
+
+@pytest.mark.parametrize('ratio, cross_check', [(0.8, True), (0.8, False), (None, True), (0.6, True)])
+def test_match_descriptors_matches_reference(ratio, cross_check):
+    queries, train = _descriptors(1)
+    query_idx, train_idx, distances = match_descriptors(queries, train, ratio, cross_check, 16, 50)
+    expected_query, expected_train = _reference_matches(queries, train, ratio, cross_check)
+    np.testing.assert_array_equal(query_idx, expected_query)
+    np.testing.assert_array_equal(train_idx, expected_train)
+    np.testing.assert_allclose(distances, _brute_force(queries, train)[query_idx, train_idx], atol=1e-3)
+    if ratio is not None:
+        # Noisy copies pass the ratio test, unrelated queries do not
+        assert 60 <= len(query_idx) <= 90
+
+
+def test_match_descriptors_with_exclusion_and_keypoints():
+    _, train = _descriptors(2, dim=128)
+    kps = KeyPoints(descriptors=np.concatenate([train, train[:20] + 0.001]))
+
+    def not_self(query_rows, train_rows):
+        return query_rows[:, np.newaxis] == train_rows[np.newaxis, :]
+
+    query_idx, train_idx, _ = match_descriptors(kps, kps, exclude=not_self, chunk_size=32, block_size=40)
+    assert (query_idx != train_idx).all()
+    expected_query, expected_train = _reference_matches(
+        kps.descriptors, kps.descriptors, 0.8, True, excluded=np.eye(len(kps), dtype=bool))
+    np.testing.assert_array_equal(query_idx, expected_query)
+    np.testing.assert_array_equal(train_idx, expected_train)
+    # Each near-duplicate pair finds the other half
+    assert len(query_idx) == 40
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from core import CustomImageProcessing, get_workers, parallel, set_workers
+
+
+@pytest.fixture(autouse=True)
+def small_bands(monkeypatch):
+    # Split even small test images into as many bands as there are workers
+    monkeypatch.setattr(parallel, 'MIN_BAND_PIXELS', 64)
+
+
+def _image(seed=0, shape=(97, 123)):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+def _assert_same(a, b):
+    if isinstance(a, tuple):
+        for x, y in zip(a, b):
+            np.testing.assert_array_equal(x, y)
+    else:
+        np.testing.assert_array_equal(a, b)
+
+
+KERNELS = {
+    'resize_gray': lambda img, workers: CustomImageProcessing.resize_bilinear(img, 71, 150, workers=workers),
+    'resize_rgb': lambda img, workers: CustomImageProcessing.resize_bilinear(
+        np.dstack([img, img[::-1], img[:, ::-1]]), 150, 61, workers=workers),
+    'equalize': lambda img, workers: CustomImageProcessing.histogram_equalization(img, workers=workers),
+    'clahe': lambda img, workers: CustomImageProcessing.clahe(img, (4, 5), workers=workers),
+    'gradient': lambda img, workers: CustomImageProcessing.compute_gradient(img, workers=workers),
+    'gradient_bins': lambda img, workers: CustomImageProcessing.compute_gradient(img, 'bins', workers=workers),
+    'lbp': lambda img, workers: CustomImageProcessing.compute_lbp(img, 2, 16, 'uniform', workers=workers),
+    'blur_direct': lambda img, workers: CustomImageProcessing.gaussian_blur(img, 2.0, 'direct', workers=workers),
+    'blur_fft': lambda img, workers: CustomImageProcessing.gaussian_blur(img, 6.0, 'fft', workers=workers),
+}
+
+
+@pytest.mark.parametrize('name', sorted(KERNELS))
+@pytest.mark.parametrize('workers', [2, 3, 7])
+def test_kernels_independent_of_worker_count(name, workers):
+    img = _image()
+    _assert_same(KERNELS[name](img, workers), KERNELS[name](img, 1))
+
+
+def test_sift_independent_of_worker_count():
+    img = CustomImageProcessing.gaussian_blur(_image(1, (120, 140)), 1.5).astype(np.uint8)
+    serial = CustomImageProcessing.compute_sift_keypoints(img, num_octaves=3, workers=1)
+    threaded = CustomImageProcessing.compute_sift_keypoints(img, num_octaves=3, workers=4)
+    assert len(serial) > 0
+    expected = serial.to_arrays()
+    for name, column in threaded.to_arrays().items():
+        np.testing.assert_array_equal(column, expected[name], err_msg=name)
+
+
+def test_run_bands_covers_rows_in_order():
+    bands = parallel.run_bands(lambda start, stop: (start, stop), 50, workers=4, row_pixels=100)
+    assert len(bands) == 4
+    assert bands[0][0] == 0 and bands[-1][1] == 50
+    assert all(prev[1] == cur[0] for prev, cur in zip(bands, bands[1:]))
+
+
+def test_nested_bands_run_serially():
+    def outer(start, stop):
+        return parallel.run_bands(lambda a, b: (a, b), 10, workers=4, row_pixels=100)
+
+    for inner in parallel.run_bands(outer, 8, workers=4, row_pixels=100):
+        assert inner == [(0, 10)]
+
+
+def test_set_workers_changes_default_pool():
+    previous = get_workers()
+    try:
+        set_workers(3)
+        assert get_workers() == 3
+        assert len(parallel.run_bands(lambda start, stop: stop - start, 30, row_pixels=100)) == 3
+        set_workers(0)
+        assert get_workers() == 1
+    finally:
+        set_workers(previous)
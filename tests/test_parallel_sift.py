@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from core import CustomImageProcessing
+
+
+def _textured(seed=0, shape=(150, 190)):
+    noise = np.random.default_rng(seed).integers(0, 256, shape).astype(np.float32)
+    return CustomImageProcessing.gaussian_blur(noise, 2.0).astype(np.uint8)
+
+
+@pytest.mark.parametrize('processes', [2, 3])
+def test_parallel_sift_matches_serial(processes):
+    img = _textured()
+    serial = CustomImageProcessing.compute_sift_keypoints(img, num_octaves=3)
+    parallel = CustomImageProcessing.compute_sift_keypoints(img, num_octaves=3, processes=processes)
+    assert len(serial) > 20
+    # Same keypoints in the same order, so band borders neither drop nor
+    # duplicate candidates
+    expected = serial.to_arrays()
+    for name, column in parallel.to_arrays().items():
+        np.testing.assert_array_equal(column, expected[name], err_msg=name)
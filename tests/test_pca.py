@@ -0,0 +1,21 @@
+import numpy as np
+
+from core import CustomImageProcessing
+
+
+def _low_rank_uint8(rng, n_samples=600, n_features=400, rank=5):
+    base = rng.standard_normal((n_samples, rank)) @ rng.standard_normal((rank, n_features))
+    noisy = 128 + 20 * base + rng.standard_normal((n_samples, n_features))
+    return np.clip(noisy, 0, 255).astype(np.uint8)
+
+
+def test_randomized_matches_full_on_uint8():
+    data = _low_rank_uint8(np.random.default_rng(0))
+
+    full, full_variance, full_k = CustomImageProcessing.pca_reduction(data, 5, solver='full')
+    fast, fast_variance, fast_k = CustomImageProcessing.pca_reduction(data, 5, solver='randomized')
+
+    assert fast_k == full_k == 5
+    assert full_variance > 0.9
+    assert np.isclose(fast_variance, full_variance, rtol=1e-3)
+    np.testing.assert_allclose(fast, full, atol=1e-3 * 255)
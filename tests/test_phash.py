@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from core.phash import METHODS, HashIndex, hamming_distance, hash_images, pack_bits
+
+
+def _brute_force_distances(queries, hashes):
+    xor = queries[:, np.newaxis] ^ hashes[np.newaxis, :]
+    return np.unpackbits(xor[..., np.newaxis].view(np.uint8), axis=-1).sum(axis=-1)
+
+
+def _hashes_with_near_duplicates(seed=0, n=600, n_variants=300, max_flips=10):
+    """Random hashes plus copies of some of them with a few bits flipped."""
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 2 ** 63, n, dtype=np.uint64) ^ (rng.integers(0, 2, n, dtype=np.uint64) << np.uint64(63))
+    variants = base[rng.integers(0, n, n_variants)]
+    for i, flips in enumerate(rng.integers(0, max_flips + 1, n_variants)):
+        for bit in rng.choice(64, flips, replace=False):
+            variants[i] ^= np.uint64(1) << np.uint64(bit)
+    return np.concatenate([base, variants])[rng.permutation(n + n_variants)]
+
+
+def test_hamming_distance_matches_brute_force():
+    hashes = _hashes_with_near_duplicates()
+    np.testing.assert_array_equal(hamming_distance(hashes[:50, np.newaxis], hashes[np.newaxis]),
+                                  _brute_force_distances(hashes[:50], hashes))
+
+
+@pytest.mark.parametrize('radius', [0, 3, 4, 6, 9])
+@pytest.mark.parametrize('n_chunks', [4, 8])
+def test_search_matches_brute_force(radius, n_chunks):
+    hashes = _hashes_with_near_duplicates()
+    index = HashIndex(hashes[:700], n_chunks=n_chunks)
+    index.add(hashes[700:])
+    queries = hashes[::3]
+    query_idx, ids, distances = index.search(queries, radius)
+
+    full = _brute_force_distances(queries, hashes)
+    expected_query, expected_ids = np.nonzero(full <= radius)
+    expected_distances = full[expected_query, expected_ids]
+    order = np.lexsort((expected_ids, expected_distances, expected_query))
+    np.testing.assert_array_equal(query_idx, expected_query[order])
+    np.testing.assert_array_equal(ids, expected_ids[order])
+    np.testing.assert_array_equal(distances, expected_distances[order])
+    assert (ids != np.arange(len(hashes))[::3][query_idx]).any()
+
+
+def test_near_duplicates_matches_brute_force():
+    hashes = _hashes_with_near_duplicates(1)
+    pairs, distances = HashIndex(hashes).near_duplicates(radius=5)
+    full = _brute_force_distances(hashes, hashes)
+    expected = np.argwhere(np.triu(full <= 5, k=1))
+    assert len(expected) > 0
+    assert {tuple(pair) for pair in pairs.tolist()} == {tuple(pair) for pair in expected.tolist()}
+    assert (pairs[:, 0] < pairs[:, 1]).all()
+    np.testing.assert_array_equal(distances, full[pairs[:, 0], pairs[:, 1]])
+
+
+def test_pack_bits_is_msb_first():
+    bits = np.zeros(64, dtype=bool)
+    bits[0] = bits[63] = True
+    assert pack_bits(bits) == np.uint64(2 ** 63 + 1)
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_hash_images_shape_and_similarity(method):
+    rng = np.random.default_rng(2)
+    img = (rng.random((96, 128, 3)) * 255).astype(np.uint8)
+    brighter = np.clip(img.astype(np.int16) + 20, 0, 255).astype(np.uint8)
+    other = (rng.random((96, 128, 3)) * 255).astype(np.uint8)
+    hashes = hash_images([img, brighter, other, img[:, :, 0]], method)
+    assert hashes.dtype == np.uint64 and hashes.shape == (4,)
+    assert hamming_distance(hashes[0], hashes[1]) <= 6
+    assert hamming_distance(hashes[0], hashes[2]) > 10
+    assert hash_images([], method).shape == (0,)
@@ -0,0 +1,44 @@
+import numpy as np
+
+from core import CustomImageProcessing
+from core.scale_space import gradient_polar
+
+
+def _level(rng, shape=(96, 112)):
+    noise = rng.integers(0, 256, shape).astype(np.float32)
+    return CustomImageProcessing.gaussian_blur(noise, 1.5)
+
+
+def _positions(rng, n=60):
+    # Half-pixel positions make rounding ties, where patch offsets used to flip the result
+    xs = np.concatenate([rng.uniform(0, 112, n), np.arange(0.5, 112, 7.0)[:n]])
+    ys = np.concatenate([rng.uniform(0, 96, n), np.arange(0.5, 96, 6.0)[:len(xs) - n]])
+    return xs, ys
+
+
+def test_single_keypoint_orientation_matches_batched():
+    rng = np.random.default_rng(0)
+    img = _level(rng)
+    magnitude, orientation = gradient_polar(img)
+    xs, ys = _positions(rng)
+    sigmas = rng.uniform(0.3, 4.0, len(xs))
+
+    for x, y, sigma in zip(xs.astype(int), ys.astype(int), sigmas):
+        single = CustomImageProcessing.compute_keypoint_orientation(img, y, x, sigma)
+        _, batched = CustomImageProcessing.compute_keypoint_orientations(
+            magnitude, orientation, [y], [x], [sigma])
+        np.testing.assert_array_equal(single, batched)
+
+
+def test_single_keypoint_descriptor_matches_batched():
+    rng = np.random.default_rng(1)
+    img = _level(rng)
+    magnitude, orientation = gradient_polar(img)
+    xs, ys = _positions(rng)
+    scales = rng.choice([1.0, 1.6, 2.5, rng.uniform(0.5, 3.0)], len(xs))
+    angles = rng.uniform(0, 360, len(xs))
+
+    batched = CustomImageProcessing._compute_keypoint_descriptors(magnitude, orientation, xs, ys, scales, angles)
+    for i in range(len(xs)):
+        single = CustomImageProcessing._compute_keypoint_descriptor(img, xs[i], ys[i], scales[i], angles[i])
+        np.testing.assert_array_equal(single, batched[i])
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from core import CustomImageProcessing
+from core.tiling import TiledExecutor, tiled_gaussian_blur, tiled_gradient, tiled_lbp
+
+
+# Small enough that a 90x130 image splits into many tiles
+SMALL = TiledExecutor(max_memory=40 * 40 * 24)
+
+
+def _image(seed=0, shape=(90, 130)):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+def test_tiles_cover_image_once():
+    covered = np.zeros((90, 130), dtype=int)
+    for _, _, inner in SMALL.tiles(covered.shape, halo=3, bytes_per_pixel=24):
+        covered[inner] += 1
+    assert (covered == 1).all()
+
+
+@pytest.mark.parametrize('sigma', [0.8, 1.6, 3.0])
+def test_tiled_gaussian_blur_matches_untiled(sigma):
+    img = _image(1)
+    expected = CustomImageProcessing.gaussian_blur(img, sigma, method='direct')
+    np.testing.assert_array_equal(tiled_gaussian_blur(img, sigma, executor=SMALL), expected)
+
+
+@pytest.mark.parametrize('radius, n_points, method', [(1, 8, 'default'), (2, 16, 'uniform'), (1.5, 8, 'riu2')])
+def test_tiled_lbp_matches_untiled(radius, n_points, method):
+    img = _image(2)
+    expected = CustomImageProcessing.compute_lbp(img, radius, n_points, method)
+    np.testing.assert_array_equal(tiled_lbp(img, radius, n_points, method, executor=SMALL), expected)
+
+
+@pytest.mark.parametrize('output', ['magnitude', 'direction', 'bins'])
+def test_tiled_gradient_matches_untiled(output):
+    img = _image(3)
+    expected = CustomImageProcessing.compute_gradient(img, output)
+    np.testing.assert_array_equal(tiled_gradient(img, output, executor=SMALL), expected)
+
+
+def test_tiled_run_writes_into_memmap(tmp_path):
+    img = _image(4)
+    out = np.lib.format.open_memmap(tmp_path / 'blur.npy', mode='w+', dtype=np.float32, shape=img.shape)
+    tiled_gaussian_blur(img, 1.6, executor=SMALL, out=out)
+    out.flush()
+    np.testing.assert_array_equal(np.load(tmp_path / 'blur.npy'),
+                                  CustomImageProcessing.gaussian_blur(img, 1.6, method='direct'))